@@ -0,0 +1,103 @@
+"""Difficulty-weighted sampling of scene configurations.
+
+A weights file maps scene attribute keys to difficulty weights, for example::
+
+    {
+      "default": 1.0,
+      "cells": {
+        "Crossarm|fuse|Fuse_Anomaly|low|*": 4.0,
+        "ModifiedVertical|*|none|*|*": 0.5
+      }
+    }
+
+A key is ``pole_type|setup|anomaly|camera_style|distance_bucket``; each part of a
+cell may use shell-style wildcards. Generated scenes are accepted with probability
+proportional to their cell's weight (rejection sampling), so every cell keeps its
+natural frequency scaled by its weight and never drops below ``min_weight``.
+"""
+
+import json
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence
+
+KEY_FIELDS = ('pole_type', 'setup', 'anomaly', 'angle_style', 'distance_bucket')
+DEFAULT_DISTANCE_BUCKETS = [0, 20, 45, 90, 135]
+
+
+def distance_bucket(distance: Optional[float], edges: Sequence[float] = DEFAULT_DISTANCE_BUCKETS) -> str:
+    """Name of the distance bucket (e.g. ``20-45``) a camera distance falls into."""
+    if distance is None:
+        return 'unknown'
+    for low, high in zip(edges, edges[1:]):
+        if distance < high:
+            return f"{low:g}-{high:g}"
+    return f"{edges[-1]:g}+"
+
+
+def attribute_key(record: Dict[str, Any], edges: Sequence[float] = DEFAULT_DISTANCE_BUCKETS) -> str:
+    """Attribute key of a frame record (see ``scripts.generate.frame_record``)."""
+    anomalies = sorted(set(record.get('anomalies') or []))
+    parts = (
+        record.get('pole_type') or 'unknown',
+        '+'.join(record.get('setup') or []) or 'none',
+        '+'.join(anomalies) or 'none',
+        record.get('angle_style') or 'unknown',
+        distance_bucket(record.get('distance'), edges),
+    )
+    return '|'.join(str(part) for part in parts)
+
+
+class DifficultyWeights:
+    """Difficulty weights per attribute cell with a minimum-exploration floor."""
+
+    def __init__(self, cells: Optional[Dict[str, float]] = None, default: float = 1.0,
+                 min_weight: float = 0.1, distance_buckets: Sequence[float] = DEFAULT_DISTANCE_BUCKETS):
+        self.cells = cells or {}
+        self.default = default
+        self.min_weight = min_weight
+        self.distance_buckets = list(distance_buckets)
+        # Exact keys are looked up directly; wildcard cells are matched most specific first
+        self._patterns: List = sorted(
+            ((key.split('|'), weight) for key, weight in self.cells.items() if any(c in key for c in '*?[')),
+            key=lambda item: sum(part == '*' for part in item[0]),
+        )
+        self.max_weight = max([self.default, self.min_weight, *self.cells.values()])
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['DifficultyWeights']:
+        """Load the weights file named in the ``adaptive`` section, or None if disabled."""
+        settings = config.get('adaptive', {}) or {}
+        if not settings.get('enabled'):
+            return None
+        path = Path(settings['weights_file'])
+        data = {}
+        if path.exists():
+            with open(path, 'r') as f:
+                data = json.load(f)
+        return cls(
+            cells=data.get('cells', {}),
+            default=data.get('default', settings.get('default_weight', 1.0)),
+            min_weight=settings.get('min_weight', 0.1),
+            distance_buckets=settings.get('distance_buckets', DEFAULT_DISTANCE_BUCKETS),
+        )
+
+    def key(self, record: Dict[str, Any]) -> str:
+        return attribute_key(record, self.distance_buckets)
+
+    def weight(self, key: str) -> float:
+        """Weight of a cell, never below the exploration floor."""
+        weight = self.cells.get(key)
+        if weight is None:
+            parts = key.split('|')
+            for pattern, pattern_weight in self._patterns:
+                if len(pattern) == len(parts) and all(fnmatchcase(p, q) for p, q in zip(parts, pattern)):
+                    weight = pattern_weight
+                    break
+            else:
+                weight = self.default
+        return max(weight, self.min_weight)
+
+    def acceptance(self, key: str) -> float:
+        """Probability of keeping a generated scene whose attribute key is ``key``."""
+        return self.weight(key) / self.max_weight
@@ -1,14 +1,21 @@
 """Base class for all pole types with common component handling."""
 
 import random
+import logging
 import bpy
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any, List, Tuple
 
 #from ..utils.scene_utils import toggle_visibility, reset_scene
 from utils.scene_utils import toggle_visibility, toggle_collection_visibility
-from utils.wire_generator import create_power_wire
+from utils.wire_generator import create_power_wire, wire_pool
+from utils.scene_index import scene_index
+from utils.material_variation import prepare_rust, set_rust, material_users
 from generators.anomalies import rotate_object_global
+from core.trackers import SceneJournal
+from core.log import get_logger
+
+logger = get_logger(__name__)
 
 class PoleBase(ABC):
     """Base class for pole generation with configuration handling."""
@@ -25,12 +32,14 @@ class PoleBase(ABC):
 
         # Initialize basic attributes
         self.config = config
+        # Collection and object lookups resolved once per loaded .blend
+        self.index = scene_index()
         
         # Select number of phases based on config probabilities
         self.phases = self._select_phases(config.get('phases', {}))
         
         # Select pole material and type
-        self.pole_collection = bpy.data.collections.get("Poles")
+        self.pole_collection = self.index.collection("Poles")
         self.pole_material = self._select_material(config.get('pole_materials', {}))
         self.pole_type = self._get_pole_object(f"{self.pole_material}Pole")
         # Get pole type name from class name
@@ -70,7 +79,7 @@ class PoleBase(ABC):
 
         self.has_surge_arresters = ('surge_arresters' in self.optional_components and 
                                    random.random() < equipment_chances.get('surge_arresters', 0)/100)
-        print('has_surge_arresters ', self.has_surge_arresters)
+        logger.debug("has_surge_arresters: %s", self.has_surge_arresters)
         self.has_fcis = ('fcis' in self.optional_components and 
                          random.random() < equipment_chances.get('fcis', 0)/100 and self.phases == 3)
         self.has_insulator_support_bracket = ('insulator_support_bracket' in self.optional_components and 
@@ -101,9 +110,9 @@ class PoleBase(ABC):
                 wood_poles = ["WoodPole", "WoodPole2"]
                 selected_pole = random.choice(wood_poles)
             
-                return self.pole_collection.objects.get(selected_pole)
+                return self.index.object(self.pole_collection, selected_pole)
             # For other materials, use the original pole type name
-            return self.pole_collection.objects.get(pole_type_name)
+            return self.index.object(self.pole_collection, pole_type_name)
         return None
 
     def _check_component_requirements(self, component: str) -> bool:
@@ -135,6 +144,33 @@ class PoleBase(ABC):
             raise ValueError("No valid pole type selected")
         
         self.setup_pole()
+        # Write the control points of every wire strung by setup_pole at once
+        wire_pool().build()
+
+    def scene_attributes(self) -> Dict[str, Any]:
+        """Describe the sampled configuration for frame logs and dry-run estimates."""
+        return {
+            'pole_type': type(self).__name__,
+            'pole_material': self.pole_material,
+            'phases': self.phases,
+            'setup': list(self.selected_setup),
+            'surge_arresters': self.has_surge_arresters,
+            'fcis': self.has_fcis,
+            'support_bracket': self.has_insulator_support_bracket,
+            'anomalies_enabled': self.enable_anomalies,
+        }
+
+    def recipe_key(self) -> Tuple:
+        """Configuration key whose realizations share a deterministic core of objects (see core.recipes)."""
+        return (
+            type(self).__name__,
+            self.pole_type.name if self.pole_type else None,
+            self.phases,
+            tuple(self.selected_setup),
+            self.has_surge_arresters,
+            self.has_fcis,
+            self.has_insulator_support_bracket,
+        )
 
     def _select_pole_type(self, material_config: Dict[str, int]) -> str:
         """Select pole type based on material probabilities."""
@@ -175,48 +211,48 @@ class PoleBase(ABC):
                 weight += chances.get(component, 1) / 100  # Default 50% if not specified
             setup_weights.append(weight)
 
-        # Print valid setups and their weights
-        print("\nValid setups and weights:")
-        for setup, weight in zip(valid_setups, setup_weights):
-            print(f"Setup: {setup}, Weight: {weight:.2f}")
+        # Log valid setups and their weights
+        if logger.isEnabledFor(logging.DEBUG):
+            for setup, weight in zip(valid_setups, setup_weights):
+                logger.debug("Setup: %s, Weight: %.2f", setup, weight)
         
         # Select setup based on calculated weights
         final_setup = random.choices(valid_setups, weights=setup_weights, k=1)[0]
-        print(f"\nSelected setup: {final_setup}\n")
+        logger.debug("Selected setup: %s", final_setup)
         return final_setup
     def _add_surge_arresters(self):
         if self.has_aetx or self.has_fcis or self.has_doubleals or self.has_three_phase_aetx:
             return
         """Add surge arresters based on configuration."""
-        surge_arrester_collection = bpy.data.collections.get("SurgeArresters")
+        surge_arrester_collection = self.index.collection("SurgeArresters")
         
-        Surge_Arrester_Wires = surge_arrester_collection.children.get("SA_Wires")
+        Surge_Arrester_Wires = self.index.child(surge_arrester_collection, "SA_Wires")
         
         # Randomly choose between SurgeArresters1 and SurgeArresters2 collections
         variant = random.choice(['1', '2'])
         
         for i in range(1, self.phases + 1):
             if variant == '1':
-                sub_collection = surge_arrester_collection.children.get('SurgeArresters1')
-                arrester = sub_collection.objects.get(f"SurgeArrester{i}") if sub_collection else None
+                sub_collection = self.index.child(surge_arrester_collection, 'SurgeArresters1')
+                arrester = self.index.object(sub_collection, f"SurgeArrester{i}") if sub_collection else None
             else:
-                sub_collection = surge_arrester_collection.children.get('SurgeArresters2')
-                arrester = sub_collection.objects.get(f"SurgeArrester{i}{i}") if sub_collection else None
-                cylinder = sub_collection.objects.get(f"Cylinder{i}{i}") if sub_collection else None
+                sub_collection = self.index.child(surge_arrester_collection, 'SurgeArresters2')
+                arrester = self.index.object(sub_collection, f"SurgeArrester{i}{i}") if sub_collection else None
+                cylinder = self.index.object(sub_collection, f"Cylinder{i}{i}") if sub_collection else None
                 if cylinder:
                     toggle_visibility(cylinder, True)
                 
             if arrester:
                 toggle_visibility(arrester, True)
 
-                wire_collection = Surge_Arrester_Wires.children.get(f"{i}_SA_Wires")
+                wire_collection = self.index.child(Surge_Arrester_Wires, f"{i}_SA_Wires")
                 toggle_collection_visibility(wire_collection, True)
                 if wire_collection and len(wire_collection.objects) >= 2:
                     create_power_wire(wire_collection.objects[0], wire_collection.objects[1])
     
     def _add_fcis(self):
         """Add FCI components based on configuration."""
-        fci_collection = bpy.data.collections.get("FCIs")
+        fci_collection = self.index.collection("FCIs")
         if not fci_collection:
             return
         toggle_collection_visibility(fci_collection, True)
@@ -226,95 +262,90 @@ class PoleBase(ABC):
         if not self.has_aetx or not self._check_component_requirements('aetx'):
             return
         
-        aetx_collection = bpy.data.collections.get("1PhTransformer")
+        aetx_collection = self.index.collection("1PhTransformer")
         if not aetx_collection:
             return
 
         toggle_collection_visibility(aetx_collection, True)
+        fuse_rust = None
 
         #Choose a random fuse type #NOTE: CHANGE THIS LATER TO SETTINGS CONFIG
         # Choose between porcelain or polymer fuse
         fuse_type = random.choice(['porcelain', 'polymer'])
         if fuse_type == 'polymer':
-            toggle_visibility(aetx_collection.objects.get('PorcelainFuse1'), False)
-            toggle_visibility(aetx_collection.objects.get('PorcelainFuse2'), False)
+            toggle_visibility(self.index.object(aetx_collection, 'PorcelainFuse1'), False)
+            toggle_visibility(self.index.object(aetx_collection, 'PorcelainFuse2'), False)
         else:
-            toggle_visibility(aetx_collection.objects.get('Fuse.001'), False)
-            toggle_visibility(aetx_collection.objects.get('Barrel'), False)
-            toggle_visibility(aetx_collection.objects.get('FuseCap'), False)
-            
-            porcelain_fuse1 = aetx_collection.objects.get('PorcelainFuse1')
-            # Modify noise texture for porcelain fuse rust
-            rust_mat = bpy.data.materials.get('PorcelainFuse1')
-            if rust_mat and rust_mat.node_tree:
-                nodes = rust_mat.node_tree.nodes
-                rust_noise = nodes.get('Noise Texture.001')
-                if rust_noise:
-                    if random.random() < self.anomaly_types.get('porcelain_fuse_flashed', 0.3):
-                        rust_noise.inputs['W'].default_value = random.uniform(0, 500)
-                        porcelain_fuse1['label'] = porcelain_fuse1.get('label', '') + '_Flashed'
-                        print(f"Porcelain fuse label: {porcelain_fuse1.get('label', '')}")
-                        print('FLASHED')
-                    else:
-                        rust_noise.inputs['W'].default_value = 0
-                        print(f"Porcelain fuse label: {porcelain_fuse1.get('label', '')}")
-                        if '_Flashed' in porcelain_fuse1.get('label', ''):
-                            porcelain_fuse1['label'] = porcelain_fuse1['label'].replace('_Flashed', '')
-                        
+            toggle_visibility(self.index.object(aetx_collection, 'Fuse.001'), False)
+            toggle_visibility(self.index.object(aetx_collection, 'Barrel'), False)
+            toggle_visibility(self.index.object(aetx_collection, 'FuseCap'), False)
             
+            porcelain_fuse1 = self.index.object(aetx_collection, 'PorcelainFuse1')
+            # Porcelain fuse rust is read per object from its rust_w property, so the
+            # shared material stays unchanged; the journal restores property and label
+            journal = SceneJournal.get_instance()
+            if prepare_rust('PorcelainFuse1'):
+                if random.random() < self.anomaly_types.get('porcelain_fuse_flashed', 0.3):
+                    fuse_rust = random.uniform(0, 500)
+                    journal.set_item(porcelain_fuse1, 'label', porcelain_fuse1.get('label', '') + '_Flashed')
+                    logger.debug("Porcelain fuse flashed, label: %s", porcelain_fuse1.get('label', ''))
+                else:
+                    fuse_rust = 0
+                    logger.debug("Porcelain fuse label: %s", porcelain_fuse1.get('label', ''))
+                    if '_Flashed' in porcelain_fuse1.get('label', ''):
+                        journal.set_item(porcelain_fuse1, 'label', porcelain_fuse1['label'].replace('_Flashed', ''))
         
-        # Modify noise texture for porcelain fuse rust
-        rust_mat = bpy.data.materials.get('PorcelainFuse1')
-        if rust_mat and rust_mat.node_tree:
-            nodes = rust_mat.node_tree.nodes
-            rust_noise = nodes.get('Noise Texture.001')
-            if rust_noise:
-                rust_noise.inputs['W'].default_value = random.uniform(0, 500)
+        # Random rust for every object with the porcelain fuse material; the
+        # porcelain fuse keeps the rust that matches its label
+        if prepare_rust('PorcelainFuse1'):
+            set_rust(material_users('PorcelainFuse1'), 'PorcelainFuse1', random.uniform(0, 500))
+            if fuse_rust is not None:
+                set_rust([porcelain_fuse1], 'PorcelainFuse1', fuse_rust)
         
         # Choose a random AETX from choices
         chosen_aetx = random.choice(['AETX', 'AETX_2'])
-        toggle_visibility(aetx_collection.objects.get('AETX' if chosen_aetx == 'AETX_2' else 'AETX_2'), False)
+        toggle_visibility(self.index.object(aetx_collection, 'AETX' if chosen_aetx == 'AETX_2' else 'AETX_2'), False)
 
         ## NOTE: CHANGE THIS LATER TO SETTINGS CONFIG
         fuse_cap_chance = random.randint(0,3)
       
         if fuse_cap_chance < 3 or self.has_ats:
-            toggle_visibility(aetx_collection.objects.get("FuseCap"),False)
+            toggle_visibility(self.index.object(aetx_collection, "FuseCap"),False)
         
         if self.has_ats:
-            toggle_visibility(aetx_collection.objects.get('Fuse.001'), False)
-            toggle_visibility(aetx_collection.objects.get('Barrel'), False)
-            toggle_visibility(aetx_collection.objects.get('PorcelainFuse1'), False)
-            toggle_visibility(aetx_collection.objects.get('PorcelainFuse2'), False)
+            toggle_visibility(self.index.object(aetx_collection, 'Fuse.001'), False)
+            toggle_visibility(self.index.object(aetx_collection, 'Barrel'), False)
+            toggle_visibility(self.index.object(aetx_collection, 'PorcelainFuse1'), False)
+            toggle_visibility(self.index.object(aetx_collection, 'PorcelainFuse2'), False)
             
-            Wires = aetx_collection.children.get("ATS_Wires")
+            Wires = self.index.child(aetx_collection, "ATS_Wires")
             # Add ATS anomaly if enabled
             if self.enable_anomalies and random.random() < self.anomaly_types.get('ats_open', 0.15):
-                ats_part = aetx_collection.children.get('ATSConfig').objects.get('ATSpart')
+                ats_part = self.index.object(self.index.child(aetx_collection, 'ATSConfig'), 'ATSpart')
                 if ats_part:
                     rotate_object_global(ats_part, 40)
         else:
-            toggle_collection_visibility(aetx_collection.children.get('ATSConfig'), False)
-            Wires = aetx_collection.children.get("FuseWires")
+            toggle_collection_visibility(self.index.child(aetx_collection, 'ATSConfig'), False)
+            Wires = self.index.child(aetx_collection, "FuseWires")
             # Add fuse anomaly if enabled
             if self.enable_anomalies and random.random() < self.anomaly_types.get('fuse_open', 0.25):
-                barrel = aetx_collection.objects.get('Barrel')
+                barrel = self.index.object(aetx_collection, 'Barrel')
                 if barrel:
                     rotate_object_global(barrel, random.randint(140, 180))
 
         if Wires:
             for wire_collection in Wires.children:
-                empties = [obj for obj in wire_collection.objects if obj.type == 'EMPTY']
+                empties = self.index.wire_empties(wire_collection)
                 if len(empties) == 2:
                     create_power_wire(empties[0], empties[1])
     
     def _add_neut_framing(self):
-        conductors =  bpy.data.collections.get("Conductors")
-        neut_framings = bpy.data.collections.get("Modified_Vertical_Framing")
+        conductors =  self.index.collection("Conductors")
+        neut_framings = self.index.collection("Modified_Vertical_Framing")
         if self.has_aetx:
-            toggle_visibility(conductors.objects.get('XNeut'), True)
-            toggle_visibility(neut_framings.objects.get('ExtendedFork'), True)
+            toggle_visibility(self.index.object(conductors, 'XNeut'), True)
+            toggle_visibility(self.index.object(neut_framings, 'ExtendedFork'), True)
         else:
-            toggle_visibility(conductors.objects.get('Neut'), True)
-            toggle_visibility(neut_framings.objects.get('SmFork'), True)
+            toggle_visibility(self.index.object(conductors, 'Neut'), True)
+            toggle_visibility(self.index.object(neut_framings, 'SmFork'), True)
     
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""Render-time models fitted from previous runs' frame logs."""
+
+from statistics import mean
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Per-frame features the fitted cost model regresses the render rate on
+COST_FEATURES = ('object_count', 'wire_count', 'closeness')
+
+
+def config_key(record: Dict[str, Any]) -> Tuple:
+    """Configuration key a frame's render time is grouped by."""
+    return (record.get('pole_type'), tuple(record.get('setup') or ()), record.get('phases'))
+
+
+def render_work(record: Dict[str, Any]) -> float:
+    """Relative amount of render work: samples times megapixels."""
+    return max(1e-6, record.get('samples', 1) * record.get('resolution_x', 1000) * record.get('resolution_y', 1000) / 1e6)
+
+
+def cost_features(record: Dict[str, Any]) -> List[float]:
+    """Feature vector of a frame record: a bias term, then ``COST_FEATURES``.
+
+    ``closeness`` is 10 m divided by the camera distance, so close-up views where
+    the pole fills the frame weigh more than distant ones.
+    """
+    values = {
+        'object_count': record.get('object_count', 0),
+        'wire_count': record.get('wire_count', 0),
+        'closeness': 10.0 / max(1.0, record.get('distance') or 10.0),
+    }
+    return [1.0] + [float(values[name]) for name in COST_FEATURES]
+
+
+class RenderTimeModel:
+    """Per-configuration mean render time, normalised by samples and resolution.
+
+    Predictions fall back from the full configuration key to the pole type and
+    then to the global mean when a configuration was never rendered before.
+    """
+
+    def __init__(self, default_seconds: float = 30.0):
+        self.default_seconds = default_seconds
+        self.by_config: Dict[Tuple, float] = {}
+        self.by_pole_type: Dict[str, float] = {}
+        self.global_rate: Optional[float] = None
+        self.num_records = 0
+
+    def fit(self, records: Iterable[Dict[str, Any]]) -> 'RenderTimeModel':
+        """Fit from frame records that carry a ``seconds`` timing."""
+        by_config, by_pole_type, rates = {}, {}, []
+        for record in records:
+            seconds = record.get('seconds')
+            if not seconds or record.get('dry_run'):
+                continue
+            rate = seconds / render_work(record)
+            by_config.setdefault(config_key(record), []).append(rate)
+            by_pole_type.setdefault(record.get('pole_type'), []).append(rate)
+            rates.append(rate)
+
+        self.by_config = {key: mean(values) for key, values in by_config.items()}
+        self.by_pole_type = {key: mean(values) for key, values in by_pole_type.items()}
+        self.global_rate = mean(rates) if rates else None
+        self.num_records = len(rates)
+        return self
+
+    def predict(self, record: Dict[str, Any]) -> float:
+        """Predicted render seconds for a frame described by ``record``."""
+        rate = self.by_config.get(config_key(record))
+        if rate is None:
+            rate = self.by_pole_type.get(record.get('pole_type'))
+        if rate is None:
+            rate = self.global_rate
+        if rate is None:
+            return self.default_seconds
+        return rate * render_work(record)
+
+
+class FrameCostModel:
+    """Least-squares model of render cost from scene complexity.
+
+    The render rate (seconds per unit of ``render_work``) is fitted as a linear
+    function of ``cost_features``, so frames of configurations that were never
+    rendered still get a prediction from their object and wire counts. Until
+    ``min_records`` frames with those features are logged, predictions come from
+    a ``RenderTimeModel`` fitted on the same records.
+    """
+
+    def __init__(self, default_seconds: float = 30.0, min_records: int = 20):
+        self.min_records = min_records
+        self.fallback = RenderTimeModel(default_seconds)
+        self.coefficients: Optional[np.ndarray] = None
+        self.min_rate = 0.0
+        self.num_records = 0
+
+    def fit(self, records: Iterable[Dict[str, Any]]) -> 'FrameCostModel':
+        """Fit from frame records that carry a ``seconds`` timing."""
+        records = [r for r in records if r.get('seconds') and not r.get('dry_run')]
+        self.fallback.fit(records)
+        self.num_records = len(records)
+
+        # Frames logged before the complexity counts were recorded cannot be used
+        featured = [r for r in records if 'object_count' in r]
+        self.coefficients = None
+        if len(featured) >= max(self.min_records, len(COST_FEATURES) + 1):
+            features = np.array([cost_features(r) for r in featured])
+            rates = np.array([r['seconds'] / render_work(r) for r in featured])
+            self.coefficients = np.linalg.lstsq(features, rates, rcond=None)[0]
+            # Never predict less than a tenth of the cheapest observed rate
+            self.min_rate = float(rates.min()) * 0.1
+        return self
+
+    def predict(self, record: Dict[str, Any]) -> float:
+        """Predicted render seconds for a frame described by ``record``."""
+        if self.coefficients is None or 'object_count' not in record:
+            return self.fallback.predict(record)
+        rate = float(np.dot(self.coefficients, cost_features(record)))
+        return max(self.min_rate, rate) * render_work(record)
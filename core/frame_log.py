@@ -0,0 +1,44 @@
+"""Per-frame records (scene attributes and timings) written as JSON lines.
+
+Every rendered frame appends one record to its worker's frame log. The logs feed
+the dry-run render-time model and any other offline analysis of previous runs.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List
+
+
+class FrameLog:
+    """Append-only JSON lines log of frame records."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Append a record as a single line, flushed so crashes lose at most one frame."""
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, sort_keys=True) + "\n")
+
+
+def iter_frame_records(paths: Iterable) -> Iterator[Dict[str, Any]]:
+    """Yield records from one or more frame logs, skipping truncated lines."""
+    for path in paths:
+        path = Path(path)
+        if not path.exists():
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def load_frame_records(paths: Iterable) -> List[Dict[str, Any]]:
+    """Load every record from one or more frame logs."""
+    return list(iter_frame_records(paths))
@@ -0,0 +1,460 @@
+"""Shared-memory ring buffer handing rendered frames to a local consumer process.
+
+One writer (the Blender generation loop) and up to ``MAX_READERS`` reader
+processes share a block created with ``multiprocessing.shared_memory``:
+
+    header:  magic, version, slot count, width, height, label bytes,
+             frames written, closed flag, writer PID, one progress counter
+             per reader, one PID per reader
+    slot i:  committed frame number, frame ID, label length, padding,
+             RGBA float32 pixels (alpha holds the object pass index),
+             UTF-8 JSON label mapping
+
+Frame ``n`` always lives in slot ``n % slots``. Readers get NumPy views straight
+into the slot, so nothing is copied until the consumer decides to copy.
+
+A slot is reused once every registered reader has released the frame in it.
+With the ``block`` policy the writer waits for slow readers, up to a timeout.
+Readers whose process died are unregistered by the writer, and a reader that
+made the writer time out is not waited for again until it makes progress. With
+the ``drop`` policy the writer never waits. A reader that falls more than one ring
+behind skips past the slot being rewritten and counts the frames it lost. Slot
+headers are checked before a frame is read, and ``RingFrame.valid`` tells the
+reader whether a view it still holds has been overwritten.
+
+Every generation worker publishes into its own block, named by ``ring_name``.
+Reader indices are claimed through one lock file per index, so readers attaching
+at the same time never share an index.
+
+This module has no Blender dependency so trainers can import it directly.
+"""
+
+import json
+import os
+import tempfile
+import time
+from multiprocessing import shared_memory
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+MAGIC = 0x53594E52494E4731  # "SYNRING1"
+VERSION = 2
+MAX_READERS = 16
+HEADER_FIELDS = 9
+HEADER_WORDS = HEADER_FIELDS + 2 * MAX_READERS
+HEADER_BYTES = HEADER_WORDS * 8
+SLOT_HEADER_BYTES = 32
+
+# Header field indices
+_MAGIC, _VERSION, _SLOTS, _WIDTH, _HEIGHT, _LABEL_BYTES, _WRITTEN, _CLOSED, _WRITER_PID = range(HEADER_FIELDS)
+
+
+def ring_name(name: str, worker_id: int) -> str:
+    """Shared memory block name of one generation worker's ring."""
+    return f"{name}_w{worker_id:05d}"
+
+
+def _pid_alive(pid: int) -> bool:
+    """Whether a process exists. Unknown is treated as alive."""
+    if pid <= 0:
+        return False
+    if os.name == 'nt':
+        # os.kill would terminate the process on Windows
+        try:
+            import psutil
+        except ImportError:
+            return True
+        return psutil.pid_exists(pid)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _reader_lock_path(name: str, index: int) -> str:
+    return os.path.join(tempfile.gettempdir(), f"{name}.reader{index}.lock")
+
+
+def _claim_reader_index(name: str, index: int) -> bool:
+    """Atomically claim a reader index, taking it over from a reader whose process died."""
+    path = _reader_lock_path(name, index)
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                with open(path, 'r') as f:
+                    owner = int(f.read().strip() or 0)
+            except (OSError, ValueError):
+                return False
+            if owner and _pid_alive(owner):
+                return False
+            # The owner died without closing; remove its lock and try once more
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            continue
+        with os.fdopen(fd, 'w') as f:
+            f.write(str(os.getpid()))
+        return True
+    return False
+
+
+def _release_reader_index(name: str, index: int) -> None:
+    try:
+        os.unlink(_reader_lock_path(name, index))
+    except FileNotFoundError:
+        pass
+
+
+def _slot_size(width: int, height: int, label_bytes: int) -> int:
+    size = SLOT_HEADER_BYTES + width * height * 4 * 4 + label_bytes
+    return (size + 63) // 64 * 64
+
+
+class _Ring:
+    """Views over the header and slots of an attached shared-memory block."""
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self.shm = shm
+        if shm.size < HEADER_BYTES:
+            raise ValueError(f"Shared memory block {shm.name} is not a frame ring")
+        self.header = np.ndarray((HEADER_WORDS,), dtype=np.uint64, buffer=shm.buf)
+        if int(self.header[_MAGIC]) != MAGIC or int(self.header[_VERSION]) != VERSION:
+            raise ValueError(f"Shared memory block {shm.name} is not a frame ring")
+        self.num_slots = int(self.header[_SLOTS])
+        self.width = int(self.header[_WIDTH])
+        self.height = int(self.header[_HEIGHT])
+        self.label_bytes = int(self.header[_LABEL_BYTES])
+        self.slot_size = _slot_size(self.width, self.height, self.label_bytes)
+        self.readers = self.header[HEADER_FIELDS:HEADER_FIELDS + MAX_READERS]
+        self.reader_pids = self.header[HEADER_FIELDS + MAX_READERS:]
+
+    @property
+    def written(self) -> int:
+        return int(self.header[_WRITTEN])
+
+    @property
+    def closed(self) -> bool:
+        return bool(self.header[_CLOSED])
+
+    def clear_dead_readers(self) -> None:
+        """Unregister readers whose process exited without closing."""
+        for index in range(MAX_READERS):
+            pid = int(self.reader_pids[index])
+            if self.readers[index] and pid and not _pid_alive(pid):
+                self.readers[index] = 0
+                self.reader_pids[index] = 0
+
+    def slot_header(self, slot: int) -> np.ndarray:
+        offset = HEADER_BYTES + slot * self.slot_size
+        return np.ndarray((4,), dtype=np.uint64, buffer=self.shm.buf, offset=offset)
+
+    def slot_pixels(self, slot: int) -> np.ndarray:
+        """Flat float32 RGBA view of a slot, in Blender's bottom-up row order."""
+        offset = HEADER_BYTES + slot * self.slot_size + SLOT_HEADER_BYTES
+        return np.ndarray((self.width * self.height * 4,), dtype=np.float32, buffer=self.shm.buf, offset=offset)
+
+    def slot_labels(self, slot: int) -> memoryview:
+        offset = HEADER_BYTES + slot * self.slot_size + SLOT_HEADER_BYTES + self.width * self.height * 16
+        return self.shm.buf[offset:offset + self.label_bytes]
+
+    def release_views(self) -> None:
+        # SharedMemory.close() fails while NumPy views still export its buffer
+        self.header = self.readers = self.reader_pids = None
+
+
+def _remove_stale_block(name: str) -> None:
+    """
+    Unlink a block left behind under ``name`` by a writer that closed or died.
+
+    Raises:
+        RuntimeError: If a live writer still owns the block
+    """
+    stale = shared_memory.SharedMemory(name=name)
+    try:
+        ring = _Ring(stale)
+    except ValueError:
+        ring = None
+    if ring is not None:
+        live = not ring.closed and _pid_alive(int(ring.header[_WRITER_PID]))
+        ring.release_views()
+        if live:
+            stale.close()
+            raise RuntimeError(f"Frame ring {name} is owned by a running writer")
+    stale.close()
+    stale.unlink()
+
+
+class FrameRingWriter:
+    """Creates the ring and publishes frames into it."""
+
+    def __init__(self, name: str, width: int, height: int, num_slots: int = 4,
+                 label_bytes: int = 65536, policy: str = 'block', timeout: float = 60.0):
+        if policy not in ('block', 'drop'):
+            raise ValueError(f"Unknown frame ring policy: {policy}")
+        label_bytes = (label_bytes + 7) // 8 * 8
+        size = HEADER_BYTES + num_slots * _slot_size(width, height, label_bytes)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # A previous run crashed without unlinking its block
+            _remove_stale_block(name)
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        header = np.ndarray((HEADER_WORDS,), dtype=np.uint64, buffer=shm.buf)
+        header[:] = 0
+        header[_SLOTS], header[_WIDTH], header[_HEIGHT] = num_slots, width, height
+        header[_LABEL_BYTES] = label_bytes
+        header[_WRITER_PID] = os.getpid()
+        header[_VERSION] = VERSION
+        header[_MAGIC] = MAGIC
+        del header
+
+        self.ring = _Ring(shm)
+        self.policy = policy
+        self.timeout = timeout
+        # Reader index -> progress at which it made acquire time out
+        self.stalled: Dict[int, int] = {}
+
+    def encode_labels(self, frame_id: int, labels: Dict[Any, str]) -> bytes:
+        """
+        Encode a frame's label mapping for its slot.
+
+        Raises:
+            ValueError: If the mapping does not fit in ``label_bytes``
+        """
+        encoded = json.dumps({str(k): v for k, v in labels.items()}).encode('utf-8')
+        if len(encoded) > self.ring.label_bytes:
+            raise ValueError(f"Label mapping of frame {frame_id} exceeds {self.ring.label_bytes} bytes")
+        return encoded
+
+    def _blocking_readers(self, frame: int) -> list:
+        """Readers still holding the frame that last used ``frame``'s slot."""
+        ring = self.ring
+        blocking = []
+        for index, progress in enumerate(ring.readers):
+            progress = int(progress)
+            if not progress or progress - 1 > frame - ring.num_slots:
+                continue
+            if self.stalled.get(index) == progress:
+                continue
+            blocking.append(index)
+        return blocking
+
+    def acquire(self) -> Optional[np.ndarray]:
+        """
+        Wait for the next slot to be free and return its flat RGBA float32 view.
+
+        Fill the view (e.g. with ``Image.pixels.foreach_get``) and then call ``commit``.
+
+        Returns:
+            Slot pixel view, or None if a reader blocked the slot past the timeout
+        """
+        ring = self.ring
+        frame = ring.written
+        deadline = time.time() + self.timeout
+        if self.policy == 'block':
+            ring.clear_dead_readers()
+            # A stalled reader is waited for again once it moves
+            self.stalled = {index: progress for index, progress in self.stalled.items()
+                            if int(ring.readers[index]) == progress}
+        while self.policy == 'block':
+            # Every reader must be done with the frame that last used this slot
+            blocking = self._blocking_readers(frame)
+            if not blocking:
+                break
+            if time.time() > deadline:
+                ring.clear_dead_readers()
+                for index in self._blocking_readers(frame):
+                    self.stalled[index] = int(ring.readers[index])
+                return None
+            time.sleep(0.005)
+        # Mark the slot as being rewritten so readers holding it see it as invalid
+        ring.slot_header(frame % ring.num_slots)[0] = 0
+        return ring.slot_pixels(frame % ring.num_slots)
+
+    def commit(self, frame_id: int, labels) -> None:
+        """
+        Publish the frame written into the slot returned by ``acquire``.
+
+        Args:
+            frame_id: Frame ID stored with the slot
+            labels: Label mapping, or its ``encode_labels`` bytes checked before ``acquire``
+        """
+        ring = self.ring
+        frame = ring.written
+        slot = frame % ring.num_slots
+        encoded = labels if isinstance(labels, bytes) else self.encode_labels(frame_id, labels)
+        ring.slot_labels(slot)[:len(encoded)] = encoded
+        slot_header = ring.slot_header(slot)
+        slot_header[1], slot_header[2] = frame_id, len(encoded)
+        # Publish the slot before the frame count so readers never see a half-written frame
+        slot_header[0] = frame + 1
+        ring.header[_WRITTEN] = frame + 1
+
+    def write(self, frame_id: int, pixels: np.ndarray, labels: Dict[Any, str]) -> bool:
+        """Copy an RGBA float32 array into the ring. Returns False if it timed out."""
+        encoded = self.encode_labels(frame_id, labels)
+        view = self.acquire()
+        if view is None:
+            return False
+        view[:] = pixels.reshape(-1)
+        self.commit(frame_id, encoded)
+        return True
+
+    def close(self, unlink: bool = True) -> None:
+        """Tell readers no more frames follow and release the block."""
+        self.ring.header[_CLOSED] = 1
+        shm = self.ring.shm
+        self.ring.release_views()
+        shm.close()
+        if unlink:
+            shm.unlink()
+
+
+class RingFrame:
+    """A frame in a ring slot. Its arrays are views into shared memory."""
+
+    def __init__(self, ring: _Ring, number: int, frame_id: int, labels: Dict[str, str]):
+        self._ring = ring
+        self.number = number
+        self.slot = number % ring.num_slots
+        self.frame_id = frame_id
+        self.labels = labels
+        # Blender stores rows bottom-up; flip through the view, not a copy
+        self.pixels = ring.slot_pixels(self.slot).reshape(ring.height, ring.width, 4)[::-1]
+
+    @classmethod
+    def read(cls, ring: _Ring, number: int) -> Optional['RingFrame']:
+        """
+        Read a frame's ID and labels from its slot.
+
+        Returns:
+            The frame, or None if the slot no longer holds it (the writer is
+            rewriting it for a later frame)
+        """
+        slot_header = ring.slot_header(number % ring.num_slots)
+        if int(slot_header[0]) != number + 1:
+            return None
+        frame_id, length = int(slot_header[1]), int(slot_header[2])
+        try:
+            labels = json.loads(bytes(ring.slot_labels(number % ring.num_slots)[:length]).decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            labels = None
+        # The writer zeroes the slot number before rewriting, so an unchanged one means nothing was torn
+        if int(slot_header[0]) != number + 1:
+            return None
+        if labels is None:
+            raise ValueError(f"Frame ring slot of frame {number} holds unreadable labels")
+        return cls(ring, number, frame_id, labels)
+
+    @property
+    def rgb(self) -> np.ndarray:
+        """Linear RGB float32 view, top row first."""
+        return self.pixels[..., :3]
+
+    @property
+    def index(self) -> np.ndarray:
+        """Object pass index per pixel as a float32 view."""
+        return self.pixels[..., 3]
+
+    def index_mask(self) -> np.ndarray:
+        """Copy of the pass index as the uint8 mask written to Mask PNGs."""
+        return np.rint(self.index).astype(np.uint8)
+
+    def valid(self) -> bool:
+        """Whether the slot still holds this frame (always true under the block policy)."""
+        return int(self._ring.slot_header(self.slot)[0]) == self.number + 1
+
+
+class FrameRingReader:
+    """Attaches to a ring from another process and receives frames without copies."""
+
+    def __init__(self, name: str, from_start: bool = False):
+        """
+        Args:
+            name: Shared memory block name used by the writer
+            from_start: Start at the oldest frame still in the ring instead of the next new one
+        """
+        # Readers must not unlink the block at exit; only the writer owns it
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 always tracks attached blocks
+            shm = shared_memory.SharedMemory(name=name)
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        self.ring = _Ring(shm)
+        self.name = name
+
+        # Claim an index through its lock file so concurrent readers never share one
+        self.reader_index = next((i for i in range(MAX_READERS) if _claim_reader_index(name, i)), None)
+        if self.reader_index is None:
+            self.ring.release_views()
+            shm.close()
+            raise RuntimeError(f"Frame ring {name} already has {MAX_READERS} readers")
+        written = self.ring.written
+        self.next_frame = max(0, written - self.ring.num_slots) if from_start else written
+        self.ring.reader_pids[self.reader_index] = os.getpid()
+        self.ring.readers[self.reader_index] = self.next_frame + 1
+        self.dropped = 0
+
+    def next(self, timeout: Optional[float] = None) -> Optional[RingFrame]:
+        """
+        Wait for the next frame.
+
+        Returns:
+            The frame, or None on timeout or when the writer closed the ring and
+            every frame was read
+        """
+        ring = self.ring
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            while ring.written <= self.next_frame:
+                if ring.closed or (deadline is not None and time.time() > deadline):
+                    return None
+                time.sleep(0.005)
+
+            # Under the drop policy the writer may have lapped this reader. The
+            # oldest frame's slot is the one the writer reuses next, so skip past it
+            oldest = ring.written - ring.num_slots
+            if self.next_frame < oldest:
+                self.dropped += oldest + 1 - self.next_frame
+                self.next_frame = oldest + 1
+                self.ring.readers[self.reader_index] = self.next_frame + 1
+            frame = RingFrame.read(ring, self.next_frame)
+            if frame is not None:
+                return frame
+            # The slot was zeroed for a later frame before or while it was read
+            self.dropped += 1
+            self.next_frame += 1
+            self.ring.readers[self.reader_index] = self.next_frame + 1
+
+    def release(self, frame: RingFrame) -> None:
+        """Hand a frame's slot back to the writer. Views into it must no longer be used."""
+        self.next_frame = max(self.next_frame, frame.number + 1)
+        self.ring.readers[self.reader_index] = self.next_frame + 1
+
+    def __iter__(self):
+        """Yield frames until the writer closes the ring, releasing each one on the next step."""
+        while True:
+            frame = self.next()
+            if frame is None:
+                return
+            yield frame
+            self.release(frame)
+
+    def close(self) -> None:
+        """Unregister from the ring and detach."""
+        self.ring.readers[self.reader_index] = 0
+        self.ring.reader_pids[self.reader_index] = 0
+        _release_reader_index(self.name, self.reader_index)
+        shm = self.ring.shm
+        self.ring.release_views()
+        shm.close()
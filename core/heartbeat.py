@@ -0,0 +1,62 @@
+"""Heartbeat and quarantine files shared by the generation loop and its supervisor."""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+def write_json_atomic(path, data: Dict[str, Any]) -> None:
+    """Write JSON through a temporary file and rename so readers never see partial files."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def read_json(path) -> Optional[Dict[str, Any]]:
+    """Read a JSON file, returning None if it is missing or unreadable."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+class Heartbeat:
+    """Records which frame and stage the generation loop is in.
+
+    The supervisor reads the file to detect hung frames and to know which
+    frame a crashed child was working on.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path) if path else None
+        self.frame: Dict[str, Any] = {}
+
+    def start_frame(self, spec: Dict[str, Any]) -> None:
+        """Mark the start of a frame described by a scene spec."""
+        self.frame = {
+            'frame_id': spec['frame_id'],
+            'sequence': spec['sequence'],
+            'seed': spec['seed'],
+            'frame_start': time.time(),
+        }
+        self.beat('start')
+
+    def beat(self, stage: str, **extra) -> None:
+        """Record that the current frame reached ``stage``."""
+        if self.path is None:
+            return
+        write_json_atomic(self.path, dict(self.frame, stage=stage, time=time.time(),
+                                          pid=os.getpid(), **extra))
+
+
+def load_quarantine(path) -> Dict[str, Any]:
+    """Return the quarantined frames keyed by frame ID (as strings)."""
+    if not path:
+        return {}
+    return read_json(path) or {}
@@ -0,0 +1,170 @@
+"""Level-of-detail choices from projected on-screen size.
+
+A wire or mesh far from the camera covers few pixels, so tessellating it finely
+only adds triangles and BVH work. These functions pick the coarsest detail
+whose outline stays within a pixel tolerance of the full-detail geometry, so
+the segmentation mask does not change by more than that tolerance. Sizes are
+projected with a pinhole camera: an extent of ``s`` meters at depth ``d``
+covers ``s * focal_pixels / d`` pixels.
+
+Heavy meshes get decimated variants named ``<mesh>.LOD<level>`` (see
+scripts/build_mesh_lods.py), which ``utils.mesh_lod`` swaps in per frame.
+``lod_savings`` estimates from the frame logs how much render time each level
+saved. This module has no Blender dependency.
+"""
+
+import math
+import re
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+
+from core.cost_model import FrameCostModel
+
+_LOD_NAME = re.compile(r'^(?P<mesh>.+)\.LOD(?P<level>\d+)$')
+
+
+def focal_pixels(lens: float, sensor_width: float, sensor_height: float, sensor_fit: str,
+                 resolution_x: int, resolution_y: int) -> float:
+    """
+    Focal length of a camera in pixels.
+
+    Args:
+        lens: Focal length in millimeters
+        sensor_width, sensor_height: Sensor size in millimeters
+        sensor_fit: Blender's ``AUTO``, ``HORIZONTAL`` or ``VERTICAL``
+        resolution_x, resolution_y: Render resolution in pixels
+
+    Returns:
+        Pixels covered by one meter at a depth of one meter
+    """
+    if sensor_fit == 'VERTICAL':
+        return lens / sensor_height * resolution_y
+    if sensor_fit == 'HORIZONTAL' or resolution_x >= resolution_y:
+        return lens / sensor_width * resolution_x
+    # AUTO fits the sensor width to the larger dimension
+    return lens / sensor_width * resolution_y
+
+
+def curve_resolution(curvature_px: float, tolerance_px: float, max_resolution: int) -> int:
+    """
+    Segments per bezier span so the polyline stays within ``tolerance_px`` of the curve.
+
+    A cubic span whose control polygon has second differences of at most
+    ``curvature_px`` deviates from its ``n``-segment polyline by at most
+    ``0.75 * curvature_px / n**2``.
+
+    Args:
+        curvature_px: Largest ``|P0 - 2 P1 + P2|`` of the span's control points, in pixels
+        tolerance_px: Allowed deviation in pixels
+        max_resolution: Full-detail resolution
+
+    Returns:
+        Resolution between 1 and ``max_resolution``
+    """
+    if curvature_px <= 0:
+        return 1
+    needed = math.ceil(math.sqrt(0.75 * curvature_px / max(tolerance_px, 1e-6)))
+    return max(1, min(max_resolution, needed))
+
+
+def bevel_resolution(radius_px: float, tolerance_px: float, max_resolution: int) -> int:
+    """
+    Round bevel resolution so the cross-section stays within ``tolerance_px`` of a circle.
+
+    A round bevel of resolution ``r`` is a polygon of ``4 + 2 r`` sides, which
+    deviates from its circle by ``radius * (1 - cos(pi / sides))``.
+
+    Args:
+        radius_px: Bevel radius in pixels
+        tolerance_px: Allowed deviation in pixels
+        max_resolution: Full-detail bevel resolution
+
+    Returns:
+        Resolution between 0 and ``max_resolution``
+    """
+    for resolution in range(max_resolution + 1):
+        if radius_px * (1 - math.cos(math.pi / (4 + 2 * resolution))) <= tolerance_px:
+            return resolution
+    return max_resolution
+
+
+
+def lod_mesh_name(mesh_name: str, level: int) -> str:
+    """Name of the decimated variant of a mesh at a detail level (1 = first coarser level)."""
+    return f"{mesh_name}.LOD{level}"
+
+
+def parse_lod_name(name: str) -> Optional[Tuple[str, int]]:
+    """(original mesh name, level) of a variant's name, or None for other meshes."""
+    match = _LOD_NAME.match(name)
+    if not match:
+        return None
+    return match.group('mesh'), int(match.group('level'))
+
+
+def lod_level(size_px: float, thresholds_px: Sequence[float]) -> int:
+    """
+    Detail level for an object covering ``size_px`` pixels.
+
+    Args:
+        size_px: Projected size of the object
+        thresholds_px: Descending sizes below which each coarser level is used,
+            e.g. ``[600, 200]``: level 0 from 600 px, level 1 from 200 px, then level 2
+
+    Returns:
+        0 for full detail, higher for coarser variants
+    """
+    level = 0
+    for threshold in thresholds_px:
+        if size_px >= threshold:
+            break
+        level += 1
+    return level
+
+
+def lod_savings(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Estimate the render time each LOD level saved, from frame logs.
+
+    A cost model fitted on frames rendered without LOD swaps predicts the
+    full-detail render time of every frame with swaps. The difference to the
+    measured ``render_seconds`` is split between levels in proportion to the
+    faces each level removed.
+
+    Args:
+        records: Frame records; frames rendered with LODs carry ``lod_objects``
+            and ``lod_faces_removed``, lists indexed by level
+
+    Returns:
+        Dictionary with the number of reference and LOD frames and, per level,
+        swapped objects, removed faces and estimated seconds saved
+    """
+    records = [r for r in records if r.get('render_seconds') and not r.get('dry_run')]
+    # Level 0 counts objects that had variants but kept full detail
+    reference = [r for r in records if not any((r.get('lod_objects') or [])[1:])]
+    swapped = [r for r in records if any((r.get('lod_objects') or [])[1:])]
+    # The cost model is fitted on total seconds; fit it on render seconds here
+    model = FrameCostModel().fit(dict(r, seconds=r['render_seconds']) for r in reference)
+
+    levels: List[Dict[str, float]] = []
+    for record in swapped:
+        objects, faces = record['lod_objects'], record.get('lod_faces_removed') or []
+        saved = model.predict(record) - record['render_seconds'] if model.num_records else 0.0
+        total_faces = sum(faces)
+        while len(levels) < len(objects):
+            levels.append({'frames': 0, 'objects': 0, 'faces_removed': 0, 'seconds_saved': 0.0})
+        for level, count in enumerate(objects):
+            if not count:
+                continue
+            removed = faces[level] if level < len(faces) else 0
+            levels[level]['frames'] += 1
+            levels[level]['objects'] += count
+            levels[level]['faces_removed'] += removed
+            if total_faces:
+                levels[level]['seconds_saved'] += saved * removed / total_faces
+    for entry in levels:
+        entry['seconds_saved_per_frame'] = entry['seconds_saved'] / entry['frames'] if entry['frames'] else 0.0
+    return {
+        'reference_frames': len(reference),
+        'lod_frames': len(swapped),
+        'levels': {str(level): entry for level, entry in enumerate(levels) if level and entry['frames']},
+    }
@@ -0,0 +1,114 @@
+"""Shared logging setup with per-module loggers, rate limiting and buffered file output.
+
+Modules get their logger with ``logger = get_logger(__name__)``. Nothing is printed
+until ``configure_logging`` is called with the ``logging`` section of rendering.yaml;
+the default level is WARNING so long production runs stay quiet.
+"""
+
+import copy
+import logging
+import logging.handlers
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+ROOT_LOGGER = "synthetic"
+DEFAULT_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return the logger for a module, namespaced under the project root logger."""
+    if name == "__main__":
+        name = "main"
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+class RateLimitFilter(logging.Filter):
+    """Drop repeats of the same message (same call site and template) within an interval.
+
+    The first record after the interval expires carries a note with how many
+    repeats were suppressed in between. Each handler needs its own filter: the
+    filter counts only the records its handler saw, and it hands the note to
+    that handler on a copy so other handlers get the record unchanged.
+    """
+
+    def __init__(self, handler: logging.Handler, interval: float = 60.0, min_level: int = logging.WARNING):
+        super().__init__()
+        self.handler = handler
+        self.interval = interval
+        self.min_level = min_level
+        self._last_emit: Dict[Tuple[str, int, str], float] = {}
+        self._suppressed: Dict[Tuple[str, int, str], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level or self.interval <= 0 or getattr(record, 'rate_limit_note', False):
+            return True
+
+        key = (record.pathname, record.lineno, str(record.msg))
+        now = time.monotonic()
+        last = self._last_emit.get(key)
+        if last is not None and now - last < self.interval:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return False
+
+        self._last_emit[key] = now
+        suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            note = copy.copy(record)
+            note.msg = f"{record.msg} (repeated {suppressed} more times)"
+            note.rate_limit_note = True
+            self.handler.handle(note)
+            return False
+        return True
+
+
+def configure_logging(config: Optional[Dict[str, Any]] = None) -> logging.Logger:
+    """Configure the project root logger from the ``logging`` section of a config.
+
+    Recognised keys:
+        level:        root level for project loggers (default WARNING)
+        modules:      mapping of module name -> level overrides, e.g. {rendering.renderer: DEBUG}
+        console:      whether to log to stderr (default True)
+        file:         optional log file path; records are buffered in memory
+        buffer_size:  records buffered before the file is written (default 1000)
+        rate_limit:   seconds between repeats of the same warning (default 60, 0 disables)
+    """
+    settings = (config or {}).get('logging', {}) or {}
+    root = logging.getLogger(ROOT_LOGGER)
+
+    # Replace handlers from a previous call so reconfiguring does not duplicate output
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+    root.setLevel(settings.get('level', 'WARNING').upper())
+    root.propagate = False
+    formatter = logging.Formatter(settings.get('format', DEFAULT_FORMAT))
+    rate_limit = settings.get('rate_limit', 60)
+
+    if settings.get('console', True):
+        console = logging.StreamHandler(sys.stderr)
+        console.setFormatter(formatter)
+        console.addFilter(RateLimitFilter(console, rate_limit))
+        root.addHandler(console)
+
+    log_file = settings.get('file')
+    if log_file:
+        log_path = Path(log_file)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.FileHandler(log_path, encoding='utf-8')
+        file_handler.setFormatter(formatter)
+        # Buffer records in memory and write them in bulk; errors flush immediately
+        buffered = logging.handlers.MemoryHandler(
+            capacity=settings.get('buffer_size', 1000),
+            flushLevel=logging.ERROR,
+            target=file_handler,
+        )
+        buffered.addFilter(RateLimitFilter(buffered, rate_limit))
+        root.addHandler(buffered)
+
+    for module, level in (settings.get('modules', {}) or {}).items():
+        get_logger(module).setLevel(str(level).upper())
+
+    return root
@@ -0,0 +1,135 @@
+"""Offline asset manifest extracted from the project .blend.
+
+``scripts/extract_manifest.py`` runs once inside Blender and writes the collection
+tree, every object's type, collections, custom properties (``annotate``,
+``label``, ``group_id``, ...), world bounding box and materials, and the
+wire-attachment empty pairs to JSON. This module reads that file in plain Python.
+Planners, the annotation catalog and cost models can then query the assets
+without Blender. Names the code looks up can also be checked before a long run
+starts.
+"""
+
+import fnmatch
+import json
+import re
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+MANIFEST_VERSION = 1
+
+# Name lookups in the generator sources: bpy.data.collections.get(<name>),
+# <collection>.children.get(<name>), <collection>.objects.get(<f-string>), bpy.data.materials[<name>], ...
+_LOOKUP = re.compile(
+    r"""(collections|children|objects|materials)(?:\.get\(|\[)\s*f?(['"])(?P<name>[^'"]+)\2""")
+# The same lookups through utils.scene_index: index.collection(<name or path>),
+# index.child(<collection>, <name>), index.object(<collection>, <name>). The
+# pattern is a lookahead so nested lookups on one line are all found
+_INDEX_LOOKUP = re.compile(
+    r"""(?=index\.(?:(collection)\(|(child|object)\([^,()]+(?:\([^()]*\))?[^,()]*,)\s*f?(['"])(?P<name>[^'"]+)\3)""")
+_KINDS = {'collections': 'collection', 'children': 'collection', 'objects': 'object', 'materials': 'material',
+          'collection': 'collection', 'child': 'collection', 'object': 'object'}
+
+
+class AssetManifest:
+    """Queries over a manifest loaded from JSON."""
+
+    def __init__(self, data: Dict[str, Any]):
+        if data.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported asset manifest version: {data.get('version')}")
+        self.data = data
+        self.collections: Dict[str, Dict[str, Any]] = data['collections']
+        self.objects: Dict[str, Dict[str, Any]] = data['objects']
+        self.materials: List[str] = data['materials']
+
+    @classmethod
+    def load(cls, path) -> 'AssetManifest':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def has(self, kind: str, name: str) -> bool:
+        """Whether a collection, object or material exists; ``name`` may contain wildcards."""
+        names = {'collection': self.collections, 'object': self.objects, 'material': self.materials}[kind]
+        if any(char in name for char in '*?['):
+            return any(fnmatch.fnmatchcase(candidate, name) for candidate in names)
+        return name in names
+
+    def collection_objects(self, name: str, recursive: bool = True) -> List[str]:
+        """Objects of a collection, including those of its child collections by default."""
+        collection = self.collections[name]
+        objects = list(collection['objects'])
+        if recursive:
+            for child in collection['children']:
+                objects.extend(self.collection_objects(child))
+        return objects
+
+    def annotated_objects(self, collection: Optional[str] = None) -> Dict[str, str]:
+        """Object name to label for every object with ``annotate`` set, optionally within one collection."""
+        names = self.collection_objects(collection) if collection else self.objects
+        return {name: self.objects[name]['props'].get('label')
+                for name in names if self.objects[name]['props'].get('annotate') == "True"}
+
+    def labels(self) -> Dict[str, List[str]]:
+        """Every annotation label and the objects that carry it."""
+        labels = {}
+        for name, label in self.annotated_objects().items():
+            labels.setdefault(label, []).append(name)
+        return labels
+
+    def wire_pairs(self, collection: Optional[str] = None) -> List[Tuple[str, str]]:
+        """Wire attachment empty pairs, optionally limited to one collection and its children."""
+        pairs = [tuple(pair['empties']) for pair in self.data['wire_pairs']]
+        if collection is None:
+            return pairs
+        objects = set(self.collection_objects(collection))
+        return [pair for pair in pairs if pair[0] in objects]
+
+    def bbox(self, name: str) -> Tuple[List[float], List[float]]:
+        """World-space (min, max) corners of an object's bounding box."""
+        box = self.objects[name]['bbox']
+        return box[0], box[1]
+
+    def validate(self, references: Iterable[Tuple[str, str, str]]) -> List[Tuple[str, str, str]]:
+        """Return the ``(kind, name, location)`` references that do not exist in the manifest."""
+        return [(kind, name, location) for kind, name, location in references if not self.has(kind, name)]
+
+
+def source_references(paths: Iterable) -> List[Tuple[str, str, str]]:
+    """
+    Find literal collection, object and material names looked up in Python sources.
+
+    f-string placeholders become wildcards, so ``f"SurgeArrester{i}"`` is checked
+    as ``SurgeArrester*``. Lookups by variable are skipped.
+
+    Returns:
+        List of (kind, name, "file:line") tuples
+    """
+    references = []
+    for path in paths:
+        path = Path(path)
+        files = sorted(path.rglob("*.py")) if path.is_dir() else [path]
+        for file in files:
+            for number, line in enumerate(file.read_text(encoding='utf-8').splitlines(), 1):
+                for match in _LOOKUP.finditer(line):
+                    name = re.sub(r"\{[^}]*\}", "*", match.group('name'))
+                    references.append((_KINDS[match.group(1)], name, f"{file}:{number}"))
+                for match in _INDEX_LOOKUP.finditer(line):
+                    kind = _KINDS[match.group(1) or match.group(2)]
+                    for name in re.sub(r"\{[^}]*\}", "*", match.group('name')).split('/'):
+                        references.append((kind, name, f"{file}:{number}"))
+    return references
+
+
+def asset_map_references(asset_map: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+    """Collection and material names listed in ``asset_collections.yaml``."""
+    references = []
+    always = asset_map.get('always', {}) or {}
+    for name in always.get('collections', []):
+        references.append(('collection', name, 'asset_collections.yaml:always'))
+    for name in always.get('materials', []):
+        references.append(('material', name, 'asset_collections.yaml:always'))
+    for section in ('pole_types', 'components'):
+        for key, names in (asset_map.get(section, {}) or {}).items():
+            references.extend(('collection', name, f'asset_collections.yaml:{section}.{key}') for name in names)
+    for name in asset_map.get('anomaly_materials', []) or []:
+        references.append(('material', name, 'asset_collections.yaml:anomaly_materials'))
+    return references
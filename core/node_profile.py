@@ -0,0 +1,72 @@
+"""Per-node throughput profiles and CPU pinning for worker processes.
+
+A node profile records the worker count, Cycles threads per worker and render
+device that gave the best throughput on a machine. ``scripts/autotune.py`` writes
+it, and the supervisor reads it when it is not told how many workers to start.
+Profiles are JSON files named after the host in ``autotune.profile_dir``.
+"""
+
+import os
+import socket
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from core.heartbeat import read_json, write_json_atomic
+
+
+def profile_path(config: Dict[str, Any], project_root, hostname: Optional[str] = None) -> Path:
+    """Path of a host's node profile (this host by default)."""
+    profile_dir = Path((config.get('autotune', {}) or {}).get('profile_dir', 'configs/node_profiles'))
+    if not profile_dir.is_absolute():
+        profile_dir = Path(project_root) / profile_dir
+    return profile_dir / f"{hostname or socket.gethostname()}.json"
+
+
+def load_node_profile(config: Dict[str, Any], project_root) -> Optional[Dict[str, Any]]:
+    """This host's node profile, or None if the node was never tuned."""
+    return read_json(profile_path(config, project_root))
+
+
+def write_node_profile(config: Dict[str, Any], project_root, profile: Dict[str, Any]) -> Path:
+    """Write this host's node profile and return its path."""
+    path = profile_path(config, project_root)
+    write_json_atomic(path, profile)
+    return path
+
+
+def available_cpus() -> List[int]:
+    """CPUs this process may run on."""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def split_cpus(workers: int) -> List[List[int]]:
+    """Split the available CPUs into one contiguous, disjoint set per worker."""
+    cpus = available_cpus()
+    size = max(1, len(cpus) // workers)
+    return [cpus[i * size:(i + 1) * size] or cpus for i in range(workers)]
+
+
+def pin_to_cpus(cpus: List[int]):
+    """``preexec_fn`` pinning a child process to ``cpus``, or None where affinity is unsupported."""
+    if not cpus or not hasattr(os, 'sched_setaffinity'):
+        return None
+    return lambda: os.sched_setaffinity(0, cpus)
+
+
+def total_memory_bytes() -> Optional[int]:
+    """Physical memory of this node, or None if it cannot be read."""
+    try:
+        import psutil
+        return psutil.virtual_memory().total
+    except ImportError:
+        pass
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemTotal:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
@@ -0,0 +1,231 @@
+"""Output directory layout and frame ID resolution shared by rendering and post-processing.
+
+This module has no Blender dependency so it can be used from ``process_output.py``
+and the progress window as well as from inside Blender.
+"""
+
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional
+
+# Frame IDs are 64-bit: the top bits hold the worker ID so IDs never collide
+# across workers, the remaining bits hold the worker-local sequence number.
+WORKER_BITS = 16
+SEQUENCE_BITS = 64 - WORKER_BITS
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+SEQUENCE_MASK = (1 << SEQUENCE_BITS) - 1
+FRAME_ID_WIDTH = 20  # Digits needed for 2**64 - 1
+
+
+def make_frame_id(worker_id: int, sequence: int) -> int:
+    """Pack a worker ID and a worker-local sequence number into a 64-bit frame ID."""
+    if not 0 <= worker_id <= MAX_WORKER_ID:
+        raise ValueError(f"Worker ID {worker_id} out of range 0-{MAX_WORKER_ID}")
+    if not 0 <= sequence <= SEQUENCE_MASK:
+        raise ValueError(f"Sequence number {sequence} out of range")
+    return (worker_id << SEQUENCE_BITS) | sequence
+
+
+def split_frame_id(frame_id: int):
+    """Return the (worker_id, sequence) pair encoded in a frame ID."""
+    return frame_id >> SEQUENCE_BITS, frame_id & SEQUENCE_MASK
+
+
+class OutputLayout:
+    """Resolves where every per-frame output file lives.
+
+    Two modes are supported:
+        flat:    legacy layout, ``Image_0001.png``/``Mask_0001.png`` directly in
+                 ``base_path`` with a single ``all_frame_mappings.json``.
+        sharded: ``base_path/<worker>/<shard>/Image_<frame_id>.png`` where each
+                 shard directory holds at most ``shard_size`` frames and has its
+                 own ``frame_mappings.json``.
+    """
+
+    def __init__(self, base_path, mode: str = 'flat', shard_size: int = 1000,
+                 worker_id: int = 0, file_prefix: str = 'render_', file_padding: int = 4):
+        if mode not in ('flat', 'sharded'):
+            raise ValueError(f"Unknown output layout mode: {mode}")
+        if shard_size < 1:
+            raise ValueError("shard_size must be at least 1")
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"Worker ID {worker_id} out of range 0-{MAX_WORKER_ID}")
+
+        self.base_path = Path(base_path)
+        self.mode = mode
+        self.shard_size = shard_size
+        self.worker_id = worker_id
+        self.file_prefix = file_prefix
+        self.file_padding = file_padding
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], worker_id: Optional[int] = None,
+                    base_path=None) -> 'OutputLayout':
+        """Build a layout from the ``output`` section of rendering.yaml."""
+        output = config['output']
+        layout = output.get('layout', {}) or {}
+        return cls(
+            output['base_path'] if base_path is None else base_path,
+            mode=layout.get('mode', 'flat'),
+            shard_size=layout.get('shard_size', 1000),
+            worker_id=layout.get('worker_id', 0) if worker_id is None else worker_id,
+            file_prefix=output.get('file_prefix', 'render_'),
+            file_padding=output.get('file_padding', 4),
+        )
+
+    @property
+    def sharded(self) -> bool:
+        return self.mode == 'sharded'
+
+    # Frame IDs and keys
+
+    def frame_id(self, sequence: int) -> int:
+        """Frame ID for this layout's worker. Flat layouts use the sequence directly."""
+        if not self.sharded:
+            return sequence
+        return make_frame_id(self.worker_id, sequence)
+
+    def frame_key(self, frame_id: int) -> str:
+        """Key used for a frame in mapping files and output filenames."""
+        if not self.sharded:
+            return f"{self.file_prefix}{frame_id:0{self.file_padding}d}"
+        return f"{frame_id:0{FRAME_ID_WIDTH}d}"
+
+    def parse_key(self, key: str) -> int:
+        """Inverse of ``frame_key``."""
+        if not self.sharded:
+            return int(key.rsplit('_', 1)[-1])
+        return int(key)
+
+    # Paths
+
+    def worker_dir(self, worker_id: Optional[int] = None) -> Path:
+        if not self.sharded:
+            return self.base_path
+        worker_id = self.worker_id if worker_id is None else worker_id
+        return self.base_path / f"w{worker_id:05d}"
+
+    def shard_dir(self, frame_id: int) -> Path:
+        """Directory holding the outputs of a frame."""
+        if not self.sharded:
+            return self.base_path
+        worker_id, sequence = split_frame_id(frame_id)
+        return self.worker_dir(worker_id) / f"{sequence // self.shard_size:08d}"
+
+    def file_stem(self, kind: str, frame_id: int) -> str:
+        """Filename stem for ``kind`` ('Image' or 'Mask')."""
+        if not self.sharded:
+            return f"{kind}_{frame_id:04d}"
+        return f"{kind}_{frame_id:0{FRAME_ID_WIDTH}d}"
+
+    def image_path(self, frame_id: int) -> Path:
+        return self.shard_dir(frame_id) / f"{self.file_stem('Image', frame_id)}.png"
+
+    def mask_path(self, frame_id: int) -> Path:
+        return self.shard_dir(frame_id) / f"{self.file_stem('Mask', frame_id)}.png"
+
+    def mapping_path(self, frame_id: int) -> Path:
+        """Label mapping file that holds this frame's pass index -> label entry."""
+        if not self.sharded:
+            return self.base_path / "all_frame_mappings.json"
+        return self.shard_dir(frame_id) / "frame_mappings.json"
+
+    def status_path(self) -> Path:
+        """Progress status file written by this layout's worker."""
+        if not self.sharded:
+            return self.base_path / "generation_status.json"
+        return self.base_path / "status" / f"worker_{self.worker_id:05d}.json"
+
+    def heartbeat_path(self) -> Path:
+        """Heartbeat file the supervisor watches for this layout's worker."""
+        return self.base_path / "heartbeat" / f"worker_{self.worker_id:05d}.json"
+
+    def quarantine_path(self) -> Path:
+        """Scene specs that repeatedly crashed or hung, shared by all workers."""
+        return self.base_path / "quarantine.json"
+
+    def plan_path(self) -> Path:
+        """Frame plan assigning predicted-cost frames to workers."""
+        return self.base_path / "plan.json"
+
+    def plan_report_path(self) -> Path:
+        """Predicted versus actual makespan of the last planned run."""
+        return self.base_path / "plan_report.json"
+
+    def transfer_marker_path(self, batch: int) -> Path:
+        """Completion marker written after a staged batch of this worker reached ``base_path``."""
+        return self.base_path / "transfers" / f"worker_{self.worker_id:05d}" / f"batch_{batch:08d}.json"
+
+    def archive_path(self, batch: int) -> Path:
+        """Archive holding a staged batch when staging packs batches into tar files."""
+        return self.base_path / "archives" / f"worker_{self.worker_id:05d}" / f"batch_{batch:08d}.tar"
+
+    def frame_log_path(self) -> Path:
+        """Per-frame record log (scene attributes and timings) written by this layout's worker."""
+        if not self.sharded:
+            return self.base_path / "frame_log.jsonl"
+        return self.base_path / "logs" / f"worker_{self.worker_id:05d}.jsonl"
+
+    def relative(self, path: Path) -> str:
+        """Path relative to ``base_path`` with forward slashes, as stored in COCO file names."""
+        return Path(path).relative_to(self.base_path).as_posix()
+
+    # Blender compositor integration
+
+    def compositor_slot_path(self, kind: str, frame_id: int) -> str:
+        """File Output slot path. Blender always appends the frame number to it."""
+        if not self.sharded:
+            return f"{kind}_####"
+        return f"{self.file_stem(kind, frame_id)}_####"
+
+    def compositor_output_path(self, kind: str, frame_id: int, frame_number: int) -> Path:
+        """Path the File Output node actually writes for a given Blender frame number."""
+        if not self.sharded:
+            return self.shard_dir(frame_id) / f"{kind}_{frame_number:04d}.png"
+        return self.shard_dir(frame_id) / f"{self.file_stem(kind, frame_id)}_{frame_number:04d}.png"
+
+    # Discovery
+
+    def iter_mapping_files(self) -> Iterator[Path]:
+        """Yield every mapping file under ``base_path`` in frame order."""
+        if not self.sharded:
+            path = self.base_path / "all_frame_mappings.json"
+            if path.exists():
+                yield path
+            return
+        yield from sorted(self.base_path.glob("w[0-9]*/[0-9]*/frame_mappings.json"))
+
+    def iter_status_files(self) -> Iterator[Path]:
+        """Yield the status file of every worker writing into ``base_path``."""
+        if not self.sharded:
+            path = self.status_path()
+            if path.exists():
+                yield path
+            return
+        yield from sorted((self.base_path / "status").glob("worker_*.json"))
+
+    def iter_frame_logs(self) -> Iterator[Path]:
+        """Yield the frame log of every worker writing into ``base_path``."""
+        if not self.sharded:
+            path = self.frame_log_path()
+            if path.exists():
+                yield path
+            return
+        yield from sorted((self.base_path / "logs").glob("worker_*.jsonl"))
+
+    def next_sequence(self) -> int:
+        """First unused sequence number for this worker, so reruns never overwrite frames.
+
+        Only the newest shard directory is listed, so this stays cheap on large runs.
+        """
+        # Flat layouts keep the legacy behaviour of numbering from zero each run
+        worker_dir = self.worker_dir()
+        if not self.sharded or not worker_dir.exists():
+            return 0
+
+        shards = sorted(p for p in worker_dir.iterdir() if p.is_dir() and p.name.isdigit())
+        for shard in reversed(shards):
+            ids = [int(p.stem.split('_')[1]) for p in shard.glob("Image_*.png")
+                   if p.stem.split('_')[1].isdigit()]
+            if ids:
+                return split_frame_id(max(ids))[1] + 1
+        return 0
@@ -0,0 +1,91 @@
+"""Compiled scene recipes per pole configuration key.
+
+For a fixed configuration key (pole type, pole object, phases, setup and the
+optional components) the ``setup_pole`` methods always show the same core set
+of objects at the same positions. Only the anomaly, fuse and AETX variant picks
+and the wires vary. A recipe records that deterministic core: the objects
+visible in every realization of the key so far, the positions they were moved
+to and the wire attachment pairs that were strung. It starts from the first
+realization, and each later realization intersects it.
+
+When the next frame has a key with a recipe, ``reset_scene`` leaves the
+recipe's objects visible and in place and only undoes the set difference. A
+run of same-key frames therefore no longer hides and shows hundreds of objects
+between frames. ``setup_pole`` still runs, so every random pick is drawn exactly
+as before; its writes to the recipe's objects simply change nothing. This module
+has no Blender dependency.
+"""
+
+from typing import Dict, Any, FrozenSet, Hashable, List, Optional, Tuple
+
+from core.log import get_logger
+
+logger = get_logger(__name__)
+
+
+class SceneRecipe:
+    """Deterministic core of one configuration key."""
+
+    def __init__(self, visible: FrozenSet[str], transforms: Dict[Tuple[str, str], tuple],
+                 wire_pairs: FrozenSet[Tuple[str, str]]):
+        self.visible = visible
+        self.transforms = transforms
+        self.wire_pairs = wire_pairs
+        self.realizations = 1
+
+    def merge(self, visible: FrozenSet[str], transforms: Dict[Tuple[str, str], tuple],
+              wire_pairs: FrozenSet[Tuple[str, str]]) -> None:
+        """Keep only what another realization of the key shares with this recipe."""
+        self.visible = self.visible & visible
+        self.transforms = {key: value for key, value in self.transforms.items()
+                           if transforms.get(key) == value}
+        self.wire_pairs = self.wire_pairs & wire_pairs
+        self.realizations += 1
+
+
+class SceneRecipes:
+    """Recipes of every configuration key seen by this process."""
+
+    def __init__(self):
+        self.recipes: Dict[Hashable, SceneRecipe] = {}
+        self.replays = 0
+        self.lookups = 0
+        self.kept_objects = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['SceneRecipes']:
+        """Create the recipe cache if ``scene_recipes`` is enabled, otherwise return None."""
+        if not (config.get('scene_recipes', {}) or {}).get('enabled', False):
+            return None
+        return cls()
+
+    def get(self, key: Hashable) -> Optional[SceneRecipe]:
+        """Recipe of a configuration key, or None before its first realization."""
+        self.lookups += 1
+        recipe = self.recipes.get(key)
+        if recipe is not None:
+            self.replays += 1
+            self.kept_objects += len(recipe.visible)
+        return recipe
+
+    def record(self, key: Hashable, visible: List[str], transforms: Dict[Tuple[str, str], tuple],
+               wire_pairs: List[Tuple[str, str]]) -> SceneRecipe:
+        """Record a realization of ``key``: visible object names, (object, property) values and wire pairs."""
+        visible, wire_pairs = frozenset(visible), frozenset(tuple(pair) for pair in wire_pairs)
+        recipe = self.recipes.get(key)
+        if recipe is None:
+            recipe = self.recipes[key] = SceneRecipe(visible, dict(transforms), wire_pairs)
+            logger.debug("Compiled recipe for %s: %d objects, %d transforms, %d wires",
+                         key, len(visible), len(transforms), len(wire_pairs))
+        else:
+            recipe.merge(visible, transforms, wire_pairs)
+        return recipe
+
+    def summary(self) -> Dict[str, Any]:
+        """Recipe count and how often frames started from a recipe."""
+        return {
+            'recipes': len(self.recipes),
+            'replays': self.replays,
+            'replay_rate': round(self.replays / self.lookups, 3) if self.lookups else 0.0,
+            'objects_kept_per_replay': round(self.kept_objects / self.replays, 1) if self.replays else 0.0,
+        }
@@ -0,0 +1,181 @@
+"""Content-addressed cache of rendered frames keyed by a hash of the full scene.
+
+A frame's key hashes the description of the generated scene: every visible
+object's transform and materials, wire control points, material node inputs,
+the camera, the HDRI and the render settings that affect pixels. Two frames
+with the same key render to the same image and mask. On a hit the cached files
+are hard-linked into the new frame's output paths instead of rendering again.
+This covers reruns after changes to post-processing or the label taxonomy, and
+datasets regenerated from overlapping configs.
+
+Entries live in ``<path>/<key[:2]>/<key>/`` as ``Image.png``, ``Mask.png`` and
+``mapping.json``. The mapping is written last, so an entry with a mapping is
+complete. Each hit touches the mapping, and eviction removes the least recently
+used entries first. This module has no Blender dependency.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+from core.log import get_logger
+
+logger = get_logger(__name__)
+
+# rendering.yaml settings that change the rendered pixels
+RENDER_KEYS = ('resolution', 'samples', 'denoising', 'render_engine', 'file_format',
+               'color_mode', 'color_depth', 'compression', 'wire_lod', 'mesh_lod')
+
+
+def render_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Subset of the rendering config that affects the image and mask."""
+    settings = {key: config.get(key) for key in RENDER_KEYS}
+    settings['mask_enabled'] = config['output'].get('mask_enabled', True)
+    return settings
+
+
+def scene_key(description: Dict[str, Any], config: Dict[str, Any]) -> str:
+    """Canonical SHA-256 of a scene description and the render settings of ``config``."""
+    canonical = json.dumps({'scene': description, 'render': render_settings(config)},
+                           sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _link(source: Path, destination: Path) -> None:
+    """Hard-link ``source`` to ``destination``, copying where links are unsupported."""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if destination.exists():
+        destination.unlink()
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+class RenderCache:
+    """Stores and reuses rendered frames by scene key.
+
+    Settings come from the ``render_cache`` section of rendering.yaml:
+        path:         cache directory, best on the same filesystem as the outputs
+                      so hits are hard links rather than copies
+        max_gb:       evict least recently used entries beyond this size (0 = unbounded)
+        evict_every:  stores between size checks
+    """
+
+    FILES = {'image': 'Image.png', 'mask': 'Mask.png'}
+
+    def __init__(self, path, max_bytes: int = 0, evict_every: int = 100):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.evict_every = evict_every
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['RenderCache']:
+        """Create the cache if ``render_cache.enabled`` is set, otherwise return None."""
+        settings = config.get('render_cache', {}) or {}
+        if not settings.get('enabled', False):
+            return None
+        path = Path(settings.get('path', 'render_cache'))
+        if not path.is_absolute():
+            path = Path(config['output']['base_path']) / path
+        return cls(path, int(settings.get('max_gb', 0) * 1024 ** 3), settings.get('evict_every', 100))
+
+    def entry_dir(self, key: str) -> Path:
+        return self.path / key[:2] / key
+
+    def lookup(self, key: str) -> Optional[Dict[str, str]]:
+        """Cached label mapping of a scene, or None on a miss. Counts the hit or miss."""
+        mapping_path = self.entry_dir(key) / "mapping.json"
+        try:
+            with open(mapping_path, 'r') as f:
+                mapping = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        os.utime(mapping_path)
+        self.hits += 1
+        return mapping
+
+    def fetch(self, key: str, image_path, mask_path) -> None:
+        """Link a cached entry's image and mask to a new frame's output paths."""
+        entry = self.entry_dir(key)
+        for kind, destination in (('image', image_path), ('mask', mask_path)):
+            source = entry / self.FILES[kind]
+            if source.exists():
+                _link(source, Path(destination))
+
+    def store(self, key: str, image_path, mask_path, mapping: Dict[Any, str]) -> None:
+        """Add a rendered frame to the cache. Frames without an image are not cached."""
+        if not Path(image_path).exists():
+            return
+        entry = self.entry_dir(key)
+        tmp_dir = entry.with_name(f".{key}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        for kind, source in (('image', image_path), ('mask', mask_path)):
+            if Path(source).exists():
+                _link(Path(source), tmp_dir / self.FILES[kind])
+        with open(tmp_dir / "mapping.json", 'w') as f:
+            json.dump({str(index): label for index, label in mapping.items()}, f)
+        try:
+            os.replace(tmp_dir, entry)
+        except OSError:
+            # Another worker cached the same scene first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        self.stores += 1
+        if self.max_bytes and self.stores % self.evict_every == 0:
+            self.evict(self.max_bytes)
+
+    def entries(self) -> Iterator[Tuple[Path, float, int]]:
+        """Yield (entry directory, last use time, size in bytes) for every complete entry."""
+        for mapping_path in self.path.glob("*/*/mapping.json"):
+            entry = mapping_path.parent
+            if entry.name.startswith('.'):
+                continue
+            try:
+                size = sum(p.stat().st_size for p in entry.iterdir())
+                yield entry, mapping_path.stat().st_mtime, size
+            except FileNotFoundError:
+                continue
+
+    def size_bytes(self) -> int:
+        """Bytes held by complete entries, counting hard-linked files in full."""
+        return sum(size for _, _, size in self.entries())
+
+    def evict(self, max_bytes: int) -> int:
+        """
+        Remove least recently used entries until the cache fits in ``max_bytes``.
+
+        Output files linked from an evicted entry are kept, only the cache's link goes.
+
+        Returns:
+            Number of entries removed
+        """
+        entries = sorted(self.entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        removed = 0
+        for entry, _, size in entries:
+            if total <= max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+        if removed:
+            logger.info("Evicted %d render cache entries, %.1f MB left", removed, total / 1024 ** 2)
+        return removed
+
+    def summary(self) -> Dict[str, Any]:
+        """Hit and miss counts of this process."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'stored': self.stores,
+        }
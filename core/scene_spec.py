@@ -0,0 +1,30 @@
+"""Scene specs: the reproducible description of a planned frame.
+
+A spec is a plain dictionary so it can be written to heartbeat, quarantine and
+plan files as JSON. ``frame_id`` and ``seed`` are always present; seeding the
+random module with ``seed`` before generating the frame reproduces the scene.
+"""
+
+import hashlib
+import os
+from typing import Dict, Any, Optional
+
+
+def new_base_seed() -> int:
+    """Random base seed for a run that was not given one."""
+    return int.from_bytes(os.urandom(8), 'big')
+
+
+def frame_seed(base_seed: int, frame_id: int) -> int:
+    """Stable per-frame seed derived from the run's base seed and the frame ID."""
+    digest = hashlib.sha256(f"{base_seed}:{frame_id}".encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+def make_scene_spec(frame_id: int, sequence: int, base_seed: int,
+                    attributes: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Build the spec of a frame from its IDs and the run's base seed."""
+    spec = {'frame_id': frame_id, 'sequence': sequence, 'seed': frame_seed(base_seed, frame_id)}
+    if attributes:
+        spec.update(attributes)
+    return spec
@@ -0,0 +1,264 @@
+"""Assignment of planned frames to workers by predicted render cost.
+
+Plans are plain dictionaries written as JSON to ``OutputLayout.plan_path()``:
+
+    {
+        "base_seed": ...,
+        "predicted_makespan": ..., "naive_makespan": ...,
+        "workers": {"0": {"start_sequence": 0, "predicted_seconds": ...,
+                          "frames": [{"seed": ..., "predicted_seconds": ..., ...}]}},
+        "affinity": {"switches_before": ..., "switches_after": ..., ...} or null
+    }
+
+Worker ``w`` renders ``frames[i]`` as its sequence number ``start_sequence + i``
+with the frame's planned seed, so the scene is the one the cost was predicted for.
+
+Within a worker, frames can be put in configuration-affinity order: frames with
+the same pole type and setup, and where possible the same HDRI, run back to
+back. Between such frames only anomalies, camera and wires change, so Blender
+and Cycles have much less scene state to sync. The reordering only permutes
+each worker's frames, so the sample distribution and the makespan do not change.
+"""
+
+import heapq
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+
+from core.output_layout import split_frame_id
+
+
+def lpt_assign(costs: Sequence[float], num_workers: int) -> Tuple[List[List[int]], List[float]]:
+    """
+    Longest-processing-time-first assignment of jobs to workers.
+
+    Jobs are taken in decreasing cost order and each goes to the currently least
+    loaded worker, so every worker's list is also ordered longest first.
+
+    Returns:
+        Tuple of (job indices per worker, total cost per worker)
+    """
+    assignments = [[] for _ in range(num_workers)]
+    loads = [0.0] * num_workers
+    heap = [(0.0, worker) for worker in range(num_workers)]
+    for index in sorted(range(len(costs)), key=lambda i: -costs[i]):
+        load, worker = heapq.heappop(heap)
+        assignments[worker].append(index)
+        loads[worker] = load + costs[index]
+        heapq.heappush(heap, (loads[worker], worker))
+    return assignments, loads
+
+
+def contiguous_assign(costs: Sequence[float], num_workers: int) -> Tuple[List[List[int]], List[float]]:
+    """Naive split into equally sized consecutive frame ranges, for comparison."""
+    assignments, start = [], 0
+    for worker in range(num_workers):
+        count = len(costs) // num_workers + (1 if worker < len(costs) % num_workers else 0)
+        assignments.append(list(range(start, start + count)))
+        start += count
+    return assignments, [sum(costs[i] for i in indices) for indices in assignments]
+
+
+def configuration_key(frame: Dict[str, Any]) -> Tuple:
+    """Part of a frame record that decides which objects are visible, like ``Pole.recipe_key``."""
+    return (frame.get('pole_type') or '', frame.get('pole_material') or '', frame.get('phases') or 0,
+            tuple(frame.get('setup') or ()), bool(frame.get('surge_arresters')), bool(frame.get('fcis')),
+            bool(frame.get('support_bracket')))
+
+
+def affinity_order(frames: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Order frames so equal scene configurations, then equal HDRIs, are consecutive.
+
+    The sort is stable, so frames that share both keep their previous order.
+    """
+    return sorted(frames, key=lambda frame: (configuration_key(frame), frame.get('hdri') or ''))
+
+
+def count_switches(frames: Sequence[Dict[str, Any]]) -> Dict[str, int]:
+    """Consecutive frame pairs whose scene configuration, or HDRI, differs."""
+    switches = {'scene': 0, 'hdri': 0}
+    for previous, frame in zip(frames, frames[1:]):
+        switches['scene'] += configuration_key(previous) != configuration_key(frame)
+        switches['hdri'] += previous.get('hdri') != frame.get('hdri')
+    return switches
+
+
+def switch_costs(logs: Iterable[Iterable[Dict[str, Any]]], predict=None) -> Dict[str, Any]:
+    """
+    Estimate the extra seconds a scene or HDRI switch costs, from frame logs.
+
+    Each log is one worker's records in render order. A frame's cost is its
+    ``seconds`` minus the predicted cost of its content, when a predictor is
+    given. The switch cost is the mean cost of frames that followed a switch
+    minus the mean cost of frames that did not.
+
+    Args:
+        logs: Frame records of every worker log, each in render order
+        predict: Optional ``record -> seconds`` content cost prediction
+
+    Returns:
+        Dictionary with 'scene' and 'hdri' seconds per switch (0 when unknown)
+        and the number of frame pairs they were measured from
+    """
+    sums = {kind: {True: [0.0, 0], False: [0.0, 0]} for kind in ('scene', 'hdri')}
+    for records in logs:
+        previous = None
+        for record in records:
+            if 'seconds' not in record:
+                continue
+            if previous is not None:
+                residual = record['seconds'] - (predict(record) if predict else 0.0)
+                changed = {'scene': configuration_key(previous) != configuration_key(record),
+                           'hdri': previous.get('hdri') != record.get('hdri')}
+                for kind, switched in changed.items():
+                    sums[kind][switched][0] += residual
+                    sums[kind][switched][1] += 1
+            previous = record
+
+    costs = {'pairs': sum(count for _, count in sums['scene'].values())}
+    for kind, groups in sums.items():
+        (switched_sum, switched_count), (kept_sum, kept_count) = groups[True], groups[False]
+        if switched_count and kept_count:
+            costs[kind] = max(0.0, switched_sum / switched_count - kept_sum / kept_count)
+        else:
+            costs[kind] = 0.0
+    return costs
+
+
+def build_plan(frames: List[Dict[str, Any]], num_workers: int, base_seed: int,
+               start_sequences: Sequence[int], affinity: bool = False,
+               switch_seconds: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Assign sampled frames to workers longest first.
+
+    Args:
+        frames: Frame records, each with its ``seed`` and ``predicted_seconds``
+        num_workers: Number of workers to spread the frames over
+        base_seed: Base seed of the run, used for frames rendered outside the plan
+        start_sequences: First sequence number of every worker
+        affinity: Put each worker's frames in configuration-affinity order
+        switch_seconds: Seconds per scene and HDRI switch (see ``switch_costs``),
+            used to predict the savings of the affinity order
+
+    Returns:
+        Plan dictionary
+    """
+    costs = [frame['predicted_seconds'] for frame in frames]
+    assignments, loads = lpt_assign(costs, num_workers)
+    _, naive_loads = contiguous_assign(costs, num_workers)
+    worker_frames = [[frames[i] for i in indices] for indices in assignments]
+    plan_affinity = None
+    if affinity:
+        before = {'scene': 0, 'hdri': 0}
+        after = {'scene': 0, 'hdri': 0}
+        for worker, assigned in enumerate(worker_frames):
+            for kind, count in count_switches(assigned).items():
+                before[kind] += count
+            worker_frames[worker] = affinity_order(assigned)
+            for kind, count in count_switches(worker_frames[worker]).items():
+                after[kind] += count
+        switch_seconds = switch_seconds or {}
+        plan_affinity = {
+            'switches_before': before,
+            'switches_after': after,
+            'switch_seconds': {kind: switch_seconds.get(kind, 0.0) for kind in ('scene', 'hdri')},
+            'predicted_savings_seconds': sum((before[kind] - after[kind]) * switch_seconds.get(kind, 0.0)
+                                             for kind in ('scene', 'hdri')),
+        }
+    return {
+        'base_seed': base_seed,
+        'num_frames': len(frames),
+        'predicted_seconds': sum(costs),
+        'predicted_makespan': max(loads, default=0.0),
+        'naive_makespan': max(naive_loads, default=0.0),
+        'workers': {
+            str(worker): {
+                'start_sequence': start_sequences[worker],
+                'predicted_seconds': loads[worker],
+                'frames': worker_frames[worker],
+            }
+            for worker in range(num_workers)
+        },
+        'affinity': plan_affinity,
+    }
+
+
+def planned_frame(plan: Optional[Dict[str, Any]], worker_id: int, sequence: int) -> Optional[Dict[str, Any]]:
+    """Planned frame for a worker's sequence number, or None if it is outside the plan."""
+    if not plan:
+        return None
+    worker = plan['workers'].get(str(worker_id))
+    if worker is None:
+        return None
+    index = sequence - worker['start_sequence']
+    if 0 <= index < len(worker['frames']):
+        return worker['frames'][index]
+    return None
+
+
+def makespan_report(plan: Dict[str, Any], records: Iterable[Dict[str, Any]],
+                    wall_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Compare a plan's predicted per-worker load with the frame logs of its run.
+
+    Args:
+        plan: Plan the run was scheduled with
+        records: Frame records of the run (frames outside the plan are ignored)
+        wall_seconds: Measured wall-clock time of the whole run, if known
+
+    Returns:
+        Report dictionary with predicted and actual makespan and per-worker loads
+    """
+    actual = {worker: 0.0 for worker in plan['workers']}
+    rendered = {worker: 0 for worker in plan['workers']}
+    frame_errors = []
+    for record in records:
+        if 'frame_id' not in record or 'seconds' not in record:
+            continue
+        worker_id, sequence = split_frame_id(record['frame_id'])
+        frame = planned_frame(plan, worker_id, sequence)
+        if frame is None:
+            continue
+        actual[str(worker_id)] += record['seconds']
+        rendered[str(worker_id)] += 1
+        frame_errors.append(abs(record['seconds'] - frame['predicted_seconds']) / max(1e-6, record['seconds']))
+
+    workers = {
+        worker: {
+            'frames_planned': len(entry['frames']),
+            'frames_rendered': rendered[worker],
+            'predicted_seconds': entry['predicted_seconds'],
+            'actual_seconds': actual[worker],
+        }
+        for worker, entry in plan['workers'].items()
+    }
+    return {
+        'predicted_makespan': plan['predicted_makespan'],
+        'naive_makespan': plan['naive_makespan'],
+        'actual_makespan': max(actual.values(), default=0.0),
+        'wall_seconds': wall_seconds,
+        'mean_frame_error': sum(frame_errors) / len(frame_errors) if frame_errors else None,
+        'affinity': plan.get('affinity'),
+        'workers': workers,
+    }
+
+
+def format_makespan_report(report: Dict[str, Any]) -> str:
+    """Format a makespan report as plain text."""
+    lines = [
+        f"Predicted makespan: {report['predicted_makespan']:.0f} s "
+        f"(naive split: {report['naive_makespan']:.0f} s)",
+        f"Actual makespan: {report['actual_makespan']:.0f} s of rendering"
+        + (f", {report['wall_seconds']:.0f} s wall clock" if report['wall_seconds'] is not None else ""),
+    ]
+    if report['mean_frame_error'] is not None:
+        lines.append(f"Mean per-frame prediction error: {report['mean_frame_error'] * 100:.0f}%")
+    affinity = report.get('affinity')
+    if affinity:
+        before, after = affinity['switches_before'], affinity['switches_after']
+        lines.append(f"Affinity order: {before['scene']} -> {after['scene']} scene switches, "
+                     f"{before['hdri']} -> {after['hdri']} HDRI switches, "
+                     f"predicted savings {affinity['predicted_savings_seconds']:.0f} s")
+    for worker, entry in sorted(report['workers'].items(), key=lambda item: int(item[0])):
+        lines.append(f"  worker {worker}: {entry['frames_rendered']}/{entry['frames_planned']} frames, "
+                     f"predicted {entry['predicted_seconds']:.0f} s, actual {entry['actual_seconds']:.0f} s")
+    return "\n".join(lines)
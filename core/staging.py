@@ -0,0 +1,222 @@
+"""Node-local staging of rendered frames with batched transfer to shared storage.
+
+Blender writes every frame into a staging directory on local disk. A background
+thread then moves completed frames to the shared ``base_path`` in batches, so the
+render loop never waits on a busy filer and the filer gets a few large
+operations instead of many small ones.
+
+Every file reaches ``base_path`` through a temporary name followed by an atomic
+rename. A batch's label mappings are merged after its images and masks, and its
+completion marker (``OutputLayout.transfer_marker_path``) is written last, so a
+frame listed in a marker is always complete. The destination is a plain
+directory, so a local directory can stand in for the shared storage.
+"""
+
+import os
+import queue
+import shutil
+import tarfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from core.output_layout import OutputLayout
+from core.heartbeat import write_json_atomic, read_json
+from core.log import get_logger
+
+logger = get_logger(__name__)
+
+
+def _copy_atomic(source: Path, destination: Path) -> None:
+    """Copy a file under a temporary name next to the destination, then rename it into place."""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = destination.with_name(f".{destination.name}.{os.getpid()}.tmp")
+    shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, destination)
+
+
+class StagedTransfer:
+    """Moves frames rendered into a staging layout to the shared layout in batches.
+
+    Settings come from the ``output.staging`` section of rendering.yaml:
+        path:           local staging directory (one subdirectory per worker)
+        batch_size:     frames per transfer batch
+        flush_seconds:  transfer a partial batch once its oldest frame waited this long
+        archive:        pack each batch's images and masks into one tar file
+        max_pending:    frames waiting for transfer before the render loop blocks
+    """
+
+    def __init__(self, layout: OutputLayout, staging_layout: OutputLayout,
+                 settings: Optional[Dict[str, Any]] = None):
+        settings = settings or {}
+        self.layout = layout
+        self.staging_layout = staging_layout
+        self.batch_size = settings.get('batch_size', 50)
+        self.flush_seconds = settings.get('flush_seconds', 30)
+        self.archive = settings.get('archive', False)
+        self.pending = queue.Queue(maxsize=settings.get('max_pending', 500))
+        self.next_batch = self._first_batch()
+        self.transferred = 0
+        self.error = None
+        # Frames whose batch is complete; their local mapping entries are removed
+        # on the render thread, which also writes those files
+        self.completed = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="staged-transfer", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], layout: OutputLayout) -> Optional['StagedTransfer']:
+        """Create the transfer if ``output.staging.enabled`` is set, otherwise return None."""
+        settings = config['output'].get('staging', {}) or {}
+        if not settings.get('enabled', False):
+            return None
+        staging_root = Path(settings.get('path', 'staging')) / f"worker_{layout.worker_id:05d}"
+        staging_layout = OutputLayout.from_config(config, worker_id=layout.worker_id, base_path=staging_root)
+        return cls(layout, staging_layout, settings)
+
+    def _first_batch(self) -> int:
+        markers = self.layout.transfer_marker_path(0).parent
+        if not markers.exists():
+            return 0
+        batches = [int(p.stem.split('_')[1]) for p in markers.glob("batch_*.json")]
+        return max(batches, default=-1) + 1
+
+    def recover(self) -> None:
+        """Queue frames a previous run left in staging, using their local label mappings.
+
+        Call this before rendering into the staging layout again. Mapping entries
+        stay until their frame has been transferred, so a second crash can
+        recover the same frames again.
+        """
+        for mapping_file in list(self.staging_layout.iter_mapping_files()):
+            mappings = read_json(mapping_file) or {}
+            for key, labels in mappings.items():
+                frame_id = self.staging_layout.parse_key(key)
+                if self.staging_layout.image_path(frame_id).exists():
+                    logger.info("Recovering staged frame %d", frame_id)
+                    self.submit(frame_id, labels)
+                else:
+                    # Transferred before the crash but not yet forgotten
+                    self.completed.put(frame_id)
+        self._forget_completed()
+
+    def submit(self, frame_id: int, labels: Dict[Any, str]) -> None:
+        """Queue a finished frame for transfer. Blocks while ``max_pending`` frames are waiting."""
+        if self.error is not None:
+            raise RuntimeError("Staged transfer failed") from self.error
+        self._forget_completed()
+        self.pending.put((frame_id, labels, time.time()))
+
+    def close(self) -> None:
+        """Transfer every queued frame and stop the background thread."""
+        self.pending.put(None)
+        self._thread.join()
+        # Frames of a failed batch keep their mappings for the next run's recover
+        self._forget_completed()
+        if self.error is not None:
+            raise RuntimeError("Staged transfer failed") from self.error
+        logger.info("Transferred %d staged frames to %s", self.transferred, self.layout.base_path)
+
+    def _forget_completed(self) -> None:
+        """Remove the local mapping entries of transferred frames, deleting mapping files left empty."""
+        by_mapping = {}
+        while True:
+            try:
+                frame_id = self.completed.get_nowait()
+            except queue.Empty:
+                break
+            by_mapping.setdefault(self.staging_layout.mapping_path(frame_id), []).append(
+                self.staging_layout.frame_key(frame_id))
+        for mapping_file, keys in by_mapping.items():
+            mappings = read_json(mapping_file)
+            if mappings is None:
+                continue
+            for key in keys:
+                mappings.pop(key, None)
+            if mappings:
+                write_json_atomic(mapping_file, mappings)
+            else:
+                mapping_file.unlink()
+
+    def _run(self) -> None:
+        batch, closing = [], False
+        while not closing:
+            timeout = None
+            if batch:
+                timeout = max(0.0, batch[0][2] + self.flush_seconds - time.time())
+            try:
+                item = self.pending.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+            if item is None:
+                closing = True
+            elif item:
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+            if batch:
+                try:
+                    self._transfer(batch)
+                except Exception as error:  # Surface the failure in the render loop
+                    logger.error("Staged transfer of batch %d failed: %s", self.next_batch, error)
+                    self.error = error
+                    return
+                batch = []
+
+    def _transfer(self, batch: List) -> None:
+        frame_ids = [frame_id for frame_id, _, _ in batch]
+        start = time.time()
+
+        if self.archive:
+            self._transfer_archive(frame_ids)
+        else:
+            for frame_id in frame_ids:
+                for source, destination in self._frame_files(frame_id):
+                    _copy_atomic(source, destination)
+
+        # Merge the label mappings, grouped by destination mapping file
+        by_mapping = {}
+        for frame_id, labels, _ in batch:
+            by_mapping.setdefault(self.layout.mapping_path(frame_id), {})[self.layout.frame_key(frame_id)] = labels
+        for mapping_file, entries in by_mapping.items():
+            mappings = read_json(mapping_file) or {}
+            mappings.update(entries)
+            write_json_atomic(mapping_file, mappings)
+
+        write_json_atomic(self.layout.transfer_marker_path(self.next_batch), {
+            'frame_ids': frame_ids,
+            'archive': self.layout.relative(self.layout.archive_path(self.next_batch)) if self.archive else None,
+            'completed': time.time(),
+        })
+
+        # Only delete the staged copies once the batch is complete on shared storage
+        for frame_id in frame_ids:
+            for source, _ in self._frame_files(frame_id):
+                source.unlink()
+
+        for frame_id in frame_ids:
+            self.completed.put(frame_id)
+
+        logger.debug("Transferred batch %d (%d frames) in %.1f s", self.next_batch,
+                     len(frame_ids), time.time() - start)
+        self.next_batch += 1
+        self.transferred += len(frame_ids)
+
+    def _frame_files(self, frame_id: int):
+        pairs = [
+            (self.staging_layout.image_path(frame_id), self.layout.image_path(frame_id)),
+            (self.staging_layout.mask_path(frame_id), self.layout.mask_path(frame_id)),
+        ]
+        return [(source, destination) for source, destination in pairs if source.exists()]
+
+    def _transfer_archive(self, frame_ids: List[int]) -> None:
+        archive_path = self.layout.archive_path(self.next_batch)
+        archive_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = archive_path.with_name(f".{archive_path.name}.{os.getpid()}.tmp")
+        # Members use layout-relative names so extracting in base_path restores the layout
+        with tarfile.open(tmp_path, 'w') as archive:
+            for frame_id in frame_ids:
+                for source, destination in self._frame_files(frame_id):
+                    archive.add(source, arcname=self.layout.relative(destination))
+        os.replace(tmp_path, archive_path)
@@ -1,5 +1,6 @@
-from typing import Dict, Tuple, Any, Optional
-from mathutils import Matrix
+import bpy
+from typing import Dict, Tuple, Any, Optional, Iterable, List
+from mathutils import Matrix, Vector, Euler, Quaternion, Color
 
 class RotationTracker:
     """Tracks and manages object rotations and their associated labels.
@@ -83,3 +84,208 @@ class MaterialTracker:
                 if obj.get('label') == 'ALS_Flashed':
                     obj['label'] = 'ALS'
         self.original_materials.clear()
+
+_MISSING = object()
+
+class SceneJournal:
+    """Records the original value of every scene property changed during a frame.
+    
+    This singleton class is the general counterpart of the rotation and material
+    trackers. The first write of a property through the journal stores the
+    property's original value; later writes in the same frame only change the
+    value. ``restore`` puts back exactly the recorded properties, so resetting
+    a frame costs time proportional to what the frame changed, not to the size
+    of the scene. Covered are plain attributes (transforms, ``pass_index``,
+    ``active_material``, node socket ``default_value``), custom properties and
+    object visibility.
+    
+    A full sweep of the view layer is still needed when objects may be visible
+    without having gone through the journal: on the first reset of a session
+    and after assets were appended.
+    """
+    _instance: Optional['SceneJournal'] = None
+    
+    def __init__(self):
+        # (target pointer, property) -> (target, property, original value), in first-write order
+        self.entries: Dict[Tuple[int, str], Tuple[Any, str, Any]] = {}
+        self.full_sweep_pending = True
+        # Entries the last restore kept, and the entries written since then
+        self.kept: set = set()
+        self.claimed: set = set()
+    
+    @classmethod
+    def get_instance(cls) -> 'SceneJournal':
+        if cls._instance is None:
+            cls._instance = SceneJournal()
+        return cls._instance
+    
+    @staticmethod
+    def _key(target: Any, name: str) -> Tuple[int, str]:
+        pointer = target.as_pointer() if hasattr(target, 'as_pointer') else id(target)
+        return pointer, name
+    
+    @staticmethod
+    def _snapshot(value: Any) -> Any:
+        """Copy of a value that later in-place edits of the property cannot change."""
+        if isinstance(value, (Vector, Matrix, Euler, Quaternion, Color)):
+            return value.copy()
+        if value is None or isinstance(value, (str, int, float, bpy.types.ID)):
+            return value
+        try:
+            return tuple(value)
+        except TypeError:
+            return value
+    
+    def record(self, target: Any, attr: str) -> None:
+        """Store an attribute's original value before it is edited in place."""
+        key = self._key(target, attr)
+        self.claimed.add(key)
+        if key not in self.entries:
+            self.entries[key] = (target, attr, self._snapshot(getattr(target, attr)))
+    
+    def set(self, target: Any, attr: str, value: Any) -> None:
+        """Set an attribute, e.g. ``location`` or a socket's ``default_value``, recording its original."""
+        self.record(target, attr)
+        setattr(target, attr, value)
+    
+    def set_item(self, target: Any, key: str, value: Any) -> None:
+        """Set a custom property such as ``label``, recording its original (or its absence)."""
+        entry_key = self._key(target, f"[{key}]")
+        self.claimed.add(entry_key)
+        if entry_key not in self.entries:
+            self.entries[entry_key] = (target, f"[{key}]", self._snapshot(target.get(key, _MISSING)))
+        target[key] = value
+    
+    def set_hidden(self, obj: Any, hidden: bool) -> None:
+        """Hide or show an object, recording its original visibility. Writes that change nothing are skipped."""
+        key = self._key(obj, 'hide')
+        self.claimed.add(key)
+        if obj.hide_viewport == hidden and obj.hide_render == hidden and obj.hide_get() == hidden:
+            return
+        if key not in self.entries:
+            self.entries[key] = (obj, 'hide', (obj.hide_viewport, obj.hide_render, obj.hide_get()))
+        set_hidden(obj, hidden)
+    
+    def request_full_sweep(self) -> None:
+        """Make the next reset sweep every object, e.g. after objects were added to the scene."""
+        self.full_sweep_pending = True
+    
+    def visible_objects(self) -> List[str]:
+        """Names of the recorded objects that are currently visible."""
+        names = []
+        for target, name, _ in self.entries.values():
+            try:
+                if name == 'hide' and not target.hide_render:
+                    names.append(target.name)
+            except ReferenceError:
+                continue
+        return names
+    
+    def values(self, attr: str) -> Dict[Tuple[str, str], tuple]:
+        """Current values of a recorded object attribute, keyed by (object name, attribute)."""
+        values = {}
+        for target, name, _ in self.entries.values():
+            if name == attr and isinstance(target, bpy.types.Object):
+                try:
+                    values[(target.name, attr)] = tuple(round(v, 5) for v in getattr(target, attr))
+                except ReferenceError:
+                    continue
+        return values
+    
+    @staticmethod
+    def _keep(target: Any, name: str, keep_visible: set, keep_values: Dict[Tuple[str, str], tuple]) -> bool:
+        """Whether a recorded property already holds the state the next frame will set."""
+        if not isinstance(target, bpy.types.Object):
+            return False
+        if name == 'hide':
+            return target.name in keep_visible and not target.hide_render
+        value = keep_values.get((target.name, name))
+        return value is not None and value == tuple(round(v, 5) for v in getattr(target, name))
+    
+    def restore(self, keep_visible: Iterable[str] = (),
+                keep_values: Optional[Dict[Tuple[str, str], tuple]] = None) -> int:
+        """
+        Restore every recorded property in one pass, newest first, and start a new frame.
+        
+        Objects the next frame is known to show again (see ``core.recipes``) can
+        be kept as they are. Their entries stay recorded, so a later restore
+        still puts back the original values.
+        
+        Args:
+            keep_visible: Names of objects to leave visible
+            keep_values: (object name, attribute) -> value of attributes to leave
+                set while they still hold that value
+        
+        Returns:
+            Number of properties restored
+        """
+        keep_visible = set(keep_visible)
+        keep_values = keep_values or {}
+        kept = {}
+        restored = 0
+        for key, (target, name, original) in reversed(list(self.entries.items())):
+            try:
+                if self._keep(target, name, keep_visible, keep_values):
+                    kept[key] = (target, name, original)
+                    continue
+                self._restore_entry(target, name, original)
+                restored += 1
+            except (ReferenceError, RuntimeError):
+                # The target was removed from the scene during the frame
+                continue
+        # Kept entries go back in first-write order
+        self.entries = dict(reversed(list(kept.items())))
+        self.kept = set(kept)
+        self.claimed = set()
+        return restored
+    
+    def settle(self) -> int:
+        """
+        Restore the entries the last restore kept that the current frame did not write.
+        
+        Call after generating a frame that started from kept state. A kept object
+        the frame neither showed nor hid goes back to its original visibility,
+        so the scene is exactly what a full restore would have produced.
+        
+        Returns:
+            Number of properties restored
+        """
+        restored = 0
+        for key in self.kept - self.claimed:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                continue
+            try:
+                self._restore_entry(*entry)
+                restored += 1
+            except (ReferenceError, RuntimeError):
+                continue
+        self.kept = set()
+        return restored
+    
+    @staticmethod
+    def _restore_entry(target: Any, name: str, original: Any) -> None:
+        if name == 'hide':
+            hide_viewport, hide_render, hidden = original
+            target.hide_viewport = hide_viewport
+            target.hide_render = hide_render
+            target.hide_set(hidden)
+        elif name.startswith('['):
+            if original is _MISSING:
+                target.pop(name[1:-1], None)
+            else:
+                target[name[1:-1]] = original
+        else:
+            setattr(target, name, original)
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+
+def set_hidden(obj: Any, hidden: bool) -> None:
+    """Write an object's hide flags, skipping the writes (and depsgraph tags) that change nothing."""
+    if obj.hide_viewport != hidden:
+        obj.hide_viewport = hidden
+    if obj.hide_render != hidden:
+        obj.hide_render = hidden
+    if obj.hide_get() != hidden:
+        obj.hide_set(hidden)
@@ -17,23 +17,23 @@ class Crossarm(PoleBase):
         # Initialize base class with config
         super().__init__(config, 'Crossarm')
         
-        self.framing_collection = bpy.data.collections.get("CrossarmFraming")
+        self.framing_collection = self.index.collection("CrossarmFraming")
         self.insulator_collections = ["Insulators"]
-        self.crossarm_collection = self.framing_collection.children.get('Framings')
-        self.conductors_collection = self.framing_collection.children.get("Conductor")
+        self.crossarm_collection = self.index.child(self.framing_collection, 'Framings')
+        self.conductors_collection = self.index.child(self.framing_collection, "Conductor")
 
     def setup_pole(self):
         if self.pole_type:
             toggle_visibility(self.pole_type, True)
 
         if self.pole_material == "Concrete":
-            self.crossarm_type = self.crossarm_collection.objects.get("Steel")
+            self.crossarm_type = self.index.object(self.crossarm_collection, "Steel")
         elif self.pole_material == "Wood":
-            self.crossarm_type = self.crossarm_collection.objects.get("Wood")
+            self.crossarm_type = self.index.object(self.crossarm_collection, "Wood")
         toggle_visibility(self.crossarm_type, True)
         if self.framing_collection and self.conductors_collection:
             selected_collection_name = random.choice(self.insulator_collections)
-            selected_collection = self.framing_collection.children.get(selected_collection_name)
+            selected_collection = self.index.child(self.framing_collection, selected_collection_name)
             if selected_collection:
                 insulators = sorted([obj for obj in selected_collection.objects if obj.name.lower().startswith("insulator")],
                                     key=lambda x: x.name)
@@ -41,16 +41,16 @@ class Crossarm(PoleBase):
                     is_visible = i < self.phases
                     toggle_visibility(insulator, is_visible)
                     
-                    conductor = self.conductors_collection.objects.get(f"{i+1}.003")
+                    conductor = self.index.object(self.conductors_collection, f"{i+1}.003")
                     if conductor:
                         toggle_visibility(conductor, is_visible)
                         # Adjust conductor position based on insulator type
 
                     if self.pole_material == "Wood":
-                        toggle_visibility(self.framing_collection.objects.get('WoodSupport1'), True)
-                        toggle_visibility(self.framing_collection.objects.get('WoodSupport2'), True)
+                        toggle_visibility(self.index.object(self.framing_collection, 'WoodSupport1'), True)
+                        toggle_visibility(self.index.object(self.framing_collection, 'WoodSupport2'), True)
                     if self.has_afs:
-                        afs_collection = self.framing_collection.children.get("Scadamate")
+                        afs_collection = self.index.child(self.framing_collection, "Scadamate")
                         toggle_collection_visibility(afs_collection, True)
         
         if self.has_fuse or self.has_als:
@@ -60,10 +60,10 @@ class Crossarm(PoleBase):
     
 
     def setup_3xfuse_or_als(self):
-        self.ALS_Fuse_Crossarm_Collection = bpy.data.collections.get("ALS_Fuse_Crossarm")
-        self.fuse_collection = self.ALS_Fuse_Crossarm_Collection.children.get("Framings.001")
-        self.Fuse_Wires = self.ALS_Fuse_Crossarm_Collection.children.get("WireAttatchesForCrossArm")
-        self.BarrelFuses = self.ALS_Fuse_Crossarm_Collection.children.get("CrossarmFuses")
+        self.ALS_Fuse_Crossarm_Collection = self.index.collection("ALS_Fuse_Crossarm")
+        self.fuse_collection = self.index.child(self.ALS_Fuse_Crossarm_Collection, "Framings.001")
+        self.Fuse_Wires = self.index.child(self.ALS_Fuse_Crossarm_Collection, "WireAttatchesForCrossArm")
+        self.BarrelFuses = self.index.child(self.ALS_Fuse_Crossarm_Collection, "CrossarmFuses")
         if random.random() < self.anomaly_types.get('als_open' if self.has_als else 'fuse_open', 0.2):
                         # Randomly choose which ALS parts have anomalies
             # Options: any single one, any pair, or all three
@@ -78,33 +78,33 @@ class Crossarm(PoleBase):
         
 
         if self.pole_material == "Wood":
-            toggle_visibility(self.fuse_collection.objects.get('WoodSupports1'), True)
-            toggle_visibility(self.fuse_collection.objects.get('WoodSupports2'), True)
-            toggle_visibility(self.fuse_collection.objects.get('WoodxArm'), True)
+            toggle_visibility(self.index.object(self.fuse_collection, 'WoodSupports1'), True)
+            toggle_visibility(self.index.object(self.fuse_collection, 'WoodSupports2'), True)
+            toggle_visibility(self.index.object(self.fuse_collection, 'WoodxArm'), True)
         else:
-            toggle_visibility(self.fuse_collection.objects.get('SteelXArm'), True)
+            toggle_visibility(self.index.object(self.fuse_collection, 'SteelXArm'), True)
 
         if self.phases == 3:
             wire_collections = ['ALS_Fuse_Crossarm_Wire1.001', 'ALS_Fuse_Crossarm_Wire2.001', 'ALS_Fuse_Crossarm_Wire3.001']
             
             if self.has_als:
-                toggle_collection_visibility(self.fuse_collection.children.get('1PH_ALS_Fuse_Crossarm'), True)
-                toggle_collection_visibility(self.fuse_collection.children.get('2PH_ALS_Fuse_Crossarm'), True)
-                toggle_collection_visibility(self.fuse_collection.children.get('3PH_ALS_Fuse_Crossarm'), True)
+                toggle_collection_visibility(self.index.child(self.fuse_collection, '1PH_ALS_Fuse_Crossarm'), True)
+                toggle_collection_visibility(self.index.child(self.fuse_collection, '2PH_ALS_Fuse_Crossarm'), True)
+                toggle_collection_visibility(self.index.child(self.fuse_collection, '3PH_ALS_Fuse_Crossarm'), True)
                 
                 # Apply anomalies to ALS parts
                 for i in range(1, 4):
                     if i in self.anomaly_parts:
-                        als_obj = self.fuse_collection.children.get(f'{i}PH_ALS_Fuse_Crossarm').objects.get(f'ALS{i}.009')
+                        als_obj = self.index.object(self.index.child(self.fuse_collection, f'{i}PH_ALS_Fuse_Crossarm'), f'ALS{i}.009')
                         if als_obj:
                             rotate_object_global(als_obj, random.randint(-60, -50), 'X')
             else:  # Barrel fuses
-                toggle_collection_visibility(self.BarrelFuses.children.get('CrossarmFuses 1'), True)
-                toggle_collection_visibility(self.BarrelFuses.children.get('CrossarmFuses 2'), True)
-                toggle_collection_visibility(self.BarrelFuses.children.get('CrossarmFuses 3'), True)
+                toggle_collection_visibility(self.index.child(self.BarrelFuses, 'CrossarmFuses 1'), True)
+                toggle_collection_visibility(self.index.child(self.BarrelFuses, 'CrossarmFuses 2'), True)
+                toggle_collection_visibility(self.index.child(self.BarrelFuses, 'CrossarmFuses 3'), True)
                 for i in range(1, 4):
                     if i in self.anomaly_parts:
-                        fuse_obj = self.BarrelFuses.children.get(f'CrossarmFuses {i}').objects.get(f'BarrelFuse{i}')
+                        fuse_obj = self.index.object(self.index.child(self.BarrelFuses, f'CrossarmFuses {i}'), f'BarrelFuse{i}')
                         if fuse_obj:
                             rotate_object_global(fuse_obj, random.randint(-170, -140), 'X')
         
@@ -112,30 +112,30 @@ class Crossarm(PoleBase):
             wire_collections = ['ALS_Fuse_Crossarm_Wire1.001', 'ALS_Fuse_Crossarm_Wire2.001']
             
             if self.has_als:
-                toggle_collection_visibility(self.fuse_collection.children.get('1PH_ALS_Fuse_Crossarm'), True)
-                toggle_collection_visibility(self.fuse_collection.children.get('2PH_ALS_Fuse_Crossarm'), True)
+                toggle_collection_visibility(self.index.child(self.fuse_collection, '1PH_ALS_Fuse_Crossarm'), True)
+                toggle_collection_visibility(self.index.child(self.fuse_collection, '2PH_ALS_Fuse_Crossarm'), True)
                 
                 # Apply anomalies to ALS parts (only first two)
                 for i in range(1, 3):
                     if i in self.anomaly_parts:
-                        als_obj = self.fuse_collection.children.get(f'{i}PH_ALS_Fuse_Crossarm').objects.get(f'ALS{i}.009')
+                        als_obj = self.index.object(self.index.child(self.fuse_collection, f'{i}PH_ALS_Fuse_Crossarm'), f'ALS{i}.009')
                         if als_obj:
                             rotate_object_global(als_obj, random.randint(-60, -50), 'X')
             else:  # Barrel fuses
-                toggle_collection_visibility(self.BarrelFuses.children.get('CrossarmFuses 1'), True)
-                toggle_collection_visibility(self.BarrelFuses.children.get('CrossarmFuses 2'), True)
+                toggle_collection_visibility(self.index.child(self.BarrelFuses, 'CrossarmFuses 1'), True)
+                toggle_collection_visibility(self.index.child(self.BarrelFuses, 'CrossarmFuses 2'), True)
                 for i in range(1, 3):
                     if i in self.anomaly_parts:
-                        fuse_obj = self.BarrelFuses.children.get(f'CrossarmFuses {i}').objects.get(f'BarrelFuse{i}')
+                        fuse_obj = self.index.object(self.index.child(self.BarrelFuses, f'CrossarmFuses {i}'), f'BarrelFuse{i}')
                         if fuse_obj:
                             rotate_object_global(fuse_obj, random.randint(-170, -140), 'X')
 
         if self.Fuse_Wires:
             for wire_name in wire_collections:
-                collection = self.Fuse_Wires.children.get(wire_name)
+                collection = self.index.child(self.Fuse_Wires, wire_name)
                 if collection:
                     toggle_collection_visibility(collection, True)
-                    empties = [obj for obj in collection.objects if obj.type == 'EMPTY']
+                    empties = self.index.wire_empties(collection)
                     if len(empties) == 2:
                         create_power_wire(empties[0], empties[1])
 
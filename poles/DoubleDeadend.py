@@ -15,15 +15,15 @@ class DoubleDeadend(PoleBase):
 
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         super().__init__(config, 'DoubleDeadend')
-        self.double_deadend_collection = bpy.data.collections.get("DoubleDeadendPole")
+        self.double_deadend_collection = self.index.collection("DoubleDeadendPole")
 
     def setup_pole(self):
         toggle_visibility(self.pole_type, True)
         toggle_collection_visibility(self.double_deadend_collection, True)
-        wire_collection = self.double_deadend_collection.children.get("SwitchSurgeArresters")
+        wire_collection = self.index.child(self.double_deadend_collection, "SwitchSurgeArresters")
         if wire_collection:
             for child_collection in wire_collection.children:
-                empties = [obj for obj in child_collection.objects if obj.type == 'EMPTY']
+                empties = self.index.wire_empties(child_collection)
                 if len(empties) == 2:
                     create_power_wire(empties[0], empties[1])
         self._add_neut_framing()
@@ -4,9 +4,14 @@ import bpy
 from mathutils import Vector
 
 from core.base import PoleBase
+from core.trackers import SceneJournal
 from utils.scene_utils import toggle_visibility, toggle_collection_visibility
 from utils.wire_generator import create_power_wire
+from utils.material_variation import set_flashed
 from generators.anomalies import rotate_object_global
+from core.log import get_logger
+
+logger = get_logger(__name__)
 
 class ModifiedVertical(PoleBase):
     """
@@ -15,14 +20,13 @@ class ModifiedVertical(PoleBase):
     """
 
     def __init__(self, config: Optional[Dict[str, Any]] = None):
-        print('gonna init modified vertical')
         # Initialize base class with config
         super().__init__(config, 'ModifiedVertical')
         
         # Initialize collections
-        self.pole_collection = bpy.data.collections.get("Poles")
-        self.framing_collection = bpy.data.collections.get("Modified_Vertical_Framing")
-        self.conductors_collection = bpy.data.collections.get("Conductors")
+        self.pole_collection = self.index.collection("Poles")
+        self.framing_collection = self.index.collection("Modified_Vertical_Framing")
+        self.conductors_collection = self.index.collection("Conductors")
         
         # Get pole object
         self.pole_type = self._get_pole_object(f"{self.pole_material}Pole")
@@ -62,7 +66,6 @@ class ModifiedVertical(PoleBase):
         
         if self.has_fcis:
             self._add_fcis()
-            print('added fcis')
 
         if self.has_three_phase_aetx:
             self._add_three_phase_aetx()
@@ -79,13 +82,13 @@ class ModifiedVertical(PoleBase):
 
         # Select insulator type from configuration
         selected_type = random.choice(self.insulator_types)
-        selected_collection = self.framing_collection.children.get(f"Insulators_{selected_type}")
+        selected_collection = self.index.child(self.framing_collection, f"Insulators_{selected_type}")
         
         if not selected_collection:
             return
         
         if self.pole_material == "Wood":
-            toggle_visibility(self.framing_collection.objects.get("TopClamp"), True)
+            toggle_visibility(self.index.object(self.framing_collection, "TopClamp"), True)
 
         # Get and sort insulators
         insulators = sorted(
@@ -94,7 +97,9 @@ class ModifiedVertical(PoleBase):
             key=lambda x: x.name
         )
 
-        # Position insulators based on configuration
+        # Position insulators based on configuration; the journal restores the
+        # original positions on the next scene reset
+        journal = SceneJournal.get_instance()
         for i, insulator in enumerate(insulators):
             # Only show insulators up to the number of phases
             is_visible = i < self.phases
@@ -103,23 +108,23 @@ class ModifiedVertical(PoleBase):
             if not is_visible:
                 continue
             
-            conductor = self.conductors_collection.objects.get(str(i + 1))
+            conductor = self.index.object(self.conductors_collection, str(i + 1))
             if conductor:
                 toggle_visibility(conductor, is_visible)
                 # Adjust conductor position based on insulator type
                 if selected_type == "Medium":
-                    conductor.location = Vector(self.conductor_positions_medium[i])
+                    journal.set(conductor, 'location', Vector(self.conductor_positions_medium[i]))
                 elif selected_type == "Short":
-                    conductor.location = Vector(self.conductor_positions_short[i])
+                    journal.set(conductor, 'location', Vector(self.conductor_positions_short[i]))
 
         self._add_neut_framing()
     
     def _add_als(self):
         """Add ALS components based on setup."""
-        als_collection = bpy.data.collections.get("ALS")
-        als2_collection = bpy.data.collections.get("ALS2x")
-        wire_attachments = bpy.data.collections.get("WireAttatchments")
-        wire_attachments2 = als2_collection.children.get("WireAttatchment")
+        als_collection = self.index.collection("ALS")
+        als2_collection = self.index.collection("ALS2x")
+        wire_attachments = self.index.collection("WireAttatchments")
+        wire_attachments2 = self.index.child(als2_collection, "WireAttatchment")
         if not als_collection:
             return
         
@@ -127,14 +132,14 @@ class ModifiedVertical(PoleBase):
 
         if wire_attachments:
             for collection in wire_attachments.children:
-                empties = [obj for obj in collection.objects if obj.type == 'EMPTY']
+                empties = self.index.wire_empties(collection)
                 if len(empties) == 2:
                     create_power_wire(empties[0], empties[1])
 
         if self.has_doubleals:  # Double lateral pull off with ALS pole
             toggle_collection_visibility(als2_collection, True)
             for collection in wire_attachments2.children:
-                empties = [obj for obj in collection.objects if obj.type == 'EMPTY']
+                empties = self.index.wire_empties(collection)
                 if len(empties) == 2:
                     create_power_wire(empties[0], empties[1])
         
@@ -146,30 +151,28 @@ class ModifiedVertical(PoleBase):
                     choice = random.choice(['als1', 'als2', 'both'])
                     
                     if choice in ['als1', 'both']:
-                        als_obj = als_collection.objects.get('ALS')
+                        als_obj = self.index.object(als_collection, 'ALS')
                         if als_obj:
                             rotate_object_global(als_obj, random.randint(-60, -50))
                     
                     if choice in ['als2', 'both']:
-                        als2_obj = als2_collection.objects.get('ALS2')
+                        als2_obj = self.index.object(als2_collection, 'ALS2')
                         if als2_obj:
                             rotate_object_global(als2_obj, random.randint(50, 60))
                 else:
                     # If only one ALS, just rotate it
-                    als_obj = als_collection.objects.get('ALS')
+                    als_obj = self.index.object(als_collection, 'ALS')
                     if als_obj:
                         rotate_object_global(als_obj, random.randint(-60, -50))
             
             elif random.random() < self.anomaly_types.get('als_flashed', 0.2):
                 for obj in als_collection.objects:
-                    if obj.get('label') == 'ALS':
-                        flashed_mat = bpy.data.materials.get('FlashedALSMaterial')
-                        if flashed_mat:
-                            obj.active_material = flashed_mat
-                            obj['label'] = 'ALS_Flashed'
+                    # The flashed surface is selected by the object's flashed property
+                    if obj.get('label') == 'ALS' and set_flashed(obj):
+                        SceneJournal.get_instance().set_item(obj, 'label', 'ALS_Flashed')
 
     def _add_three_phase_aetx(self):
-        self.transformers_collection = bpy.data.collections.get("3PhTransformer")
+        self.transformers_collection = self.index.collection("3PhTransformer")
         if random.random() < self.anomaly_types.get('fuse_open', 0.2):
             # Randomly choose which ALS parts have anomalies
             # Options: any single one, any pair, or all three
@@ -183,17 +186,17 @@ class ModifiedVertical(PoleBase):
             self.anomaly_parts = []
         
         toggle_collection_visibility(self.transformers_collection, True)
-        wire_collection = self.transformers_collection.children.get("WireAttatchesTx")
+        wire_collection = self.index.child(self.transformers_collection, "WireAttatchesTx")
         if wire_collection:
             for child_collection in wire_collection.children:
-                empties = [obj for obj in child_collection.objects if obj.type == 'EMPTY']
+                empties = self.index.wire_empties(child_collection)
                 if len(empties) == 2:
                     create_power_wire(empties[0], empties[1])
         for i in range(1, self.phases + 1):
             if i in self.anomaly_parts:
-                fuse_switch = self.transformers_collection.children.get(f'3PhTransformer{i}').objects.get(f'BarrelAetx{i}')
+                fuse_switch = self.index.object(self.index.child(self.transformers_collection, f'3PhTransformer{i}'), f'BarrelAetx{i}')
                 if fuse_switch:
-                    print(f'BarrelAetx{i} found')
+                    logger.debug("Opening BarrelAetx%d", i)
                     if i == 1:
                         rotate_object_global(fuse_switch, random.randint(140, 170), 'Y')
                     elif i == 2:
@@ -209,10 +212,10 @@ class ModifiedVertical(PoleBase):
         It handles both wood and concrete pole materials, and supports 2 or 3 phase setups.
         The method also manages anomaly states for ALS/fuse components and creates the necessary wire connections.
         """
-        self.ALS_Fuse_Crossarm_Collection = bpy.data.collections.get("ALS_Fuse_Crossarm")
-        self.fuse_collection = self.ALS_Fuse_Crossarm_Collection.children.get("Framings.001")
-        self.Fuse_Wires = self.ALS_Fuse_Crossarm_Collection.children.get("WireAttatches")
-        self.BarrelFuses = self.ALS_Fuse_Crossarm_Collection.children.get("CrossarmFuses")
+        self.ALS_Fuse_Crossarm_Collection = self.index.collection("ALS_Fuse_Crossarm")
+        self.fuse_collection = self.index.child(self.ALS_Fuse_Crossarm_Collection, "Framings.001")
+        self.Fuse_Wires = self.index.child(self.ALS_Fuse_Crossarm_Collection, "WireAttatches")
+        self.BarrelFuses = self.index.child(self.ALS_Fuse_Crossarm_Collection, "CrossarmFuses")
         if random.random() < self.anomaly_types.get('als_open' if self.has_als else 'fuse_open', 0.2):
             possible_combinations = [
                 [1], [2], [3],  # single anomaly
@@ -223,33 +226,33 @@ class ModifiedVertical(PoleBase):
         else:
             self.anomaly_parts = []
         if self.pole_material == "Wood":
-            toggle_visibility(self.fuse_collection.objects.get('WoodSupports1'), True)
-            toggle_visibility(self.fuse_collection.objects.get('WoodSupports2'), True)
-            toggle_visibility(self.fuse_collection.objects.get('WoodxArm'), True)
+            toggle_visibility(self.index.object(self.fuse_collection, 'WoodSupports1'), True)
+            toggle_visibility(self.index.object(self.fuse_collection, 'WoodSupports2'), True)
+            toggle_visibility(self.index.object(self.fuse_collection, 'WoodxArm'), True)
         else:
-            toggle_visibility(self.fuse_collection.objects.get('SteelXArm'), True)
+            toggle_visibility(self.index.object(self.fuse_collection, 'SteelXArm'), True)
             
         if self.phases == 3:
             wire_collections = ['ALS_Fuse_Crossarm_Wire1', 'ALS_Fuse_Crossarm_Wire2', 'ALS_Fuse_Crossarm_Wire3']
             
             if self.has_als:
-                toggle_collection_visibility(self.fuse_collection.children.get('1PH_ALS_Fuse_Crossarm'), True)
-                toggle_collection_visibility(self.fuse_collection.children.get('2PH_ALS_Fuse_Crossarm'), True)
-                toggle_collection_visibility(self.fuse_collection.children.get('3PH_ALS_Fuse_Crossarm'), True)
+                toggle_collection_visibility(self.index.child(self.fuse_collection, '1PH_ALS_Fuse_Crossarm'), True)
+                toggle_collection_visibility(self.index.child(self.fuse_collection, '2PH_ALS_Fuse_Crossarm'), True)
+                toggle_collection_visibility(self.index.child(self.fuse_collection, '3PH_ALS_Fuse_Crossarm'), True)
                 
                 # Apply anomalies to ALS parts
                 for i in range(1, 4):
                     if i in self.anomaly_parts:
-                        als_obj = self.fuse_collection.children.get(f'{i}PH_ALS_Fuse_Crossarm').objects.get(f'ALS{i}.009')
+                        als_obj = self.index.object(self.index.child(self.fuse_collection, f'{i}PH_ALS_Fuse_Crossarm'), f'ALS{i}.009')
                         if als_obj:
                             rotate_object_global(als_obj, random.randint(-60, -50), 'X')
             else:  # Barrel fuses
-                toggle_collection_visibility(self.BarrelFuses.children.get('CrossarmFuses 1'), True)
-                toggle_collection_visibility(self.BarrelFuses.children.get('CrossarmFuses 2'), True)
-                toggle_collection_visibility(self.BarrelFuses.children.get('CrossarmFuses 3'), True)
+                toggle_collection_visibility(self.index.child(self.BarrelFuses, 'CrossarmFuses 1'), True)
+                toggle_collection_visibility(self.index.child(self.BarrelFuses, 'CrossarmFuses 2'), True)
+                toggle_collection_visibility(self.index.child(self.BarrelFuses, 'CrossarmFuses 3'), True)
                 for i in range(1, 4):
                     if i in self.anomaly_parts:
-                        fuse_obj = self.BarrelFuses.children.get(f'CrossarmFuses {i}').objects.get(f'BarrelFuse{i}')
+                        fuse_obj = self.index.object(self.index.child(self.BarrelFuses, f'CrossarmFuses {i}'), f'BarrelFuse{i}')
                         if fuse_obj:
                             rotate_object_global(fuse_obj, random.randint(-180, -140), 'X')
                         
@@ -257,30 +260,30 @@ class ModifiedVertical(PoleBase):
             wire_collections = ['ALS_Fuse_Crossarm_Wire1', 'ALS_Fuse_Crossarm_Wire2']
             
             if self.has_als:
-                toggle_collection_visibility(self.fuse_collection.children.get('1PH_ALS_Fuse_Crossarm'), True)
-                toggle_collection_visibility(self.fuse_collection.children.get('2PH_ALS_Fuse_Crossarm'), True)
+                toggle_collection_visibility(self.index.child(self.fuse_collection, '1PH_ALS_Fuse_Crossarm'), True)
+                toggle_collection_visibility(self.index.child(self.fuse_collection, '2PH_ALS_Fuse_Crossarm'), True)
                 
                 # Apply anomalies to ALS parts (only first two)
                 for i in range(1, 3):
                     if i in self.anomaly_parts:
-                        als_obj = self.fuse_collection.children.get(f'{i}PH_ALS_Fuse_Crossarm').objects.get(f'ALS{i}.009')
+                        als_obj = self.index.object(self.index.child(self.fuse_collection, f'{i}PH_ALS_Fuse_Crossarm'), f'ALS{i}.009')
                         if als_obj:
                             rotate_object_global(als_obj, random.randint(-60, -50), 'X')
             else:  # Barrel fuses
-                toggle_collection_visibility(self.BarrelFuses.children.get('CrossarmFuses 1'), True)
-                toggle_collection_visibility(self.BarrelFuses.children.get('CrossarmFuses 2'), True)
+                toggle_collection_visibility(self.index.child(self.BarrelFuses, 'CrossarmFuses 1'), True)
+                toggle_collection_visibility(self.index.child(self.BarrelFuses, 'CrossarmFuses 2'), True)
                 for i in range(1, 3):
                     if i in self.anomaly_parts:
-                        fuse_obj = self.BarrelFuses.children.get(f'CrossarmFuses {i}').objects.get(f'BarrelFuse{i}')
+                        fuse_obj = self.index.object(self.index.child(self.BarrelFuses, f'CrossarmFuses {i}'), f'BarrelFuse{i}')
                         if fuse_obj:
                             rotate_object_global(fuse_obj, random.randint(-180, -140), 'X')
         
         # Create power wires
         if self.Fuse_Wires:
             for wire_name in wire_collections:
-                collection = self.Fuse_Wires.children.get(wire_name)
+                collection = self.index.child(self.Fuse_Wires, wire_name)
                 if collection:
                     toggle_collection_visibility(collection, True)
-                    empties = [obj for obj in collection.objects if obj.type == 'EMPTY']
+                    empties = self.index.wire_empties(collection)
                     if len(empties) == 2:
                         create_power_wire(empties[0], empties[1])
\ No newline at end of file
@@ -4,6 +4,7 @@ import bpy
 from mathutils import Vector
 
 from core.base import PoleBase
+from core.trackers import SceneJournal
 from utils.scene_utils import toggle_visibility, toggle_collection_visibility
 from utils.wire_generator import create_power_wire
 
@@ -14,14 +15,13 @@ class Vertical(PoleBase):
         and customizable insulator positions.
         """
     def __init__(self, config: Optional[Dict[str, Any]] = None):
-        print('gonna init modified vertical')
         # Initialize base class with config
         super().__init__(config, 'Vertical')
         
         # Initialize collections
-        self.framing_collection = bpy.data.collections.get("Vertical_Framing")
-        self.conductors_collection = bpy.data.collections.get("Conductors")
-        self.supportbracket_collection = self.framing_collection.children.get('SupportBrackets')
+        self.framing_collection = self.index.collection("Vertical_Framing")
+        self.conductors_collection = self.index.collection("Conductors")
+        self.supportbracket_collection = self.index.child(self.framing_collection, 'SupportBrackets')
 
         
         # Define standard positions
@@ -63,13 +63,13 @@ class Vertical(PoleBase):
 
         # Select insulator type from configuration
         selected_type = random.choice(self.insulator_types)
-        selected_collection = self.framing_collection.children.get(f"Insulators_{selected_type}1")
+        selected_collection = self.index.child(self.framing_collection, f"Insulators_{selected_type}1")
         
         if not selected_collection:
             return
         
         if self.pole_material == "Wood":
-            toggle_visibility(self.framing_collection.objects.get("TopClamp"), True)
+            toggle_visibility(self.index.object(self.framing_collection, "TopClamp"), True)
 
         # Get and sort insulators
         insulators = sorted(
@@ -78,41 +78,43 @@ class Vertical(PoleBase):
             key=lambda x: x.name
         )
 
-        # Position insulators based on configuration
+        # Position insulators based on configuration; the journal restores the
+        # original positions on the next scene reset
+        journal = SceneJournal.get_instance()
         for i, insulator in enumerate(insulators):
             # Only show insulators up to the number of phases
             is_visible = i < self.phases
             if self.has_insulator_support_bracket and selected_type == "Medium":
-                insulator.location = Vector(self.insulator_wbracket_positions_medium[i])
+                journal.set(insulator, 'location', Vector(self.insulator_wbracket_positions_medium[i]))
             elif self.has_insulator_support_bracket and selected_type == "Short":
-                insulator.location = Vector(self.insulator_wbracket_positions_short[i])
+                journal.set(insulator, 'location', Vector(self.insulator_wbracket_positions_short[i]))
             elif selected_type == "Medium":
-                insulator.location = Vector(self.insulator_positions_medium[i])
+                journal.set(insulator, 'location', Vector(self.insulator_positions_medium[i]))
             elif selected_type == "Short":
-                insulator.location = Vector(self.insulator_positions_short[i])
+                journal.set(insulator, 'location', Vector(self.insulator_positions_short[i]))
             
             toggle_visibility(insulator, is_visible)
 
             if self.has_insulator_support_bracket:
-                supportbracket = self.supportbracket_collection.objects.get(f"{i+1}.001")
+                supportbracket = self.index.object(self.supportbracket_collection, f"{i+1}.001")
                 toggle_visibility(supportbracket, is_visible)
             
             if not is_visible:
                 continue
             
-            conductor = self.conductors_collection.objects.get(str(i + 1))
+            conductor = self.index.object(self.conductors_collection, str(i + 1))
             if conductor:
                 toggle_visibility(conductor, is_visible)
                 # Adjust conductor position based on insulator type
                 if selected_type == "Medium":
                     if self.has_insulator_support_bracket:  
-                        conductor.location = Vector(self.conductor_positions_medium_wbracket[i])
+                        journal.set(conductor, 'location', Vector(self.conductor_positions_medium_wbracket[i]))
                     else:
-                        conductor.location = Vector(self.conductor_positions_medium[i])
+                        journal.set(conductor, 'location', Vector(self.conductor_positions_medium[i]))
                 elif selected_type == "Short":
                     if self.has_insulator_support_bracket:
-                        conductor.location = Vector(self.conductor_positions_short_wbracket[i])
+                        journal.set(conductor, 'location', Vector(self.conductor_positions_short_wbracket[i]))
                     else:
-                        conductor.location = Vector(self.conductor_positions_short[i])
+                        journal.set(conductor, 'location', Vector(self.conductor_positions_short[i]))
         
         self._add_neut_framing()
\ No newline at end of file
@@ -1,30 +1,163 @@
 import random
+from collections import OrderedDict
 from pathlib import Path
+from typing import Dict, Any, List, Optional
 import bpy
 
-def setup_random_background(config):
-    """Set up random HDRI background from configured directory."""
-    env_tex_dir = Path(config['backgrounds']['hdri_path'])
-    env_tex_files = list(env_tex_dir.glob('*.exr'))
-    
+from core.log import get_logger
+
+logger = get_logger(__name__)
+
+# Names of the world nodes built once and reused every frame
+ENVIRONMENT_NODE = 'HDRI Environment'
+BACKGROUND_NODE = 'HDRI Background'
+OUTPUT_NODE = 'HDRI Output'
+
+_index: Dict[str, List[Path]] = {}
+
+def hdri_files(config):
+    """HDRI files of the configured backgrounds directory, in a fixed order (listed once per directory)."""
+    directory = config['backgrounds']['hdri_path']
+    if directory not in _index:
+        _index[directory] = sorted(Path(directory).glob('*.exr'))
+        logger.debug("Indexed %d HDRIs in %s", len(_index[directory]), directory)
+    return _index[directory]
+
+def pick_background(config):
+    """
+    Pick a random HDRI without loading it.
+
+    Draws exactly what ``setup_random_background`` draws, so a planner seeded like
+    a worker picks the same background.
+
+    Returns:
+        Path of the HDRI, or None if the directory has none
+    """
+    env_tex_files = hdri_files(config)
     if not env_tex_files:
-        print("Warning: No .exr files found in backgrounds directory")
-        return
-        
-    random_env_tex = random.choice(env_tex_files)
-    world = bpy.context.scene.world
+        return None
+    return random.choice(env_tex_files)
+
+def image_bytes(image) -> int:
+    """Memory of an image's pixel buffer (RGBA, 4 bytes per channel for float images)."""
+    width, height = image.size
+    return width * height * 4 * (4 if image.is_float else 1)
+
+class HDRICache:
+    """Loaded HDRI images, least recently used first, bounded by their pixel memory.
+
+    Cached images carry a fake user, so ``memory.purge_images`` does not remove
+    the ones the world is not showing; evicted images are removed explicitly.
+    Settings come from the ``backgrounds`` section of rendering.yaml:
+        cache_mb:   pixel memory of the cached HDRIs (the one in use always stays)
+    """
+
+    def __init__(self, cache_mb: float = 2048):
+        self.max_bytes = int(cache_mb * 1024 * 1024)
+        self.images: 'OrderedDict[str, tuple]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _cached(self, key: str):
+        """Cached image of a file, or None when it is not cached or was removed with its .blend."""
+        if key not in self.images:
+            return None
+        image = bpy.data.images.get(self.images[key][0])
+        if image is None:
+            del self.images[key]
+        return image
+
+    def get(self, path) -> bpy.types.Image:
+        """Image of an HDRI file, loaded on the first request and marked most recently used."""
+        key = str(path)
+        image = self._cached(key)
+        if image is not None:
+            self.hits += 1
+            self.images.move_to_end(key)
+            return image
+        self.misses += 1
+        image = bpy.data.images.load(key, check_existing=True)
+        image.use_fake_user = True
+        self.images[key] = (image.name, image_bytes(image))
+        self._evict()
+        return image
+
+    def _evict(self) -> None:
+        """Remove least recently used images until the cache fits, keeping the newest."""
+        for key in [key for key in self.images if self._cached(key) is None]:
+            self.images.pop(key, None)
+        while len(self.images) > 1 and self.resident_bytes() > self.max_bytes:
+            key, (name, _) = self.images.popitem(last=False)
+            image = bpy.data.images.get(name)
+            if image is not None:
+                bpy.data.images.remove(image)
+            self.evictions += 1
+            logger.debug("Evicted HDRI %s", key)
+
+    def resident_bytes(self) -> int:
+        return sum(size for _, size in self.images.values())
+
+    def summary(self) -> Dict[str, Any]:
+        """Hit rate and memory of the cached HDRIs."""
+        requests = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / requests if requests else 0.0,
+            'evictions': self.evictions,
+            'images': len(self.images),
+            'resident_mb': round(self.resident_bytes() / (1024 * 1024), 1),
+        }
+
+_cache: Optional[HDRICache] = None
+
+def hdri_cache(config: Optional[Dict[str, Any]] = None) -> HDRICache:
+    """HDRI cache of this process, created with the first config's ``backgrounds.cache_mb``."""
+    global _cache
+    if _cache is None:
+        _cache = HDRICache(((config or {}).get('backgrounds', {}) or {}).get('cache_mb', 2048))
+    return _cache
+
+def world_environment_node(world):
+    """
+    Environment Texture node of the world's HDRI node tree, building the tree if it is missing.
+
+    The Environment -> Background -> Output tree is built once per world; later
+    frames only change the image the environment node points to.
+    """
     world.use_nodes = True
     node_tree = world.node_tree
+    env_tex_node = node_tree.nodes.get(ENVIRONMENT_NODE)
+    if env_tex_node is not None and env_tex_node.type == 'TEX_ENVIRONMENT':
+        return env_tex_node
     node_tree.nodes.clear()
-    
+
     # Setup nodes
     env_tex_node = node_tree.nodes.new(type='ShaderNodeTexEnvironment')
+    env_tex_node.name = ENVIRONMENT_NODE
     background_node = node_tree.nodes.new(type='ShaderNodeBackground')
+    background_node.name = BACKGROUND_NODE
     output_node = node_tree.nodes.new(type='ShaderNodeOutputWorld')
-    
+    output_node.name = OUTPUT_NODE
+
     # Link nodes
     node_tree.links.new(env_tex_node.outputs['Color'], background_node.inputs['Color'])
     node_tree.links.new(background_node.outputs['Background'], output_node.inputs['Surface'])
-    
-    # Load image
-    env_tex_node.image = bpy.data.images.load(str(random_env_tex))
+    logger.debug("Built world node tree of %s", world.name)
+    return env_tex_node
+
+def setup_random_background(config):
+    """Set up random HDRI background from configured directory and return its path."""
+    random_env_tex = pick_background(config)
+
+    if random_env_tex is None:
+        logger.warning("No .exr files found in backgrounds directory %s", config['backgrounds']['hdri_path'])
+        return None
+
+    env_tex_node = world_environment_node(bpy.context.scene.world)
+    image = hdri_cache(config).get(random_env_tex)
+    # Swap only the image pointer; the same HDRI as last frame changes nothing
+    if env_tex_node.image != image:
+        env_tex_node.image = image
+    return random_env_tex
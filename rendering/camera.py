@@ -2,6 +2,12 @@ import bpy
 import math
 import random
 from mathutils import Vector
+from bpy_extras.object_utils import world_to_camera_view
+
+from core.trackers import SceneJournal
+from core.log import get_logger
+
+logger = get_logger(__name__)
 
 def setup_camera(config):
     """
@@ -18,7 +24,7 @@ def setup_camera(config):
     ])
     
     if not camera or not view_target:
-        print("Warning: Camera or ViewPart empty not found in scene")
+        logger.warning("Camera or ViewPart empty not found in scene")
         return None
     
     # Get camera settings from config
@@ -70,18 +76,54 @@ def setup_camera(config):
     if z < min_height:
         z = min_height
     
-    # Position camera
-    camera.location = (x, y, z)
+    # Position camera (journaled, so the next scene reset restores the .blend's camera)
+    journal = SceneJournal.get_instance()
+    journal.set(camera, 'location', Vector((x, y, z)))
     
     # Point camera at view target
     direction = target_pos - camera.location
     rot_quat = direction.to_track_quat('-Z', 'Y')
-    camera.rotation_euler = rot_quat.to_euler()
+    rotation = rot_quat.to_euler()
     
     # Add subtle random rotation variation
-    camera.rotation_euler.z += random.uniform(
+    rotation.z += random.uniform(
         cam_config['rotation']['random_z']['min'],
         cam_config['rotation']['random_z']['max']
     )
+    journal.set(camera, 'rotation_euler', rotation)
+    
+    # Record the sampled view so frame logs can describe it
+    journal.set_item(camera, 'view_target', view_target.name)
+    journal.set_item(camera, 'angle_style', angle_style)
+    journal.set_item(camera, 'distance', distance)
+    
+    return camera
+
+def view_target_info(camera):
+    """
+    Describe the camera's view target after rendering.
     
-    return camera
\ No newline at end of file
+    Returns:
+        Dictionary with the target name, whether it projects inside the frame and
+        its pass index (0 when the target is not an annotated object)
+    """
+    target = bpy.data.objects.get(camera.get('view_target', '')) if camera else None
+    if not target:
+        return {'name': None, 'in_frame': False, 'pass_index': 0}
+    
+    co = world_to_camera_view(bpy.context.scene, camera, target.matrix_world.translation)
+    return {
+        'name': target.name,
+        'in_frame': 0.0 <= co.x <= 1.0 and 0.0 <= co.y <= 1.0 and co.z > 0.0,
+        'pass_index': target.pass_index if target.get('annotate') == "True" else 0,
+    }
+
+def camera_attributes(camera):
+    """Return the view parameters recorded on the camera by setup_camera."""
+    if not camera:
+        return {}
+    return {
+        'view_target': camera.get('view_target'),
+        'angle_style': camera.get('angle_style'),
+        'distance': camera.get('distance'),
+    }
\ No newline at end of file
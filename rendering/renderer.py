@@ -3,6 +3,12 @@ import bpy
 import json
 from pathlib import Path
 
+from core.output_layout import OutputLayout, split_frame_id
+from core.trackers import SceneJournal
+from core.log import get_logger
+
+logger = get_logger(__name__)
+
 def setup_render_settings(config):
     """Configure render settings based on config file."""
     scene = bpy.context.scene
@@ -36,78 +42,253 @@ def setup_render_settings(config):
             scene.cycles.device = 'GPU'
         scene.render.threads = config['threads']
 
-def render_scene(image_num, config):
+def assign_pass_indices():
+    """
+    Give every visible annotated object a pass index for the segmentation mask.
+    
+    Objects sharing a ``group_id`` share one index.
+    
+    Returns:
+        Dictionary mapping pass index to object label
+    """
+    journal = SceneJournal.get_instance()
+    object_to_index = {}
+    index = 1
+    group_indices = {}
+    
+    for obj in bpy.data.objects:
+        if obj.visible_get() and obj.get("annotate") == "True":
+            logger.debug("Annotating %s", obj.name)
+            group_id = obj.get("group_id")
+            if group_id:
+                if group_id not in group_indices:
+                    group_indices[group_id] = index
+                    index += 1
+                journal.set(obj, 'pass_index', group_indices[group_id])
+            else:
+                journal.set(obj, 'pass_index', index)
+                index += 1
+            
+            label = obj.get("label")
+            if label:
+                object_to_index[obj.pass_index] = label
+    
+    return object_to_index
+
+class FrameRingSink:
+    """
+    Publishes every rendered frame into a shared-memory ring for a local trainer.
+    
+    A Set Alpha node puts the object index pass into the alpha channel of the
+    composited image and a Viewer node receives it, so one ``foreach_get``
+    copies both straight from the Viewer image into the ring slot. Readers use
+    ``core.frame_ring.FrameRingReader``.
+    
+    Settings come from the ``frame_ring`` section of rendering.yaml:
+        name:         shared memory block name prefix; each worker's ring is
+                      ``core.frame_ring.ring_name(name, worker_id)``
+        slots:        number of frames the ring holds
+        label_bytes:  space reserved for each frame's JSON label mapping
+        policy:       ``block`` waits for slow readers, ``drop`` overwrites their frames
+        timeout:      seconds to wait for a free slot under ``block`` before skipping the frame
+        write_files:  also write Image/Mask PNGs through the File Output node
+    """
+    
+    def __init__(self, settings, worker_id=0):
+        from core.frame_ring import FrameRingWriter, ring_name
+        
+        render = bpy.context.scene.render
+        self.width = render.resolution_x * render.resolution_percentage // 100
+        self.height = render.resolution_y * render.resolution_percentage // 100
+        self.write_files = settings.get('write_files', True)
+        self.name = ring_name(settings.get('name', 'synthetic_frames'), worker_id)
+        self.writer = FrameRingWriter(self.name, self.width, self.height,
+                                      settings.get('slots', 4), settings.get('label_bytes', 65536),
+                                      settings.get('policy', 'block'), settings.get('timeout', 60))
+        self.skipped = 0
+        self._setup_viewer(bpy.context.scene.node_tree)
+    
+    @classmethod
+    def from_config(cls, config, worker_id=0):
+        """Create the worker's sink if ``frame_ring.enabled`` is set, otherwise return None."""
+        settings = config.get('frame_ring', {}) or {}
+        if not settings.get('enabled', False):
+            return None
+        sink = cls(settings, worker_id)
+        logger.info("Publishing frames to shared memory ring %s", sink.name)
+        return sink
+    
+    def _setup_viewer(self, node_tree):
+        bpy.context.view_layer.use_pass_object_index = True
+        render_layers = node_tree.nodes.get("Render Layers")
+        set_alpha = node_tree.nodes.get("Frame Ring Alpha")
+        if set_alpha is None:
+            set_alpha = node_tree.nodes.new('CompositorNodeSetAlpha')
+            set_alpha.name = "Frame Ring Alpha"
+        set_alpha.mode = 'REPLACE_ALPHA'
+        viewer = node_tree.nodes.get("Frame Ring Viewer")
+        if viewer is None:
+            viewer = node_tree.nodes.new('CompositorNodeViewer')
+            viewer.name = "Frame Ring Viewer"
+        viewer.use_alpha = True
+        
+        node_tree.links.new(render_layers.outputs['Image'], set_alpha.inputs['Image'])
+        node_tree.links.new(render_layers.outputs['IndexOB'], set_alpha.inputs['Alpha'])
+        node_tree.links.new(set_alpha.outputs['Image'], viewer.inputs['Image'])
+        node_tree.nodes.active = viewer
+    
+    def publish(self, frame_id, labels):
+        """Copy the last render's pixels and index pass into the next ring slot."""
+        image = bpy.data.images.get('Viewer Node')
+        if image is None or tuple(image.size) != (self.width, self.height):
+            logger.warning("Viewer image missing or resized, frame %d not published", frame_id)
+            self.skipped += 1
+            return
+        # Check the labels before acquire() invalidates the slot
+        try:
+            encoded = self.writer.encode_labels(frame_id, labels)
+        except ValueError as error:
+            logger.warning("%s, frame %d not published", error, frame_id)
+            self.skipped += 1
+            return
+        slot = self.writer.acquire()
+        if slot is None:
+            logger.warning("Frame ring full for %s s, frame %d not published",
+                           self.writer.timeout, frame_id)
+            self.skipped += 1
+            return
+        image.pixels.foreach_get(slot)
+        self.writer.commit(frame_id, encoded)
+    
+    def close(self):
+        self.writer.close()
+
+def save_frame_mapping(layout, frame_id, object_to_index):
+    """Add a frame's pass index -> label mapping to its layout's mapping file."""
+    if not object_to_index:
+        return
+    mapping_file = layout.mapping_path(frame_id)
+    frame_mapping = {layout.frame_key(frame_id): object_to_index}
+    
+    # Append to existing file or create new one
+    try:
+        with open(mapping_file, 'r+') as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError:
+                data = {}
+            data.update(frame_mapping)
+            f.seek(0)
+            json.dump(data, f, indent=2)
+            f.truncate()
+    except FileNotFoundError:
+        with open(mapping_file, 'w') as f:
+            json.dump(frame_mapping, f, indent=2)
+
+def reuse_cached_frame(cache, key, config, layout, frame_id):
+    """
+    Link a cached render of the current scene into a frame's outputs instead of rendering it.
+    
+    Pass indices are still assigned so the scene matches a rendered frame, and the
+    label mapping comes from the current scene's labels rather than the cache.
+    
+    Args:
+        cache: core.render_cache.RenderCache
+        key: Scene key of the current scene
+        config: Rendering configuration dictionary
+        layout: OutputLayout resolving output paths
+        frame_id: Frame ID used in output names
+    
+    Returns:
+        Dictionary mapping pass index to object label, or None on a cache miss
+    """
+    cached = cache.lookup(key)
+    if cached is None:
+        return None
+    object_to_index = assign_pass_indices() if config['output']['mask_enabled'] else {}
+    layout.shard_dir(frame_id).mkdir(parents=True, exist_ok=True)
+    cache.fetch(key, layout.image_path(frame_id), layout.mask_path(frame_id))
+    save_frame_mapping(layout, frame_id, object_to_index)
+    logger.debug("Reused cached render %s for frame %d", key, frame_id)
+    return object_to_index
+
+def render_scene(image_num, config, layout=None, frame_id=None, sink=None):
     """
     Render scene with configured settings and save outputs.
     
     Args:
-        output_dir: Directory to save renders
-        image_num: Current image number
+        image_num: Current image number within the batch
         config: Rendering configuration dictionary
+        layout: OutputLayout resolving output paths (built from config if omitted)
+        frame_id: Frame ID used in output names (derived from image_num if omitted)
+        sink: Optional FrameRingSink the rendered pixels are published to
+    
+    Returns:
+        Dictionary mapping pass index to object label for the frame
     """
+    if layout is None:
+        layout = OutputLayout.from_config(config)
+    if frame_id is None:
+        frame_id = layout.frame_id(image_num)
+
     # Create output directory if it doesn't exist
-    output_dir = Path(config["output"]["base_path"])
+    output_dir = layout.shard_dir(frame_id)
     output_dir.mkdir(parents=True, exist_ok=True)
-    bpy.context.scene.render.filepath = str(output_dir / "image.png")
+    bpy.context.scene.render.filepath = str(layout.base_path / "image.png")
+
+    # Blender's frame number only drives the #### suffix of the File Output node,
+    # so keep it small in sharded mode and rename the files after rendering.
+    frame_number = frame_id if not layout.sharded else split_frame_id(frame_id)[1] % 10000
     
     node_tree = bpy.context.scene.node_tree
     file_output_node = node_tree.nodes.get("File Output")
 
+    write_files = sink is None or sink.write_files
     if file_output_node:
-        file_output_node.base_path = config["output"]["base_path"]
-        file_output_node.file_slots[0].path = "Image_####"
-        file_output_node.file_slots[1].path = "Mask_####"
+        file_output_node.mute = not write_files
+        file_output_node.base_path = str(output_dir)
+        file_output_node.file_slots[0].path = layout.compositor_slot_path("Image", frame_id)
+        file_output_node.file_slots[1].path = layout.compositor_slot_path("Mask", frame_id)
 
     # Set frame number
-    bpy.context.scene.frame_set(image_num)
+    bpy.context.scene.frame_set(frame_number)
     scene = bpy.context.scene
     scene.cycles.samples = config['samples']
     
     # Handle object indexing for segmentation
+    object_to_index = {}
     if config['output']['mask_enabled']:
-        object_to_index = {}
-        index = 1
-        group_indices = {}
+        object_to_index = assign_pass_indices()
         
-        # Process objects for segmentation
-        for obj in bpy.data.objects:
-            if obj.visible_get() and obj.get("annotate") == "True":
-                print(obj.name)
-                group_id = obj.get("group_id")
-                if group_id:
-                    if group_id not in group_indices:
-                        group_indices[group_id] = index
-                        index += 1
-                    obj.pass_index = group_indices[group_id]
-                else:
-                    obj.pass_index = index
-                    index += 1
-                
-                label = obj.get("label")
-                if label:
-                    object_to_index[obj.pass_index] = label
-        
-        # Save mapping to JSON
-        if object_to_index:
-            mapping_file = output_dir / "all_frame_mappings.json"
-            frame_mapping = {f"{config['output']['file_prefix']}{image_num:0{config['output']['file_padding']}d}": object_to_index}
-            
-            # Append to existing file or create new one
-            try:
-                with open(mapping_file, 'r+') as f:
-                    try:
-                        data = json.load(f)
-                    except json.JSONDecodeError:
-                        data = {}
-                    data.update(frame_mapping)
-                    f.seek(0)
-                    json.dump(data, f, indent=2)
-            except FileNotFoundError:
-                with open(mapping_file, 'w') as f:
-                    json.dump(frame_mapping, f, indent=2)
+        save_frame_mapping(layout, frame_id, object_to_index)
     
     # Perform render
-    bpy.ops.render.render(write_still=True)
+    bpy.ops.render.render(write_still=write_files)
+    
+    if sink is not None:
+        sink.publish(frame_id, object_to_index)
+
+    if file_output_node and write_files and layout.sharded:
+        for kind, final_path in (("Image", layout.image_path(frame_id)), ("Mask", layout.mask_path(frame_id))):
+            written = layout.compositor_output_path(kind, frame_id, frame_number)
+            if written.exists():
+                os.replace(written, final_path)
+    
+    logger.debug("Rendering complete for image %d", image_num)
+    return object_to_index
+
+def remove_frame_outputs(layout, frame_id):
+    """Delete a rendered frame's image, mask and label mapping entry."""
+    for path in (layout.image_path(frame_id), layout.mask_path(frame_id)):
+        if path.exists():
+            path.unlink()
     
-    print(f"Rendering complete for image {image_num}")
-    return True
\ No newline at end of file
+    mapping_file = layout.mapping_path(frame_id)
+    try:
+        with open(mapping_file, 'r') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return
+    if data.pop(layout.frame_key(frame_id), None) is not None:
+        with open(mapping_file, 'w') as f:
+            json.dump(data, f, indent=2)
@@ -0,0 +1,104 @@
+"""
+Frame Acceptance Rules
+Checks finished frames against configurable rules so quota runs can replace useless renders.
+"""
+
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from scripts.process_output import annotate_mask
+
+def annotate_frame(mask_path, object_labels: dict, config: dict) -> list:
+    """
+    Annotate one rendered frame from its index mask, as the COCO export would.
+
+    Args:
+        mask_path: Path of the frame's index mask
+        object_labels: Mapping of pass index to object label written for the frame
+        config: Rendering configuration (``output.tag_list`` and ``min_object_size``)
+
+    Returns:
+        List of annotation dictionaries (empty if the mask cannot be read)
+    """
+    mask = cv2.imread(str(mask_path), cv2.IMREAD_GRAYSCALE)
+    if mask is None:
+        return []
+    labels = {str(index): label for index, label in object_labels.items()}
+    return annotate_mask(mask, labels, config['output'].get('tag_list') or None,
+                         config['output'].get('min_object_size', 100))
+
+class FrameAcceptance:
+    """
+    Decides whether a rendered frame is kept, based on the ``quota`` section of rendering.yaml.
+
+    Rules:
+        min_annotations:          minimum number of annotations surviving tag_list and min_object_size
+        count_ignore:             categories not counted toward min_annotations (e.g. the pole itself)
+        required_categories:      categories that must all be present
+        require_target_in_frame:  the camera's view target must project inside the frame
+        min_target_area:          minimum visible pixel area of the view target, when it is annotated
+    """
+
+    def __init__(self, config: dict):
+        self.settings = config.get('quota', {}) or {}
+        self.tag_list = config['output'].get('tag_list') or None
+        self.min_object_size = config['output'].get('min_object_size', 100)
+        self.accepted = 0
+        self.rejected = Counter()
+
+    def check(self, mask_path, object_labels: dict, target: dict):
+        """
+        Check one rendered frame.
+
+        Args:
+            mask_path: Path of the frame's index mask
+            object_labels: Mapping of pass index to object label written for the frame
+            target: View target description from ``rendering.camera.view_target_info``
+
+        Returns:
+            Tuple of (accepted, reject reason or None, annotations)
+        """
+        reason, annotations = self._evaluate(mask_path, object_labels, target)
+        if reason is None:
+            self.accepted += 1
+        else:
+            self.rejected[reason] += 1
+        return reason is None, reason, annotations
+
+    def _evaluate(self, mask_path, object_labels: dict, target: dict):
+        if self.settings.get('require_target_in_frame', True) and not target.get('in_frame', True):
+            return 'target_off_frame', []
+
+        mask = cv2.imread(str(mask_path), cv2.IMREAD_GRAYSCALE)
+        if mask is None:
+            return 'missing_mask', []
+
+        labels = {str(index): label for index, label in object_labels.items()}
+        annotations = annotate_mask(mask, labels, self.tag_list, self.min_object_size)
+
+        target_index = target.get('pass_index', 0)
+        if target_index and np.count_nonzero(mask == target_index) < self.settings.get('min_target_area', 0):
+            return 'target_too_small', annotations
+
+        ignored = set(self.settings.get('count_ignore', []) or [])
+        counted = [a for a in annotations if a['category'] not in ignored]
+        if len(counted) < self.settings.get('min_annotations', 1):
+            return 'too_few_annotations', annotations
+
+        categories = {a['category'] for a in annotations}
+        if any(category not in categories for category in self.settings.get('required_categories', []) or []):
+            return 'missing_required_category', annotations
+
+        return None, annotations
+
+    def summary(self) -> dict:
+        """Accept and reject counts, by reason."""
+        total = self.accepted + sum(self.rejected.values())
+        return {
+            'accepted': self.accepted,
+            'rejected': sum(self.rejected.values()),
+            'reject_reasons': dict(self.rejected),
+            'acceptance_rate': self.accepted / total if total else None,
+        }
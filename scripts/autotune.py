@@ -0,0 +1,193 @@
+"""
+Throughput Autotuner
+Benchmarks concurrent Blender workers × Cycles threads per worker on this node and
+writes the fastest setting into the node profile the supervisor uses.
+
+Every grid point renders the same fixed plan of frames, so only the worker and
+thread split differs between them. Workers are pinned to disjoint CPU sets where
+the platform supports affinity.
+
+Usage:
+    python scripts/autotune.py [--workers 1,2,4] [--threads 0,4,8] [--frames 8] [--device cpu]
+"""
+
+import copy
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.output_layout import OutputLayout, split_frame_id
+from core.frame_log import iter_frame_records
+from core.heartbeat import write_json_atomic
+from core.scene_spec import frame_seed
+from core.scheduling import build_plan
+from core.node_profile import (split_cpus, pin_to_cpus, available_cpus, total_memory_bytes,
+                               write_node_profile)
+from core.log import get_logger, configure_logging
+from scripts.supervisor import load_config, blender_command
+
+logger = get_logger(__name__)
+
+def benchmark(config: dict, workers: int, threads: int, frames: int, seed: int, device: str,
+              bench_dir: Path) -> dict:
+    """
+    Render a fixed plan with one worker/thread combination and measure it.
+
+    Args:
+        config: Rendering configuration
+        workers: Number of concurrent Blender processes
+        threads: Cycles threads per process, 0 for every CPU of the worker's set
+        frames: Frames in the plan, split across the workers
+        seed: Base seed the plan's frame seeds derive from
+        device: Render device passed to the workers
+        bench_dir: Scratch directory for this run's outputs
+
+    Returns:
+        Result dictionary with images per hour and the workers' combined peak RSS,
+        renders included
+    """
+    shutil.rmtree(bench_dir, ignore_errors=True)
+    bench_dir.mkdir(parents=True)
+
+    # Same settings as production, except outputs go to a sharded scratch layout
+    bench_config = copy.deepcopy(config)
+    output = bench_config['output']
+    output.update({'base_path': str(bench_dir), 'save_coco': False, 'visualize_annotations': False})
+    output['layout'] = dict(output.get('layout', {}) or {}, mode='sharded')
+    output['staging'] = {'enabled': False}
+    bench_config['frame_ring'] = {'enabled': False}
+    config_path = bench_dir / "rendering.yaml"
+    with open(config_path, 'w') as f:
+        yaml.safe_dump(bench_config, f)
+
+    plan_frames = [{'seed': frame_seed(seed, i), 'predicted_seconds': 0.0} for i in range(frames)]
+    plan = build_plan(plan_frames, workers, seed, [0] * workers)
+    plan_path = bench_dir / "plan.json"
+    write_json_atomic(plan_path, plan)
+
+    cpu_sets = split_cpus(workers)
+    processes = []
+    start = time.time()
+    for worker_id in range(workers):
+        worker_threads = threads or len(cpu_sets[worker_id])
+        command = blender_command(config) + [
+            '--render-config', str(config_path),
+            '--num-images', str(len(plan['workers'][str(worker_id)]['frames'])),
+            '--start-sequence', '0',
+            '--worker-id', str(worker_id),
+            '--seed', str(seed),
+            '--plan', str(plan_path),
+            '--threads', str(worker_threads),
+            '--device', device,
+            '--skip-post-process',
+        ]
+        processes.append(subprocess.Popen(command, cwd=str(project_root),
+                                          preexec_fn=pin_to_cpus(cpu_sets[worker_id])))
+    exit_codes = [process.wait() for process in processes]
+    wall_seconds = time.time() - start
+
+    # Throughput of the render loop, excluding Blender start-up and .blend loading
+    layout = OutputLayout.from_config(bench_config)
+    busy, peak_rss, rendered = {}, {}, 0
+    for record in iter_frame_records(layout.iter_frame_logs()):
+        worker_id = split_frame_id(record['frame_id'])[0]
+        busy[worker_id] = busy.get(worker_id, 0.0) + record.get('seconds', 0.0)
+        # peak_rss_mb is the process peak including the render; rss_mb is sampled before it
+        peak_rss[worker_id] = max(peak_rss.get(worker_id, 0.0),
+                                  record.get('peak_rss_mb') or record.get('rss_mb') or 0.0)
+        rendered += 1
+
+    makespan = max(busy.values(), default=0.0)
+    return {
+        'workers': workers,
+        'threads': threads or len(cpu_sets[0]),
+        'device': device,
+        'frames': rendered,
+        'failed': any(exit_codes) or rendered < frames,
+        'wall_seconds': wall_seconds,
+        'images_per_hour': rendered / makespan * 3600 if makespan else 0.0,
+        'peak_rss_mb': sum(peak_rss.values()),
+    }
+
+def choose_best(results: list, memory_headroom: float = 0.9) -> dict:
+    """Fastest successful result whose combined peak RSS fits in the node's memory."""
+    memory = total_memory_bytes()
+    limit_mb = memory / (1024 * 1024) * memory_headroom if memory else None
+    candidates = [r for r in results if not r['failed'] and (limit_mb is None or r['peak_rss_mb'] <= limit_mb)]
+    return max(candidates, key=lambda r: r['images_per_hour'], default=None)
+
+def parse_list(value: str) -> list:
+    return [int(item) for item in value.split(',') if item.strip()]
+
+def main():
+    import argparse
+    config = load_config()
+    settings = config.get('autotune', {}) or {}
+    parser = argparse.ArgumentParser(description="Benchmark workers × Cycles threads on this node")
+    parser.add_argument("--workers", type=parse_list, default=settings.get('workers', [1, 2, 4]),
+                        help="Comma-separated worker counts to try")
+    parser.add_argument("--threads", type=parse_list, default=settings.get('threads', [0]),
+                        help="Comma-separated Cycles thread counts per worker (0 = all CPUs of the worker)")
+    parser.add_argument("--frames", type=int, default=settings.get('frames', 8),
+                        help="Frames rendered per grid point")
+    parser.add_argument("--device", choices=['auto', 'gpu', 'cpu'], default=settings.get('device', 'auto'))
+    parser.add_argument("--seed", type=int, default=settings.get('seed', 1234), help="Seed of the fixed plan")
+    args = parser.parse_args()
+    configure_logging(config)
+
+    bench_root = Path(settings.get('bench_dir', 'autotune'))
+    if not bench_root.is_absolute():
+        bench_root = Path(config['output']['base_path']) / bench_root
+
+    cpus = len(available_cpus())
+    results = []
+    for workers in args.workers:
+        for threads in args.threads:
+            if workers * (threads or 1) > cpus and args.device == 'cpu':
+                logger.info("Skipping %d workers × %d threads: more threads than %d CPUs", workers, threads, cpus)
+                continue
+            logger.info("Benchmarking %d workers × %s threads", workers, threads or 'all')
+            result = benchmark(config, workers, threads, args.frames, args.seed, args.device,
+                               bench_root / f"w{workers}_t{threads}")
+            logger.info("%d workers × %d threads: %.1f images/hour, peak RSS %.0f MB%s",
+                        result['workers'], result['threads'], result['images_per_hour'],
+                        result['peak_rss_mb'], " (failed)" if result['failed'] else "")
+            results.append(result)
+
+    for result in sorted(results, key=lambda r: -r['images_per_hour']):
+        print(f"{result['workers']:3d} workers × {result['threads']:3d} threads: "
+              f"{result['images_per_hour']:8.1f} images/hour, peak RSS {result['peak_rss_mb']:8.0f} MB"
+              + (" FAILED" if result['failed'] else ""))
+
+    best = choose_best(results, settings.get('memory_headroom', 0.9))
+    if best is None:
+        logger.error("No benchmark run succeeded, node profile not written")
+        sys.exit(1)
+    profile = {
+        'hostname': socket.gethostname(),
+        'cpus': cpus,
+        'memory_bytes': total_memory_bytes(),
+        'workers': best['workers'],
+        'threads': best['threads'],
+        'device': best['device'],
+        'pinned': pin_to_cpus([0]) is not None,
+        'images_per_hour': best['images_per_hour'],
+        'peak_rss_mb': best['peak_rss_mb'],
+        'tuned_at': time.time(),
+        'results': results,
+    }
+    path = write_node_profile(config, project_root, profile)
+    print(f"Best: {best['workers']} workers × {best['threads']} threads; node profile written to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Mesh LOD Builder
+Creates decimated level-of-detail variants of the heavy annotated meshes of the
+open .blend, named <mesh>.LOD<level>, for the per-frame swaps of utils/mesh_lod.py.
+
+Usage:
+    blender -b SyntheticDataProject.blend -P scripts/build_mesh_lods.py -- [--library lods.blend]
+
+Without --library the variants are saved into the open .blend.
+"""
+
+import bpy
+import sys
+from pathlib import Path
+
+import yaml
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.lod import lod_mesh_name, parse_lod_name
+
+def heavy_meshes(labels, min_faces: int) -> list:
+    """Meshes of annotated objects with one of ``labels`` and at least ``min_faces`` faces."""
+    meshes = {}
+    for obj in bpy.data.objects:
+        if obj.type != 'MESH' or obj.get('annotate') != "True" or obj.get('label') not in labels:
+            continue
+        mesh = obj.data
+        if mesh and not parse_lod_name(mesh.name) and len(mesh.polygons) >= min_faces:
+            meshes[mesh.name] = mesh
+    return list(meshes.values())
+
+def build_variants(mesh, ratios) -> list:
+    """
+    Decimate a mesh once per ratio, replacing variants built before.
+
+    Returns:
+        The variant meshes, level 1 first
+    """
+    variants = []
+    for level, ratio in enumerate(ratios, start=1):
+        name = lod_mesh_name(mesh.name, level)
+        if name in bpy.data.meshes:
+            bpy.data.meshes.remove(bpy.data.meshes[name])
+        temp = bpy.data.objects.new("LODBuild", mesh)
+        bpy.context.scene.collection.objects.link(temp)
+        modifier = temp.modifiers.new("Decimate", 'DECIMATE')
+        modifier.decimate_type = 'COLLAPSE'
+        modifier.ratio = ratio
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        variant = bpy.data.meshes.new_from_object(temp.evaluated_get(depsgraph))
+        bpy.data.objects.remove(temp, do_unlink=True)
+        variant.name = name
+        variant.use_fake_user = True
+        variants.append(variant)
+    return variants
+
+def main():
+    import argparse
+    try:
+        script_args = sys.argv[sys.argv.index("--") + 1:]
+    except ValueError:
+        script_args = []
+    with open(project_root / "configs" / "rendering.yaml", 'r') as f:
+        settings = yaml.safe_load(f).get('mesh_lod', {}) or {}
+    parser = argparse.ArgumentParser(description="Build decimated LOD variants of the heavy meshes")
+    parser.add_argument("--library", default=settings.get('library'),
+                        help="Side .blend to write the variants to (default: save them into the open .blend)")
+    args = parser.parse_args(script_args)
+
+    ratios = settings.get('ratios', [0.4, 0.1])
+    meshes = heavy_meshes(set(settings.get('labels', [])), settings.get('min_faces', 5000))
+    variants = []
+    for mesh in meshes:
+        built = build_variants(mesh, ratios)
+        print(f"{mesh.name}: {len(mesh.polygons)} faces -> "
+              f"{', '.join(str(len(variant.polygons)) for variant in built)}")
+        variants.extend(built)
+
+    if args.library:
+        bpy.data.libraries.write(str(args.library), set(variants), fake_user=True)
+        print(f"Wrote {len(variants)} LOD meshes of {len(meshes)} meshes to {args.library}")
+    else:
+        bpy.ops.wm.save_mainfile()
+        print(f"Saved {len(variants)} LOD meshes of {len(meshes)} meshes into {bpy.data.filepath}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Asset Name Check
+Checks every collection, object and material name the generator looks up against
+the asset manifest, without launching Blender.
+
+Usage:
+    python scripts/check_assets.py [--manifest configs/asset_manifest.json]
+"""
+
+import sys
+from pathlib import Path
+
+import yaml
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.manifest import AssetManifest, source_references, asset_map_references
+from core.log import get_logger
+
+logger = get_logger(__name__)
+
+# Packages whose sources look up assets by name
+SOURCE_DIRS = ('core', 'poles', 'generators', 'utils', 'rendering')
+
+def manifest_path(config: dict) -> Path:
+    path = Path((config.get('assets', {}) or {}).get('manifest', 'configs/asset_manifest.json'))
+    return path if path.is_absolute() else project_root / path
+
+def check_assets(config: dict, path=None) -> list:
+    """
+    Return the names referenced by the code or the asset map that the manifest lacks.
+
+    Returns:
+        List of (kind, name, location) tuples, or None if there is no manifest
+    """
+    path = Path(path) if path else manifest_path(config)
+    if not path.exists():
+        return None
+    manifest = AssetManifest.load(path)
+    references = source_references(project_root / name for name in SOURCE_DIRS)
+    map_file = Path((config.get('assets', {}) or {}).get('map_file', 'configs/asset_collections.yaml'))
+    map_file = map_file if map_file.is_absolute() else project_root / map_file
+    if map_file.exists():
+        with open(map_file, 'r') as f:
+            references += asset_map_references(yaml.safe_load(f))
+    return manifest.validate(references)
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Check asset names against the asset manifest")
+    parser.add_argument("--manifest", default=None, help="Manifest written by extract_manifest.py")
+    args = parser.parse_args()
+
+    with open(project_root / "configs" / "rendering.yaml", 'r') as f:
+        config = yaml.safe_load(f)
+    missing = check_assets(config, args.manifest)
+    if missing is None:
+        print("No asset manifest found; run scripts/extract_manifest.py in Blender first")
+        sys.exit(2)
+    for kind, name, location in missing:
+        print(f"Missing {kind} '{name}' ({location})")
+    print(f"{len(missing)} missing names")
+    sys.exit(1 if missing else 0)
+
+if __name__ == "__main__":
+    main()
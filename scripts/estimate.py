@@ -0,0 +1,185 @@
+"""
+Dry-run estimator for a generation config.
+Samples scenes without rendering and predicts the class distribution and render time,
+or plans a multi-worker run by predicted per-frame cost.
+"""
+
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+
+from utils.scene_utils import reset_scene, is_anomaly_label
+from rendering.renderer import assign_pass_indices
+from core.trackers import RotationTracker
+from core.output_layout import OutputLayout
+from core.frame_log import iter_frame_records
+from core.cost_model import FrameCostModel
+from core.adaptive import DifficultyWeights
+from core.scene_spec import frame_seed, new_base_seed
+from core.scheduling import build_plan, switch_costs
+from core.heartbeat import write_json_atomic
+from core.log import get_logger
+from scripts.generate import load_config, generate_weighted_scene
+from rendering.background import pick_background
+from scripts.process_output import normalize_label
+
+logger = get_logger(__name__)
+
+def dry_run(num_frames: int, render_config: dict = None) -> dict:
+    """
+    Run only the scene sampling logic for a number of frames.
+
+    Each frame goes through the same pole generation, camera placement and
+    difficulty weighting as a real render, then the visible annotated objects are
+    counted instead of rendered.
+    Counts ignore occlusion and min_object_size, so category counts are upper bounds.
+
+    Args:
+        num_frames: Number of scenes to sample
+        render_config: Rendering configuration (loaded from rendering.yaml if omitted)
+
+    Returns:
+        Report dictionary with per-frame averages, totals and the predicted render time
+    """
+    if render_config is None:
+        render_config = load_config("configs/rendering.yaml")
+    layout = OutputLayout.from_config(render_config)
+    tag_list = render_config['output'].get('tag_list') or None
+
+    # Fit the render-time model from every frame log of previous runs
+    model = FrameCostModel().fit(iter_frame_records(layout.iter_frame_logs()))
+    logger.info("Render-time model fitted from %d frames", model.num_records)
+
+    weights = DifficultyWeights.from_config(render_config)
+    counts = {name: Counter() for name in ('category', 'anomaly', 'pole_type', 'phases', 'setup', 'angle_style')}
+    predicted_seconds = 0.0
+    start = time.time()
+
+    for _ in range(num_frames):
+        reset_scene()
+        pole, pole_type, camera, record = generate_weighted_scene(render_config, weights)
+
+        counts['pole_type'][pole_type] += 1
+        counts['phases'][record['phases']] += 1
+        counts['setup'][f"{pole_type}:{'+'.join(record['setup'])}"] += 1
+        counts['angle_style'][record.get('angle_style')] += 1
+
+        for label in assign_pass_indices().values():
+            category = normalize_label(label, tag_list)
+            if category:
+                counts['category'][category] += 1
+            if is_anomaly_label(label):
+                counts['anomaly'][label] += 1
+
+        predicted_seconds += model.predict(record)
+
+    reset_scene()
+
+    return {
+        'frames': num_frames,
+        'sampling_seconds': time.time() - start,
+        'model_frames': model.num_records,
+        'predicted_seconds': predicted_seconds,
+        'counts': {name: dict(counter) for name, counter in counts.items()},
+    }
+
+def plan_frames(num_frames: int, num_workers: int, base_seed: int = None,
+                render_config: dict = None) -> dict:
+    """
+    Sample every frame of a run, predict its cost and assign frames to workers.
+
+    Each frame is seeded from the base seed and its plan index, sampled the same
+    way a worker will generate it, and its render time is predicted with the cost
+    model fitted from previous frame logs. Frames are then handed out longest
+    first so all workers finish at about the same time. With
+    ``supervisor.affinity_order``, each worker's frames are then grouped by pole
+    configuration and HDRI. The plan is written to the layout's plan file.
+
+    Args:
+        num_frames: Number of frames in the run
+        num_workers: Number of workers the run is split across
+        base_seed: Base seed of the run (random if omitted)
+        render_config: Rendering configuration (loaded from rendering.yaml if omitted)
+
+    Returns:
+        Plan dictionary
+    """
+    if render_config is None:
+        render_config = load_config("configs/rendering.yaml")
+    base_seed = new_base_seed() if base_seed is None else base_seed
+    layout = OutputLayout.from_config(render_config)
+
+    model = FrameCostModel().fit(iter_frame_records(layout.iter_frame_logs()))
+    logger.info("Cost model fitted from %d frames", model.num_records)
+    affinity = (render_config.get('supervisor', {}) or {}).get('affinity_order', False)
+    switch_seconds = None
+    if affinity:
+        switch_seconds = switch_costs((iter_frame_records([path]) for path in layout.iter_frame_logs()),
+                                      model.predict)
+        logger.info("Measured switch costs from %d frame pairs: %.2f s per scene, %.2f s per HDRI",
+                    switch_seconds['pairs'], switch_seconds['scene'], switch_seconds['hdri'])
+
+    weights = DifficultyWeights.from_config(render_config)
+    frames = []
+    for index in range(num_frames):
+        seed = frame_seed(base_seed, index)
+        # Same order as iter_frames: seed, reset, generate, then the background
+        random.seed(seed)
+        reset_scene()
+        _, _, _, record = generate_weighted_scene(render_config, weights)
+        hdri = pick_background(render_config)
+        record.update({'seed': seed, 'plan_index': index, 'predicted_seconds': model.predict(record),
+                       'hdri': hdri.name if hdri else None})
+        frames.append(record)
+        RotationTracker.get_instance().reset_rotations()
+
+    reset_scene()
+
+    start_sequences = [OutputLayout.from_config(render_config, worker_id=worker).next_sequence()
+                       for worker in range(num_workers)]
+    plan = build_plan(frames, num_workers, base_seed, start_sequences, affinity, switch_seconds)
+    plan['model_frames'] = model.num_records
+    write_json_atomic(layout.plan_path(), plan)
+    logger.info("Planned %d frames for %d workers: predicted makespan %.0f s (naive split %.0f s)",
+                num_frames, num_workers, plan['predicted_makespan'], plan['naive_makespan'])
+    if plan['affinity']:
+        logger.info("Affinity order: %s -> %s switches, predicted savings %.0f s",
+                    plan['affinity']['switches_before'], plan['affinity']['switches_after'],
+                    plan['affinity']['predicted_savings_seconds'])
+    return plan
+
+def scale_report(report: dict, total_frames: int) -> dict:
+    """Scale a dry-run report's counts and predicted time to a larger run."""
+    factor = total_frames / max(1, report['frames'])
+    scaled = dict(report)
+    scaled['frames'] = total_frames
+    scaled['predicted_seconds'] = report['predicted_seconds'] * factor
+    scaled['counts'] = {
+        name: {key: value * factor for key, value in values.items()}
+        for name, values in report['counts'].items()
+    }
+    return scaled
+
+def format_report(report: dict) -> str:
+    """Format a dry-run report as plain text."""
+    frames = max(1, report['frames'])
+    lines = [
+        f"Dry run for {report['frames']} frames ({report['sampling_seconds']:.1f} s of scene sampling)",
+        f"Render-time model fitted from {report['model_frames']} logged frames",
+        f"Predicted render time: {timedelta(seconds=int(report['predicted_seconds']))} "
+        f"({report['predicted_seconds'] / 3600:.1f} h, {report['predicted_seconds'] / frames:.1f} s/frame)",
+    ]
+    titles = {
+        'pole_type': "Pole types",
+        'phases': "Phase counts",
+        'setup': "Setups",
+        'angle_style': "Camera styles",
+        'category': "COCO categories (instances, before occlusion and size filtering)",
+        'anomaly': "Anomalies (instances)",
+    }
+    for name, title in titles.items():
+        lines.append(f"\n{title}:")
+        for key, count in sorted(report['counts'][name].items(), key=lambda item: -item[1]):
+            lines.append(f"  {key}: {count:g} ({count / frames:.2f} per frame)")
+    return "\n".join(lines)
@@ -0,0 +1,102 @@
+"""
+Asset Manifest Extractor
+Writes the collection tree, objects, custom properties, bounding boxes and wire
+attachment pairs of the open .blend to JSON for Blender-free tools (core/manifest.py).
+
+Usage:
+    blender -b SyntheticDataProject.blend -P scripts/extract_manifest.py -- [--output configs/asset_manifest.json]
+"""
+
+import bpy
+import json
+import sys
+import time
+from pathlib import Path
+
+from mathutils import Vector
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.manifest import MANIFEST_VERSION
+from core.heartbeat import write_json_atomic
+
+def json_value(value):
+    """Custom property value as JSON, or None if it has no JSON form."""
+    if hasattr(value, 'to_dict'):
+        value = value.to_dict()
+    elif hasattr(value, 'to_list'):
+        value = value.to_list()
+    try:
+        json.dumps(value)
+        return value
+    except TypeError:
+        return None
+
+def world_bbox(obj):
+    """World-space (min, max) corners of an object's bounding box."""
+    corners = [obj.matrix_world @ Vector(corner) for corner in obj.bound_box]
+    return (
+        [min(c[i] for c in corners) for i in range(3)],
+        [max(c[i] for c in corners) for i in range(3)],
+    )
+
+def extract_manifest() -> dict:
+    """Describe every collection, object and material of the open .blend."""
+    collections = {}
+    for collection in bpy.data.collections:
+        collections[collection.name] = {
+            'children': [child.name for child in collection.children],
+            'objects': [obj.name for obj in collection.objects],
+            'parents': [parent.name for parent in bpy.data.collections if collection.name in parent.children],
+        }
+
+    objects = {}
+    for obj in bpy.data.objects:
+        objects[obj.name] = {
+            'type': obj.type,
+            'collections': [collection.name for collection in obj.users_collection],
+            'parent': obj.parent.name if obj.parent else None,
+            'props': {key: json_value(obj[key]) for key in obj.keys() if not key.startswith('_')},
+            'bbox': world_bbox(obj),
+            'materials': [slot.material.name for slot in obj.material_slots if slot.material],
+        }
+
+    # Wires are strung between the two empties of a collection (see the pole classes)
+    wire_pairs = []
+    for collection in bpy.data.collections:
+        empties = [obj.name for obj in collection.objects if obj.type == 'EMPTY']
+        if len(empties) == 2:
+            wire_pairs.append({'collection': collection.name, 'empties': empties})
+
+    return {
+        'version': MANIFEST_VERSION,
+        'blend_file': bpy.data.filepath,
+        'blender_version': bpy.app.version_string,
+        'extracted_at': time.time(),
+        'collections': collections,
+        'objects': objects,
+        'materials': [material.name for material in bpy.data.materials],
+        'wire_pairs': wire_pairs,
+    }
+
+def main():
+    import argparse
+    try:
+        script_args = sys.argv[sys.argv.index("--") + 1:]
+    except ValueError:
+        script_args = []
+    parser = argparse.ArgumentParser(description="Extract the asset manifest of the open .blend")
+    parser.add_argument("--output", default=str(project_root / "configs" / "asset_manifest.json"),
+                        help="Manifest file to write")
+    args = parser.parse_args(script_args)
+
+    manifest = extract_manifest()
+    write_json_atomic(args.output, manifest)
+    print(f"Wrote {len(manifest['collections'])} collections, {len(manifest['objects'])} objects and "
+          f"{len(manifest['wire_pairs'])} wire pairs to {args.output}")
+
+if __name__ == "__main__":
+    main()
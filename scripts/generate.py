@@ -17,11 +17,32 @@ project_root = Path(__file__).parent.parent
 if str(project_root) not in sys.path:
     sys.path.append(str(project_root))
 
-from utils.scene_utils import reset_scene
-from rendering.camera import setup_camera
-from rendering.background import setup_random_background
-from rendering.renderer import render_scene
-from core.trackers import RotationTracker
+from utils.scene_utils import (reset_scene, visible_anomaly_labels, scene_complexity, scene_description,
+                               wire_pairs)
+from utils.memory_monitor import MemoryMonitor, process_peak_rss_bytes
+from utils.asset_loader import load_required_assets, named_materials
+from utils.wire_generator import wire_pool, configure_wires
+from utils.mesh_lod import MeshLODs
+from rendering.camera import setup_camera, camera_attributes, view_target_info
+from rendering.background import setup_random_background, hdri_cache
+from rendering.renderer import render_scene, remove_frame_outputs, reuse_cached_frame, FrameRingSink
+from core.trackers import RotationTracker, SceneJournal
+from core.recipes import SceneRecipes
+from core.output_layout import OutputLayout
+from core.frame_log import FrameLog
+from core.heartbeat import Heartbeat, load_quarantine, read_json
+from core.staging import StagedTransfer
+from core.render_cache import RenderCache, scene_key
+from core.scene_spec import make_scene_spec, new_base_seed
+from core.adaptive import DifficultyWeights, attribute_key
+from core.scheduling import planned_frame
+from scripts.acceptance import FrameAcceptance, annotate_frame
+from core.log import get_logger, configure_logging
+
+logger = get_logger(__name__)
+
+# Rendering configuration used by the generation loop (overridden by --render-config)
+RENDER_CONFIG = "configs/rendering.yaml"
 
 def format_time(seconds):
     """Convert seconds to a human readable format."""
@@ -29,48 +50,69 @@ def format_time(seconds):
 
 class GenerationStats:
     """Track statistics for the generation process."""
-    def __init__(self, total_images):
+    def __init__(self, total_images, status_path=Path("Renders") / "generation_status.json"):
         self.start_time = time.time()
+        self.status_path = Path(status_path)
         self.total_images = total_images
         self.completed_images = 0
+        self.rejected_images = 0
         self.pole_type_counts = {}
+        self.memory = {}
+        self.acceptance = {}
+        self.render_cache = {}
         self._write_status()
         
-    def update(self, pole_type):
+    def update(self, pole_type, memory=None, accepted=True, acceptance=None, render_cache=None):
         """Update statistics after generating an image."""
-        self.completed_images += 1
-        self.pole_type_counts[pole_type] = self.pole_type_counts.get(pole_type, 0) + 1
+        if accepted:
+            self.completed_images += 1
+            self.pole_type_counts[pole_type] = self.pole_type_counts.get(pole_type, 0) + 1
+        else:
+            self.rejected_images += 1
+        if memory is not None:
+            self.memory = memory
+        if acceptance is not None:
+            self.acceptance = acceptance
+        if render_cache is not None:
+            self.render_cache = render_cache
         self._write_status()
     
     def print_status(self):
-        """Print current generation status to console."""
+        """Log current generation status."""
         elapsed_time = time.time() - self.start_time
         avg_time = elapsed_time / max(1, self.completed_images)
         remaining = self.total_images - self.completed_images
         eta = remaining * avg_time
 
-        print(f"\nProgress: {self.completed_images}/{self.total_images} images")
-        print(f"Elapsed Time: {format_time(elapsed_time)}")
-        print(f"Average Time per Image: {avg_time:.1f} seconds")
-        print(f"Estimated Time Remaining: {format_time(eta)}")
-        print("\nPole Type Distribution:")
-        for pole_type, count in self.pole_type_counts.items():
-            print(f"  {pole_type}: {count}")
+        logger.info("Progress: %d/%d images, elapsed %s, %.1f s/image, ETA %s",
+                    self.completed_images, self.total_images, format_time(elapsed_time),
+                    avg_time, format_time(eta))
+        logger.info("Pole type distribution: %s", self.pole_type_counts)
+        if self.acceptance:
+            logger.info("Acceptance: %s", self.acceptance)
+        if self.render_cache:
+            logger.info("Render cache: %s", self.render_cache)
+        if self.memory:
+            logger.info("Memory: %s, growth per frame: %s",
+                        self.memory['counts'], self.memory['growth_per_frame'])
     
     def _write_status(self):
         """Write current status to file for UI to read."""
         status = {
             'total_images': self.total_images,
             'completed_images': self.completed_images,
+            'rejected_images': self.rejected_images,
+            'acceptance': self.acceptance,
+            'render_cache': self.render_cache,
             'pole_type_counts': self.pole_type_counts,
+            'memory': self.memory,
             'start_time': self.start_time,
             'last_update': time.time()
         }
         
-        output_dir = Path("Renders")
-        output_dir.mkdir(exist_ok=True)
+        self.status_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(output_dir / "generation_status.json", 'w') as f:
+        with open(self.status_path, 'w') as f:
             json.dump(status, f)
 
 def load_config(config_path: str = "configs/pole_generation_config.yaml") -> dict:
@@ -89,6 +131,18 @@ def load_config(config_path: str = "configs/pole_generation_config.yaml") -> dic
     if 'backgrounds' in config and 'hdri_path' in config['backgrounds']:
         config['backgrounds']['hdri_path'] = str(Path(config['backgrounds']['hdri_path']).resolve())
     
+    if (config.get('adaptive') or {}).get('weights_file'):
+        weights_file = Path(config['adaptive']['weights_file'])
+        if not weights_file.is_absolute():
+            weights_file = project_root / weights_file
+        config['adaptive']['weights_file'] = str(weights_file.resolve())
+    
+    if (config.get('assets') or {}).get('map_file'):
+        map_file = Path(config['assets']['map_file'])
+        if not map_file.is_absolute():
+            map_file = project_root / map_file
+        config['assets']['map_file'] = str(map_file.resolve())
+    
     return config
 
 def select_pole_type(config: dict) -> str:
@@ -107,7 +161,7 @@ def select_pole_type(config: dict) -> str:
     # Select pole type based on weights from config
     weights = [pole_types[t].get('weight', 1) for t in enabled_types]
     selected_type = random.choices(enabled_types, weights=weights, k=1)[0]
-    print(f"Selected pole type: {selected_type}")
+    logger.debug("Selected pole type: %s", selected_type)
     
     # Dynamically import the pole class
 
@@ -117,110 +171,423 @@ def select_pole_type(config: dict) -> str:
 def generate_scene():
     """Generate a complete scene with a random pole type."""
     # Load configuration
+    pole, pole_type = create_pole()
+    pole.generate()
+    return pole, pole_type
+
+def create_pole():
+    """
+    Sample a pole type and its configuration without changing the scene.
+    
+    Returns:
+        Tuple of (pole, pole type name)
+    """
+    # Load configuration
     config = load_config()
     
     # Select and create pole
     pole_class = select_pole_type(config)
+    return pole_class(config), pole_class.__name__
+
+def prepare_scene(render_config: dict, recipes: SceneRecipes = None):
+    """
+    Sample the next pole configuration and reset the scene for it.
     
-    # Initialize and generate pole
-    pole = pole_class(config)
-    objects = pole.generate()
+    The configuration is drawn before the reset so that, with recipes, the
+    objects its recipe shows can stay visible and in place.
     
-    return objects, pole_class.__name__
+    Returns:
+        Tuple of (pole, pole type name) ready for ``pole.generate()``
+    """
+    pole, pole_type = create_pole()
+    recipe = recipes.get(pole.recipe_key()) if recipes else None
+    reset_scene(render_config.get('full_sweep_reset', False), recipe)
+    return pole, pole_type
 
-def batch_render(num_images: int = 1):
-    """Generate and render multiple scenes."""
-    render_config = load_config("configs/rendering.yaml")
-    stats = GenerationStats(num_images)
-    
-    print(f"\nStarting batch render of {num_images} images at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Output directory: {render_config['output']['base_path']}")
-    
-    for image_num in range(num_images):
-        # Reset scene and generate new pole
-        reset_scene()
-        objects, pole_type = generate_scene()
-        stats.update(pole_type)
+def frame_record(pole, camera, render_config: dict) -> dict:
+    """Describe a generated frame for the frame log and render-time estimates."""
+    record = pole.scene_attributes()
+    record.update(camera_attributes(camera))
+    record.update(scene_complexity())
+    record.update({
+        'samples': render_config['samples'],
+        'resolution_x': render_config['resolution']['x'],
+        'resolution_y': render_config['resolution']['y'],
+    })
+    return record
+
+def generate_weighted_scene(render_config: dict, weights: DifficultyWeights = None,
+                            recipes: SceneRecipes = None, prepared=None):
+    """
+    Generate a pole and camera view, biased toward difficult configurations.
+    
+    Without weights the first generated scene is kept. With weights, scenes are
+    regenerated until one is accepted with probability proportional to the weight
+    of its attribute cell (up to adaptive.max_attempts tries).
+    
+    Args:
+        render_config: Rendering configuration
+        weights: Difficulty weights, or None to keep the first scene
+        recipes: Scene recipes to replay and record, or None
+        prepared: (pole, pole type name) from ``prepare_scene`` for the first
+            attempt; without it the first attempt prepares its own scene
+    
+    Returns:
+        Tuple of (pole, pole type name, camera, frame record)
+    """
+    max_attempts = (render_config.get('adaptive', {}) or {}).get('max_attempts', 20)
+    for attempt in range(1, max_attempts + 1):
+        if attempt > 1 or prepared is None:
+            prepared = prepare_scene(render_config, recipes)
+        pole, pole_type = prepared
+        pole.generate()
+        if recipes:
+            # Hide kept recipe objects this realization did not show, then learn from it
+            journal = SceneJournal.get_instance()
+            journal.settle()
+            recipes.record(pole.recipe_key(), journal.visible_objects(), journal.values('location'), wire_pairs())
+        camera = setup_camera(render_config)
+        wire_pool().fit_to_camera(camera)
+        record = frame_record(pole, camera, render_config)
+        record['anomalies'] = visible_anomaly_labels()
+        if weights is None:
+            record['attribute_key'] = attribute_key(record)
+            break
+        record['attribute_key'] = weights.key(record)
+        if random.random() < weights.acceptance(record['attribute_key']):
+            break
+    
+    record['attempts'] = attempt
+    return pole, pole_type, camera, record
+
+def iter_frames(num_images: int = 1, worker_id: int = None, start_sequence: int = None,
+                seed: int = None, heartbeat_path=None, quarantine_path=None, quota: bool = False,
+                plan_path=None, annotate: bool = True):
+    """
+    Generate and render scenes, yielding every finished frame as soon as it is saved.
+    
+    The generator is pulled by its consumer: the next scene is only generated
+    when the consumer asks for the next frame, so a slow consumer throttles
+    generation instead of letting rendered frames pile up on disk.
+    
+    Args:
+        num_images: Number of frame sequence numbers to process, or with quota
+            the number of accepted frames to produce
+        worker_id: Worker ID encoded into frame IDs (defaults to the config)
+        start_sequence: First sequence number (defaults to the first unused one)
+        seed: Base seed; every frame is seeded from it and its frame ID so a
+            frame can be reproduced exactly (random if omitted)
+        heartbeat_path: File updated at every stage of every frame for a supervisor
+        quarantine_path: JSON file of frame IDs to skip (defaults to the layout's)
+        quota: Check every frame against the quota acceptance rules, delete
+            rejected frames and keep rendering until num_images are accepted
+        plan_path: Frame plan; sequences it covers are rendered with their planned
+            seeds so each frame is the scene its cost was predicted for
+        annotate: Extract COCO-style annotations from each frame's mask
+    
+    Yields:
+        Dictionary per kept frame with frame_id, image_path, mask_path, spec,
+        labels (pass index to object label), annotations and the frame log record.
+        With output staging the paths are the shared ones, which only exist once
+        the frame's batch has been transferred.
+    """
+    render_config = load_config(RENDER_CONFIG)
+    layout = OutputLayout.from_config(render_config, worker_id=worker_id)
+    stats = GenerationStats(num_images, layout.status_path())
+    frame_log = FrameLog(layout.frame_log_path())
+    memory_monitor = MemoryMonitor(render_config, named_materials(render_config))
+    heartbeat = Heartbeat(heartbeat_path)
+    quarantine = load_quarantine(quarantine_path or layout.quarantine_path())
+    weights = DifficultyWeights.from_config(render_config)
+    acceptance = FrameAcceptance(render_config) if quota else None
+    sink = FrameRingSink.from_config(render_config, layout.worker_id)
+    if sink and not sink.write_files:
+        # Acceptance checks and annotations are read back from the mask files
+        acceptance, annotate = None, False
+        if quota:
+            logger.warning("Quota mode needs frame_ring.write_files; accepting every frame")
+    # Cached renders cannot be published to the ring, which needs the rendered pixels
+    render_cache = RenderCache.from_config(render_config) if not sink else None
+    recipes = SceneRecipes.from_config(render_config)
+    lods = MeshLODs.from_config(render_config)
+    plan = read_json(plan_path) if plan_path else None
+    if plan_path and plan is None:
+        logger.warning("Frame plan %s could not be read, rendering unplanned frames", plan_path)
+    
+    # With staging, frames are rendered locally and moved to base_path in batches
+    staging = StagedTransfer.from_config(render_config, layout)
+    frame_layout = staging.staging_layout if staging else layout
+    first_sequence = start_sequence
+    if first_sequence is None:
+        first_sequence = max(layout.next_sequence(), frame_layout.next_sequence())
+    if staging:
+        staging.recover()
+    base_seed = new_base_seed() if seed is None else seed
+    
+    # A quota run may need more frames than it keeps; cap it so bad rules cannot loop forever
+    max_frames = num_images
+    if quota:
+        max_frames = int(num_images * (render_config.get('quota', {}) or {}).get('max_render_factor', 3))
+    
+    logger.info("Starting batch render of %d images at %s", num_images,
+                datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    logger.info("Output directory: %s, base seed: %d", render_config['output']['base_path'], base_seed)
+    
+    try:
+        for image_num in range(max_frames):
+            if quota and stats.completed_images >= num_images:
+                break
+        
+            frame_start = time.time()
+            sequence = first_sequence + image_num
+            frame_id = layout.frame_id(sequence)
+            if str(frame_id) in quarantine:
+                logger.warning("Skipping quarantined frame %d", frame_id)
+                continue
+        
+            spec = make_scene_spec(frame_id, sequence, base_seed)
+            planned = planned_frame(plan, layout.worker_id, sequence)
+            if planned:
+                spec.update({'seed': planned['seed'], 'predicted_seconds': planned['predicted_seconds']})
+            heartbeat.start_frame(spec)
+            random.seed(spec['seed'])
+        
+            # Draw the next pole configuration and reset the scene for it
+            prepared = prepare_scene(render_config, recipes)
+        
+            # Purge and measure only after the reset, when no tracker still holds
+            # a swapped-out material or other temporarily unused datablock
+            memory = memory_monitor.sample()
         
-        # Setup camera and background
-        setup_camera(render_config)
-        setup_random_background(render_config)
+            # Generate pole and camera view, then the background
+            heartbeat.beat('generate')
+            pole, pole_type, camera, record = generate_weighted_scene(render_config, weights, recipes, prepared)
+            if lods:
+                # Swap far heavy meshes for their decimated variants now the camera is placed
+                record.update(lods.apply(camera))
+            heartbeat.beat('background')
+            hdri = setup_random_background(render_config)
         
-        # Render and save
-        render_scene(image_num, render_config)
+            # Render and save
+            heartbeat.beat('render')
+            render_start = time.time()
+            cache_key = scene_key(scene_description(camera), render_config) if render_cache else None
+            object_labels = reuse_cached_frame(render_cache, cache_key, render_config, frame_layout,
+                                               frame_id) if render_cache else None
+            cache_hit = object_labels is not None
+            if not cache_hit:
+                object_labels = render_scene(image_num, render_config, frame_layout, frame_id, sink)
+                if render_cache:
+                    render_cache.store(cache_key, frame_layout.image_path(frame_id),
+                                       frame_layout.mask_path(frame_id), object_labels)
         
-        # Print progress every image, or every 5 images for larger batches
-        if num_images < 10 or image_num % 5 == 0 or image_num == num_images - 1:
-            stats.print_status()
+            record.update({
+                'frame_id': frame_id,
+                'seed': spec['seed'],
+                'predicted_seconds': spec.get('predicted_seconds'),
+                'hdri': hdri.name if hdri else None,
+                'setup_seconds': render_start - frame_start,
+                'render_seconds': time.time() - render_start,
+            })
+            if render_cache:
+                record.update({'scene_key': cache_key, 'cache_hit': cache_hit})
         
-        RotationTracker.get_instance().reset_rotations()
+            # Check the finished frame and replace it if it is useless for training
+            accepted, annotations = True, None
+            if acceptance:
+                heartbeat.beat('check')
+                accepted, reason, annotations = acceptance.check(frame_layout.mask_path(frame_id), object_labels,
+                                                                 view_target_info(camera))
+                record.update({'accepted': accepted, 'reject_reason': reason})
+                if not accepted:
+                    logger.info("Rejected frame %d: %s", frame_id, reason)
+                    remove_frame_outputs(frame_layout, frame_id)
+            elif annotate:
+                annotations = annotate_frame(frame_layout.mask_path(frame_id), object_labels, render_config)
+            if staging and accepted:
+                staging.submit(frame_id, object_labels)
+        
+            record['seconds'] = time.time() - frame_start
+            record['rss_mb'] = memory['counts'].get('rss_mb')
+            # The render is the memory peak, which the per-frame sample before it misses
+            peak_rss = process_peak_rss_bytes()
+            record['peak_rss_mb'] = peak_rss / (1024 * 1024) if peak_rss is not None else None
+            frame_log.append(record)
+            stats.update(pole_type, memory, accepted, acceptance.summary() if acceptance else None,
+                         render_cache.summary() if render_cache else None)
+            heartbeat.beat('done')
+        
+            # Print progress every image, or every 5 images for larger batches
+            if num_images < 10 or image_num % 5 == 0 or image_num == max_frames - 1:
+                stats.print_status()
+        
+            RotationTracker.get_instance().reset_rotations()
+        
+            if accepted:
+                yield {
+                    'frame_id': frame_id,
+                    'image_path': layout.image_path(frame_id),
+                    'mask_path': layout.mask_path(frame_id),
+                    'spec': spec,
+                    'labels': object_labels,
+                    'annotations': annotations,
+                    'record': record,
+                }
+    finally:
+        # Hand over the frames already rendered even when the loop fails or is stopped
+        try:
+            if sink:
+                sink.close()
+        finally:
+            if staging:
+                staging.close()
+    
+    if recipes:
+        logger.info("Scene recipes: %s", recipes.summary())
+    logger.info("Wire pool: %s", wire_pool().summary())
+    logger.info("HDRI cache: %s", hdri_cache(render_config).summary())
+    if lods:
+        logger.info("Mesh LODs: %s", lods.summary())
+    if render_cache:
+        logger.info("Render cache: %s", render_cache.summary())
+        if render_cache.max_bytes:
+            render_cache.evict(render_cache.max_bytes)
+    # Tells the supervisor the loop ran to the end, past any skipped final frames
+    heartbeat.beat('finished')
+    
+    if acceptance and stats.completed_images < num_images:
+        logger.warning("Quota not reached: %d of %d frames accepted after %d renders",
+                       stats.completed_images, num_images, max_frames)
     
-    # Print final statistics
-    print("\nGeneration Complete!")
-    print(f"Total time: {format_time(time.time() - stats.start_time)}")
-    print(f"Average time per image: {(time.time() - stats.start_time) / num_images:.2f} seconds")
-    print(f"Output saved to: {render_config['output']['base_path']}")
+    # Log final statistics
+    logger.info("Generation complete in %s (%.2f s/image), output saved to %s",
+                format_time(time.time() - stats.start_time),
+                (time.time() - stats.start_time) / max(1, stats.completed_images),
+                render_config['output']['base_path'])
+
+def stream_frames(frame_queue, **kwargs):
+    """
+    Feed finished frames from ``iter_frames`` into a bounded queue.
+    
+    Blender only allows scene changes from its main thread, so generation runs in
+    the calling thread while consumer threads read the queue. ``put`` blocks while
+    the queue is full, pausing generation until the consumer catches up. ``None``
+    is put after the last frame.
     
-    return render_config
+    Args:
+        frame_queue: ``queue.Queue`` created with a ``maxsize``
+        **kwargs: Arguments for ``iter_frames``
+    """
+    try:
+        for frame in iter_frames(**kwargs):
+            frame_queue.put(frame)
+    finally:
+        frame_queue.put(None)
+
+def batch_render(num_images: int = 1, worker_id: int = None, start_sequence: int = None,
+                 seed: int = None, heartbeat_path=None, quarantine_path=None, quota: bool = False,
+                 plan_path=None):
+    """
+    Generate and render multiple scenes.
+    
+    Runs ``iter_frames`` to completion without extracting annotations; see it for
+    the arguments.
+    
+    Returns:
+        Rendering configuration used for the batch
+    """
+    for _ in iter_frames(num_images, worker_id, start_sequence, seed, heartbeat_path,
+                         quarantine_path, quota, plan_path, annotate=False):
+        pass
+    return load_config(RENDER_CONFIG)
 
 def print_device_info():
-    """Print current render device information."""
-    print("\nRender Device Information:")
+    """Log current render device information."""
     prefs = bpy.context.preferences.addons['cycles'].preferences
-    print(f"Compute Device Type: {prefs.compute_device_type}")
-    print(f"Render Device: {bpy.context.scene.cycles.device}")
-    print("\nAvailable Devices:")
+    logger.info("Compute device type: %s, render device: %s",
+                prefs.compute_device_type, bpy.context.scene.cycles.device)
     for device in prefs.devices:
-        print(f"- {device.name} ({'ENABLED' if device.use else 'DISABLED'})")
-    print("\n")
+        logger.info("Device %s (%s)", device.name, 'ENABLED' if device.use else 'DISABLED')
 
-def setup_render_settings():
-    """Configure optimal render settings for GPU."""
+def enable_gpu_devices(cycles_prefs) -> bool:
+    """Enable every GPU of the first available compute backend. Returns False if there is none."""
+    for backend in ('OPTIX', 'CUDA', 'HIP', 'METAL', 'ONEAPI'):
+        try:
+            cycles_prefs.compute_device_type = backend
+        except TypeError:
+            continue  # Backend not supported by this Blender build
+        cycles_prefs.refresh_devices()
+        if any(device.type != 'CPU' for device in cycles_prefs.devices):
+            for device in cycles_prefs.devices:
+                device.use = device.type != 'CPU'
+            return True
+    cycles_prefs.compute_device_type = 'NONE'
+    return False
+
+def setup_render_settings(device: str = None, threads: int = None):
+    """
+    Configure resolution, render device and CPU threads.
+    
+    Args:
+        device: ``auto`` (GPU if one is found), ``gpu`` or ``cpu``; defaults to rendering.yaml
+        threads: Cycles threads, 0 for one per available core; defaults to rendering.yaml
+    """
     scene = bpy.context.scene
-    render_config = load_config("configs/rendering.yaml")
+    render_config = load_config(RENDER_CONFIG)
+    scene.render.engine = 'CYCLES'
     # Add resolution validation and force standard resolution
     scene.render.resolution_x = render_config['resolution'].get('x', 1920)  # Default to 1920 if not specified
     scene.render.resolution_y = render_config['resolution'].get('y', 1080)  # Default to 1080 if not specified
     scene.render.resolution_percentage = 100  # Ensure resolution percentage is at 100%
-    # Force GPU compute
+    configure_wires(render_config)
+    
+    device = device or render_config.get('device', 'auto')
+    threads = render_config.get('threads', 0) if threads is None else threads
     cycles_prefs = bpy.context.preferences.addons['cycles'].preferences
     
-
-
-    # Try OptiX first (faster for RTX cards), fall back to CUDA
-    if hasattr(cycles_prefs, 'compute_device_type'):
-        # Check if OPTIX is available by trying to set it
-        try:
-            cycles_prefs.compute_device_type = 'OPTIX'
-        except:
-            # If OPTIX fails, fall back to CUDA
-            cycles_prefs.compute_device_type = 'CUDA'
+    use_gpu = device != 'cpu' and enable_gpu_devices(cycles_prefs)
+    if device == 'gpu' and not use_gpu:
+        logger.warning("No GPU found, rendering on the CPU")
+    scene.cycles.device = 'GPU' if use_gpu else 'CPU'
     
-    cycles_prefs.refresh_devices()
-    
-    # Enable only GPU devices, disable CPU
-    for device in cycles_prefs.devices:
-        if 'NVIDIA' in device.name:  # Only enable NVIDIA GPU
-            device.use = True
-        else:
-            device.use = False  # Disable CPU and other devices
+    # Thread count matters for CPU rendering and for the CPU work of GPU renders
+    scene.render.threads_mode = 'FIXED' if threads else 'AUTO'
+    if threads:
+        scene.render.threads = threads
     
     # Optimize render settings
-    scene.cycles.device = 'GPU'
-    scene.cycles.samples = 128
+    scene.cycles.samples = render_config['samples']
     scene.cycles.use_denoising = False
     
     # Additional optimizations for RTX cards
-    if cycles_prefs.compute_device_type == 'OPTIX':
+    if use_gpu and cycles_prefs.compute_device_type == 'OPTIX':
         scene.cycles.use_denoising_prefilter = True
-    # Set render resolution
-    # Print confirmation
-    print("\nRender settings configured for GPU acceleration:")
-    print(f"Active Device: {scene.cycles.device}")
-    print(f"Compute Type: {cycles_prefs.compute_device_type}")
-    print(f"Samples: {scene.cycles.samples}")
+    logger.info("Render settings configured: device %s, compute type %s, %d threads, %d samples, "
+                "adaptive sampling %s", scene.cycles.device, cycles_prefs.compute_device_type,
+                scene.render.threads, scene.cycles.samples, scene.cycles.use_adaptive_sampling)
+
+def positive_int(value: str) -> int:
+    """Argparse type for counts that must be at least 1."""
+    import argparse
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
 
-    print(f"Adaptive Sampling: {scene.cycles.use_adaptive_sampling}")
+def worker_plan_frames(args, render_config: dict):
+    """Planned frames of this worker, or None if it may render frames outside the plan."""
+    plan = read_json(args.plan) if args.plan and args.dry_run is None and args.plan_workers is None else None
+    if not plan:
+        return None
+    layout = OutputLayout.from_config(render_config, worker_id=args.worker_id)
+    worker = plan['workers'].get(str(layout.worker_id))
+    if worker is None or args.start_sequence is None:
+        return None
+    end = worker['start_sequence'] + len(worker['frames'])
+    if args.start_sequence < worker['start_sequence'] or args.start_sequence + args.num_images > end:
+        return None
+    first = args.start_sequence - worker['start_sequence']
+    return worker['frames'][first:first + args.num_images]
 
 def main():
     """Main entry point."""
@@ -234,20 +601,62 @@ def main():
     # Parse only the script arguments
     parser = argparse.ArgumentParser(description="Generate synthetic utility pole images")
     parser.add_argument("--num-images", type=int, default=1, help="Number of images to generate")
+    parser.add_argument("--worker-id", type=int, default=None,
+                        help="Worker ID encoded into frame IDs (overrides output.layout.worker_id)")
+    parser.add_argument("--start-sequence", type=int, default=None,
+                        help="First frame sequence number (defaults to the first unused one)")
+    parser.add_argument("--seed", type=int, default=None, help="Base seed for per-frame seeds")
+    parser.add_argument("--heartbeat", default=None, help="Heartbeat file updated at every frame stage")
+    parser.add_argument("--quarantine", default=None, help="JSON file of frame IDs to skip")
+    parser.add_argument("--plan", default=None,
+                        help="Frame plan written by --plan-workers; planned sequences use its seeds")
+    parser.add_argument("--plan-workers", type=positive_int, metavar="W", default=None,
+                        help="Sample --num-images scenes, predict their cost and write a "
+                             "longest-first frame plan for W workers instead of rendering")
+    parser.add_argument("--quota", action="store_true",
+                        help="Keep rendering until --num-images frames pass the quota acceptance rules")
+    parser.add_argument("--skip-post-process", action="store_true",
+                        help="Do not generate COCO annotations or visualizations after rendering")
+    parser.add_argument("--render-config", default=None,
+                        help="Rendering configuration to use instead of configs/rendering.yaml")
+    parser.add_argument("--device", choices=['auto', 'gpu', 'cpu'], default=None,
+                        help="Render device (overrides rendering.yaml device)")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Cycles threads per process, 0 for all cores (overrides rendering.yaml threads)")
+    parser.add_argument("--dry-run", type=positive_int, metavar="N", default=None,
+                        help="Sample N scenes without rendering and report the class distribution "
+                             "and render time predicted for a run of --num-images images")
     args = parser.parse_args(script_args)
     
+    global RENDER_CONFIG
+    if args.render_config:
+        RENDER_CONFIG = args.render_config
+    render_config = load_config(RENDER_CONFIG)
+    configure_logging(render_config)
+    
+    # With selective loading the .blend holds no assets yet; append what this worker needs
+    load_required_assets(render_config, load_config(), worker_plan_frames(args, render_config))
+
+    if args.dry_run is not None:
+        from scripts.estimate import dry_run, scale_report, format_report
+        print(format_report(scale_report(dry_run(args.dry_run, render_config), args.num_images)))
+        return
+    if args.plan_workers is not None:
+        from scripts.estimate import plan_frames
+        plan_frames(args.num_images, args.plan_workers, args.seed, render_config)
+        return
     reset_scene() # Clean up scene before starting render batch
 
-    setup_render_settings()
+    setup_render_settings(args.device, args.threads)
     print_device_info()
-    
-    bpy.context.scene.render.engine = 'CYCLES'
-    bpy.context.preferences.addons['cycles'].preferences.compute_device_type = 'CUDA'
-    bpy.context.scene.cycles.device = 'GPU'
 
-    render_config = batch_render(args.num_images)
+    render_config = batch_render(args.num_images, args.worker_id, args.start_sequence,
+                                 args.seed, args.heartbeat, args.quarantine, args.quota,
+                                 args.plan)
 
     # Process outputs if needed
+    if args.skip_post_process:
+        return
     if render_config['output'].get('save_coco') or render_config['output'].get('visualize_annotations'):
         from scripts.process_output import process_outputs
         process_outputs(
@@ -0,0 +1,37 @@
+"""
+Mesh LOD Report
+Estimates the render time each mesh LOD level saved, from the frame logs in
+output.base_path (see core/lod.py lod_savings).
+
+Usage:
+    python scripts/lod_report.py
+"""
+
+import sys
+from pathlib import Path
+
+import yaml
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.lod import lod_savings
+from core.output_layout import OutputLayout
+from core.frame_log import iter_frame_records
+
+def main():
+    with open(project_root / "configs" / "rendering.yaml", 'r') as f:
+        config = yaml.safe_load(f)
+    layout = OutputLayout.from_config(config)
+    report = lod_savings(iter_frame_records(layout.iter_frame_logs()))
+    print(f"{report['lod_frames']} frames rendered with LOD swaps, "
+          f"{report['reference_frames']} full-detail frames as reference")
+    for level, entry in sorted(report['levels'].items(), key=lambda item: int(item[0])):
+        print(f"  LOD{level}: {entry['objects']} objects in {entry['frames']} frames, "
+              f"{entry['faces_removed']} faces removed, ~{entry['seconds_saved']:.0f} s saved "
+              f"({entry['seconds_saved_per_frame']:.2f} s per frame)")
+
+if __name__ == "__main__":
+    main()
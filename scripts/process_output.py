@@ -2,9 +2,20 @@ import os
 import cv2
 import json
 import numpy as np
+import sys
 import yaml
 from pathlib import Path
 
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+	sys.path.append(str(project_root))
+
+from core.output_layout import OutputLayout
+from core.log import get_logger, configure_logging
+
+logger = get_logger(__name__)
+
 def load_config(config_path="configs/rendering.yaml"):
 	"""Load rendering configuration from YAML file."""
 	config_path = Path(config_path)
@@ -16,6 +27,97 @@ def load_config(config_path="configs/rendering.yaml"):
 	with open(config_path, 'r') as f:
 		return yaml.safe_load(f)
 
+def normalize_label(label_name, tag_list=None):
+	"""
+	Map a raw object label to its COCO category name.
+	
+	Args:
+		label_name: Label stored on the Blender object
+		tag_list: Optional list of labels to include. If None, every label is kept unchanged.
+	
+	Returns:
+		The category name, or None if the label is filtered out by tag_list
+	"""
+	if tag_list is None:
+		return label_name
+
+	# Check if this is an anomaly label
+	is_anomaly = "_Anomaly" in label_name
+	base_label = label_name.split("_Anomaly")[0] if is_anomaly else label_name
+
+	# Normalize every insulator variant to just "Insulator"
+	if "Insulator" in label_name:
+		return "Insulator_Anomaly" if is_anomaly else "Insulator"
+	# Check if base label (without _Anomaly) or the exact label is in tag list
+	if base_label in tag_list or label_name in tag_list:
+		return label_name
+	return None
+
+def annotate_mask(mask, object_labels, tag_list=None, min_object_size=0):
+	"""
+	Extract per-object annotations from a single frame's index mask.
+	
+	Args:
+		mask: Grayscale mask array where each pixel holds an object's pass index
+		object_labels: Mapping of pass index (as string) to object label for this frame
+		tag_list: Optional list of labels to include. If None, include all labels.
+		min_object_size: Minimum object area in pixels
+	
+	Returns:
+		List of dictionaries with category, pass_index, segmentation, area and bbox
+	"""
+	annotations = []
+
+	# Loop through each unique pass index in the mask
+	unique_ids = np.unique(mask)
+	logger.debug("Unique IDs in mask: %s", unique_ids)
+	
+	for obj_id in unique_ids:
+		if obj_id == 0:  # Skip background
+			continue
+			
+		str_obj_id = str(obj_id)
+		if str_obj_id not in object_labels:
+			logger.warning("Object ID %s not found in mappings", obj_id)
+			continue
+		
+		# Get the category name for the current object ID
+		label_name = normalize_label(object_labels[str_obj_id], tag_list)
+		if label_name is None:
+			continue
+		logger.debug("Label: %s", label_name)
+
+		# Create a binary mask for the current object
+		binary_mask = np.where(mask == obj_id, 255, 0).astype(np.uint8)
+
+		# Find contours for the object
+		contours, _ = cv2.findContours(binary_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+		segmentation = [contour.flatten().tolist() for contour in contours if len(contour) >= 3]
+
+		if not segmentation:
+			logger.warning("No valid contours found for object %s (%s)", obj_id, label_name)
+			continue
+
+		# Calculate bounding box and area
+		x, y, w, h = cv2.boundingRect(binary_mask)
+		area = float(np.sum(binary_mask) / 255)  # Convert to float for JSON serialization
+		logger.debug("Area: %s", area)
+		# Skip objects smaller than minimum size
+		if area < min_object_size:
+			logger.debug("Skipping object %s (%s) - area %.1f pixels is below minimum size %s",
+						 obj_id, label_name, area, min_object_size)
+			continue
+
+		annotations.append({
+			"category": label_name,
+			"pass_index": int(obj_id),
+			"segmentation": segmentation,
+			"area": area,
+			"bbox": [float(x), float(y), float(w), float(h)],
+		})
+
+	return annotations
+
 def generate_coco_annotations(output_dir=None, tag_list=None):
 	"""
 	Convert Blender synthetic data output to COCO format.
@@ -28,20 +130,20 @@ def generate_coco_annotations(output_dir=None, tag_list=None):
 	config = load_config()
 	min_object_size = config.get('output', {}).get('min_object_size', 100)  # Default 100 pixels
 	
-	if output_dir is None:
-		output_dir = Path(config['output']['base_path'])
-	else:
-		output_dir = Path(output_dir)
+	layout = OutputLayout.from_config(config, base_path=output_dir)
+	output_dir = layout.base_path
 	
-	mapping_file_path = output_dir / "all_frame_mappings.json"
+	mapping_files = list(layout.iter_mapping_files())
 	
-	if not mapping_file_path.exists():
-		raise FileNotFoundError(f"Mapping file not found at {mapping_file_path}")
+	if not mapping_files:
+		raise FileNotFoundError(f"No mapping files found under {output_dir}")
 	
-	print(f"Loading mappings from: {mapping_file_path}")
-	with open(mapping_file_path, "r") as mapping_file:
-		label_mappings = json.load(mapping_file)
-	print(f"Found {len(label_mappings)} image mappings")
+	label_mappings = {}
+	for mapping_file_path in mapping_files:
+		logger.info("Loading mappings from: %s", mapping_file_path)
+		with open(mapping_file_path, "r") as mapping_file:
+			label_mappings.update(json.load(mapping_file))
+	logger.info("Found %d image mappings", len(label_mappings))
 
 	# Prepare the COCO-format structure
 	coco_annotations = {
@@ -60,28 +162,24 @@ def generate_coco_annotations(output_dir=None, tag_list=None):
 
 	# Loop through each mapping entry first
 	for mapping_name in sorted(label_mappings.keys()):
-		# Convert render_XXXX to Image_XXXX
-		image_number = mapping_name.split('_')[1]  # Get the number part (e.g., "0000")
-		
-		# Construct the actual filenames
-		image_filename = f"Image_{image_number}.png"
-		mask_filename = f"Mask_{image_number}.png"
-		
-		image_path = output_dir / image_filename
-		mask_path = output_dir / mask_filename
+		# Resolve the frame's image and mask through the output layout
+		frame_id = layout.parse_key(mapping_name)
+		image_path = layout.image_path(frame_id)
+		mask_path = layout.mask_path(frame_id)
+		image_filename = layout.relative(image_path)
 		
 		if not image_path.exists():
-			print(f"Warning: Image file not found: {image_path}")
+			logger.warning("Image file not found: %s", image_path)
 			continue
 			
 		if not mask_path.exists():
-			print(f"Warning: Mask file not found: {mask_path}")
+			logger.warning("Mask file not found: %s", mask_path)
 			continue
 			
-		print(f"Processing image: {image_filename}")
+		logger.debug("Processing image: %s", image_filename)
 		mask = cv2.imread(str(mask_path), cv2.IMREAD_GRAYSCALE)
 		if mask is None:
-			print(f"Warning: Failed to read mask: {mask_path}")
+			logger.warning("Failed to read mask: %s", mask_path)
 			continue
 
 		# Prepare image information
@@ -95,50 +193,10 @@ def generate_coco_annotations(output_dir=None, tag_list=None):
 
 		# Get object labels for the current image
 		object_labels = label_mappings[mapping_name]
-		print(f"Found {len(object_labels)} objects in {mapping_name}")
-
-		# Loop through each unique pass index in the mask
-		unique_ids = np.unique(mask)
-		print(f"Unique IDs in mask: {unique_ids}")
-		
-		for obj_id in unique_ids:
-			if obj_id == 0:  # Skip background
-				continue
-				
-			str_obj_id = str(obj_id)
-			if str_obj_id not in object_labels:
-				print(f"Warning: Object ID {obj_id} not found in mappings")
-				continue
-			
-			# Get the label name for the current object ID
-			original_label = object_labels[str_obj_id]
-			label_name = original_label
+		logger.debug("Found %d objects in %s", len(object_labels), mapping_name)
 
-			# Check if this is an anomaly label
-			is_anomaly = "_Anomaly" in label_name
-			base_label = label_name.split("_Anomaly")[0] if is_anomaly else label_name
-
-			# Process special cases for labels
-			if tag_list is not None:
-				# Check if we should include this label
-				should_include = False
-				
-				# Check for Insulator in label
-				if "Insulator" in label_name:
-					should_include = True
-					label_name = "Insulator"  # Normalize to just "Insulator"
-					if is_anomaly:
-						label_name = "Insulator_Anomaly"
-				# Check if base label (without _Anomaly) is in tag list
-				elif any(base_label == tag for tag in tag_list):
-					should_include = True
-				# Check if exact label is in tag list
-				elif any(label_name == tag for tag in tag_list):
-					should_include = True
-				
-				if not should_include:
-					continue
-			print(label_name)
+		for frame_annotation in annotate_mask(mask, object_labels, tag_list, min_object_size):
+			label_name = frame_annotation["category"]
 			# Assign a category ID if the label is new
 			if label_name not in category_id_map:
 				category_id_map[label_name] = category_id_counter
@@ -149,34 +207,14 @@ def generate_coco_annotations(output_dir=None, tag_list=None):
 				})
 				category_id_counter += 1
 
-			# Create a binary mask for the current object
-			binary_mask = np.where(mask == obj_id, 255, 0).astype(np.uint8)
-
-			# Find contours for the object
-			contours, _ = cv2.findContours(binary_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-			segmentation = [contour.flatten().tolist() for contour in contours if len(contour) >= 3]
-
-			if not segmentation:
-				print(f"Warning: No valid contours found for object {obj_id} ({label_name})")
-				continue
-
-			# Calculate bounding box and area
-			x, y, w, h = cv2.boundingRect(binary_mask)
-			area = float(np.sum(binary_mask) / 255)  # Convert to float for JSON serialization
-			print('area: ', area)
-			# Skip objects smaller than minimum size
-			if area < min_object_size:
-				print(f"Warning: Skipping object {obj_id} ({label_name}) - area {area:.1f} pixels is below minimum size {min_object_size}")
-				continue
-
 			# Add annotation for this object
 			annotation = {
 				"id": annotation_id,
 				"image_id": image_id,
 				"category_id": category_id_map[label_name],
-				"segmentation": segmentation,
-				"area": area,
-				"bbox": [float(x), float(y), float(w), float(h)],
+				"segmentation": frame_annotation["segmentation"],
+				"area": frame_annotation["area"],
+				"bbox": frame_annotation["bbox"],
 				"iscrowd": 0
 			}
 			coco_annotations["annotations"].append(annotation)
@@ -189,7 +227,7 @@ def generate_coco_annotations(output_dir=None, tag_list=None):
 	with open(output_path, "w") as outfile:
 		json.dump(coco_annotations, outfile, indent=2)
 
-	print(f"COCO annotations saved to {output_path}")
+	logger.info("COCO annotations saved to %s", output_path)
 	return output_path
 
 def visualize_annotations(coco_data, images_dir, output_dir):
@@ -223,13 +261,13 @@ def visualize_annotations(coco_data, images_dir, output_dir):
     for img_info in coco_data['images']:
         image_path = Path(images_dir) / img_info['file_name']
         if not image_path.exists():
-            print(f"Warning: Image not found: {image_path}")
+            logger.warning("Image not found: %s", image_path)
             continue
             
         # Read image
         image = cv2.imread(str(image_path))
         if image is None:
-            print(f"Warning: Could not read image: {image_path}")
+            logger.warning("Could not read image: %s", image_path)
             continue
             
         # Draw annotations
@@ -251,9 +289,9 @@ def visualize_annotations(coco_data, images_dir, output_dir):
                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
         
         # Save visualization
-        output_path = vis_dir / f"viz_{img_info['file_name']}"
+        output_path = vis_dir / f"viz_{Path(img_info['file_name']).name}"
         cv2.imwrite(str(output_path), image)
-        print(f"Saved visualization: {output_path}")
+        logger.debug("Saved visualization: %s", output_path)
 
 def process_outputs(output_dir=None, save_coco=True, visualize=True, coco_format='both', tag_list=None):
     """Process rendered outputs to generate COCO annotations and visualizations.
@@ -275,32 +313,33 @@ def process_outputs(output_dir=None, save_coco=True, visualize=True, coco_format
     if tag_list is None and 'tag_list' in config['output']:
         tag_list = config['output']['tag_list']
         if tag_list:  # Only print if tag list is not empty
-            print(f"Using tag list from config: {tag_list}")
+            logger.info("Using tag list from config: %s", tag_list)
     
     coco_path = None
     if save_coco:
         coco_path = generate_coco_annotations(output_dir, tag_list=tag_list)
-        print(f"Saved COCO annotations to: {coco_path}")
+        logger.info("Saved COCO annotations to: %s", coco_path)
     
     if visualize:
         if coco_path is None:
             coco_path = output_dir / "coco_annotations.json"
         
         if not coco_path.exists():
-            print("Error: COCO annotations not found. Cannot create visualizations.")
+            logger.error("COCO annotations not found. Cannot create visualizations.")
             return
         
         with open(coco_path, 'r') as f:
             coco_data = json.load(f)
         
         visualize_annotations(coco_data, output_dir, output_dir)
-        print(f"Saved visualizations to: {output_dir}/visualizations")
+        logger.info("Saved visualizations to: %s/visualizations", output_dir)
 
 if __name__ == "__main__":
+	configure_logging(load_config())
 	try:
 		process_outputs()  # Will now use tag list from config by default
-		print("Successfully processed dataset")
+		logger.info("Successfully processed dataset")
 	except Exception as e:
-		print(f"Error processing dataset: {str(e)}")
+		logger.error("Error processing dataset: %s", e)
 		exit(1)
 	exit(0)
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""
+Render Cache Maintenance
+Reports the size and hit rate of the render cache and evicts entries by size.
+
+Usage:
+    python scripts/render_cache.py [--evict-gb 200]
+"""
+
+import sys
+from pathlib import Path
+
+import yaml
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.render_cache import RenderCache
+from core.output_layout import OutputLayout
+from core.frame_log import iter_frame_records
+
+def cache_report(config: dict) -> dict:
+    """
+    Summarize the render cache and the hits recorded in the frame logs of ``output.base_path``.
+
+    Returns:
+        Dictionary with entry count, size and the logged hit rate
+    """
+    settings = dict(config.get('render_cache', {}) or {}, enabled=True)
+    cache = RenderCache.from_config(dict(config, render_cache=settings))
+    entries = list(cache.entries())
+    layout = OutputLayout.from_config(config)
+    lookups = hits = 0
+    for record in iter_frame_records(layout.iter_frame_logs()):
+        if 'cache_hit' in record:
+            lookups += 1
+            hits += bool(record['cache_hit'])
+    return {
+        'path': str(cache.path),
+        'entries': len(entries),
+        'size_gb': round(sum(size for _, _, size in entries) / 1024 ** 3, 3),
+        'logged_frames': lookups,
+        'logged_hits': hits,
+        'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+    }
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Report on and evict the render cache")
+    parser.add_argument("--evict-gb", type=float, default=None,
+                        help="Remove least recently used entries until the cache fits in this many GB")
+    args = parser.parse_args()
+
+    with open(project_root / "configs" / "rendering.yaml", 'r') as f:
+        config = yaml.safe_load(f)
+    if args.evict_gb is not None:
+        settings = dict(config.get('render_cache', {}) or {}, enabled=True)
+        cache = RenderCache.from_config(dict(config, render_cache=settings))
+        removed = cache.evict(int(args.evict_gb * 1024 ** 3))
+        print(f"Evicted {removed} entries")
+    report = cache_report(config)
+    print(f"{report['entries']} entries, {report['size_gb']} GB in {report['path']}")
+    print(f"Hit rate {report['hit_rate']:.1%} over {report['logged_frames']} logged frames")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Generation Supervisor
+Runs the generation loop in child Blender processes, restarts them when a frame
+crashes or exceeds its timeout, and quarantines frames that keep failing.
+
+Without ``--workers`` the worker count, Cycles threads and render device come from
+this node's profile written by ``scripts/autotune.py``; each worker is pinned to
+its own CPUs.
+
+With ``--schedule lpt`` every frame is sampled and costed up front and frames are
+handed to workers longest first, so no worker is left with a long straggler tail.
+
+Usage:
+    python scripts/supervisor.py --num-images 1000 --workers 2 [--schedule lpt]
+"""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.output_layout import OutputLayout
+from core.heartbeat import read_json, write_json_atomic, load_quarantine
+from core.scene_spec import new_base_seed
+from core.frame_log import iter_frame_records
+from core.scheduling import makespan_report, format_makespan_report
+from core.node_profile import load_node_profile, split_cpus, pin_to_cpus
+from core.log import get_logger, configure_logging
+
+logger = get_logger(__name__)
+
+def load_config(config_path: str = "configs/rendering.yaml") -> dict:
+    """Load rendering configuration from YAML file."""
+    config_path = Path(config_path)
+    if not config_path.is_absolute():
+        config_path = project_root / config_path
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+    
+    # Children run from the project root, so resolve the output path the same way
+    base_path = Path(config['output']['base_path'])
+    if not base_path.is_absolute():
+        config['output']['base_path'] = str((project_root / base_path).resolve())
+    return config
+
+def blender_command(config: dict) -> list:
+    """Command line prefix running generate.py in a background Blender process.
+
+    With selective asset loading the worker opens the minimal .blend and appends
+    the collections it needs from the library itself.
+    """
+    settings = config.get('supervisor', {}) or {}
+    assets = config.get('assets', {}) or {}
+    blend_file = assets['minimal_blend'] if assets.get('selective') else settings['blend_file']
+    # Without --python-exit-code Blender exits 0 even when the script raises
+    return [
+        settings.get('blender_path', 'blender'), '-b', blend_file, '--python-exit-code', '1',
+        '-P', str(project_root / 'scripts' / 'generate.py'), '--',
+    ]
+
+def run_planner(num_images: int, workers: int, seed: int, config: dict) -> dict:
+    """Sample and cost every frame in a Blender child and return the frame plan it writes."""
+    layout = OutputLayout.from_config(config)
+    command = blender_command(config) + [
+        '--num-images', str(num_images), '--plan-workers', str(workers), '--seed', str(seed),
+    ]
+    logger.info("Planning %d frames for %d workers", num_images, workers)
+    subprocess.run(command, cwd=str(project_root), check=True)
+    plan = read_json(layout.plan_path())
+    if plan is None or plan.get('base_seed') != seed:
+        raise RuntimeError(f"Planner did not write a plan to {layout.plan_path()}")
+    logger.info("Predicted makespan %.0f s, naive split %.0f s",
+                plan['predicted_makespan'], plan['naive_makespan'])
+    return plan
+
+class WorkerSupervisor:
+    """Supervises one generation worker through crashes, hangs and restarts."""
+
+    def __init__(self, config: dict, worker_id: int, first_sequence: int, num_images: int, seed: int,
+                 plan_path=None, threads: int = None, device: str = None, cpus: list = None):
+        self.config = config
+        self.settings = config.get('supervisor', {}) or {}
+        self.layout = OutputLayout.from_config(config, worker_id=worker_id)
+        self.worker_id = worker_id
+        self.seed = seed
+        self.plan_path = plan_path
+        self.threads = threads
+        self.device = device
+        self.cpus = cpus
+        self.next_sequence = first_sequence
+        self.end_sequence = first_sequence + num_images
+        self.crashes = {}
+        self.restarts = 0
+        self.process = None
+        self.started_at = None
+        self.finished = False
+        self.failed = False
+
+    def command(self) -> list:
+        """Blender command line running the generation loop for the remaining frames."""
+        command = blender_command(self.config) + [
+            '--num-images', str(self.end_sequence - self.next_sequence),
+            '--start-sequence', str(self.next_sequence),
+            '--worker-id', str(self.worker_id),
+            '--seed', str(self.seed),
+            '--heartbeat', str(self.layout.heartbeat_path()),
+            '--quarantine', str(self.layout.quarantine_path()),
+            '--skip-post-process',
+        ]
+        if self.plan_path:
+            command += ['--plan', str(self.plan_path)]
+        if self.threads is not None:
+            command += ['--threads', str(self.threads)]
+        if self.device:
+            command += ['--device', self.device]
+        return command
+
+    def start(self) -> None:
+        """Launch a child Blender process for the remaining frames."""
+        heartbeat_path = self.layout.heartbeat_path()
+        if heartbeat_path.exists():
+            heartbeat_path.unlink()
+        logger.info("Worker %d: starting at sequence %d (%d frames left)", self.worker_id,
+                    self.next_sequence, self.end_sequence - self.next_sequence)
+        self.process = subprocess.Popen(self.command(), cwd=str(project_root), preexec_fn=pin_to_cpus(self.cpus))
+        self.started_at = time.time()
+
+    def poll(self) -> None:
+        """Check the child once; restart it if it exited or hung."""
+        if self.finished or self.failed:
+            return
+
+        heartbeat = read_json(self.layout.heartbeat_path())
+        exit_code = self.process.poll()
+        if exit_code is not None:
+            if exit_code == 0 and self._completed(heartbeat):
+                self.next_sequence = self.end_sequence
+                self.finished = True
+                logger.info("Worker %d: finished", self.worker_id)
+                return
+            if exit_code == 0:
+                logger.warning("Worker %d: child exited before its last frame (stage %s)", self.worker_id,
+                               heartbeat.get('stage') if heartbeat else None)
+            else:
+                logger.warning("Worker %d: child exited with code %s", self.worker_id, exit_code)
+            self._handle_failure(heartbeat)
+            return
+
+        now = time.time()
+        if heartbeat is None:
+            if now - self.started_at > self.settings.get('startup_timeout', 600):
+                logger.warning("Worker %d: no heartbeat after startup timeout", self.worker_id)
+                self._kill()
+                self._handle_failure(None)
+        elif heartbeat.get('stage') not in ('done', 'finished') and \
+                now - heartbeat['frame_start'] > self.settings.get('frame_timeout', 900):
+            logger.warning("Worker %d: frame %d stuck in stage %s", self.worker_id,
+                           heartbeat['frame_id'], heartbeat.get('stage'))
+            self._kill()
+            self._handle_failure(heartbeat)
+
+    def _completed(self, heartbeat) -> bool:
+        """Whether the heartbeat shows the child got through its last frame."""
+        if not heartbeat:
+            return False
+        if heartbeat.get('stage') == 'finished':
+            return True
+        return heartbeat.get('stage') == 'done' and heartbeat['sequence'] >= self.end_sequence - 1
+
+    def _advance(self, heartbeat) -> None:
+        """Move past every frame the child completed."""
+        if heartbeat and heartbeat.get('stage') == 'done':
+            self.next_sequence = max(self.next_sequence, heartbeat['sequence'] + 1)
+
+    def _kill(self) -> None:
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def _handle_failure(self, heartbeat) -> None:
+        """Record the crash against the frame in progress and restart the child."""
+        if heartbeat and heartbeat.get('stage') != 'done':
+            frame_id = heartbeat['frame_id']
+            self.next_sequence = heartbeat['sequence']
+            self.crashes[frame_id] = self.crashes.get(frame_id, 0) + 1
+            if self.crashes[frame_id] >= self.settings.get('max_crashes_per_frame', 2):
+                self._quarantine(heartbeat)
+                # Skip the frame and extend the range so the worker still delivers its share
+                self.next_sequence += 1
+                self.end_sequence += 1
+        else:
+            self._advance(heartbeat)
+
+        self.restarts += 1
+        if self.restarts > self.settings.get('max_restarts', 50):
+            logger.error("Worker %d: giving up after %d restarts", self.worker_id, self.restarts)
+            self.failed = True
+            return
+        self.start()
+
+    def _quarantine(self, heartbeat) -> None:
+        quarantine_path = self.layout.quarantine_path()
+        quarantine = load_quarantine(quarantine_path)
+        quarantine[str(heartbeat['frame_id'])] = {
+            'worker_id': self.worker_id,
+            'sequence': heartbeat['sequence'],
+            'seed': heartbeat['seed'],
+            'stage': heartbeat.get('stage'),
+            'crashes': self.crashes[heartbeat['frame_id']],
+        }
+        write_json_atomic(quarantine_path, quarantine)
+        logger.error("Worker %d: quarantined frame %d (seed %d) after %d failures in stage %s",
+                     self.worker_id, heartbeat['frame_id'], heartbeat['seed'],
+                     self.crashes[heartbeat['frame_id']], heartbeat.get('stage'))
+
+def supervise(num_images: int, workers: int = 1, seed: int = None, config: dict = None,
+              schedule: str = 'split', threads: int = None, device: str = None, pin: bool = False) -> bool:
+    """
+    Render num_images frames split across supervised worker processes.
+
+    Args:
+        num_images: Number of frames to render
+        workers: Number of worker processes
+        seed: Base seed shared by all workers (random if omitted)
+        config: Rendering configuration (loaded from rendering.yaml if omitted)
+        schedule: ``split`` for equal consecutive ranges, ``lpt`` to plan frames by
+            predicted cost and assign them longest first
+        threads: Cycles threads per worker (rendering.yaml if omitted)
+        device: Render device passed to the workers (rendering.yaml if omitted)
+        pin: Pin every worker to its own share of the CPUs
+
+    Returns:
+        True if every worker finished its share
+    """
+    config = config or load_config()
+    seed = new_base_seed() if seed is None else seed
+    run_start = time.time()
+
+    plan, plan_path = None, None
+    if schedule == 'lpt':
+        plan = run_planner(num_images, workers, seed, config)
+        plan_path = OutputLayout.from_config(config).plan_path()
+        shares = [(plan['workers'][str(i)]['start_sequence'], len(plan['workers'][str(i)]['frames']))
+                  for i in range(workers)]
+    else:
+        shares = [(OutputLayout.from_config(config, worker_id=i).next_sequence(),
+                   num_images // workers + (1 if i < num_images % workers else 0)) for i in range(workers)]
+
+    cpu_sets = split_cpus(workers) if pin else [None] * workers
+    supervisors = []
+    for worker_id, (first_sequence, count) in enumerate(shares):
+        supervisor = WorkerSupervisor(config, worker_id, first_sequence, count, seed, plan_path,
+                                      threads, device, cpu_sets[worker_id])
+        supervisor.start()
+        supervisors.append(supervisor)
+
+    poll_interval = (config.get('supervisor', {}) or {}).get('poll_interval', 5)
+    while not all(s.finished or s.failed for s in supervisors):
+        time.sleep(poll_interval)
+        for supervisor in supervisors:
+            supervisor.poll()
+
+    if plan:
+        layout = OutputLayout.from_config(config)
+        report = makespan_report(plan, iter_frame_records(layout.iter_frame_logs()), time.time() - run_start)
+        write_json_atomic(layout.plan_report_path(), report)
+        logger.info("Schedule report:\n%s", format_makespan_report(report))
+
+    return all(s.finished for s in supervisors)
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Supervise synthetic utility pole generation")
+    parser.add_argument("--num-images", type=int, default=1, help="Number of images to generate")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of Blender worker processes (defaults to the node profile, else 1)")
+    parser.add_argument("--threads", type=int, default=None, help="Cycles threads per worker")
+    parser.add_argument("--device", choices=['auto', 'gpu', 'cpu'], default=None, help="Render device")
+    parser.add_argument("--seed", type=int, default=None, help="Base seed shared by all workers")
+    parser.add_argument("--schedule", choices=['split', 'lpt'], default='split',
+                        help="split: equal frame ranges; lpt: plan frames by predicted cost, longest first")
+    args = parser.parse_args()
+
+    config = load_config()
+    configure_logging(config)
+
+    # Settings the autotuner found fastest on this node, unless given explicitly
+    profile = load_node_profile(config, project_root) if args.workers is None else None
+    if profile:
+        logger.info("Using node profile: %d workers, %d threads, device %s",
+                    profile['workers'], profile['threads'], profile['device'])
+        args.workers = profile['workers']
+        args.threads = profile['threads'] if args.threads is None else args.threads
+        args.device = args.device or profile['device']
+    args.workers = args.workers or 1
+
+    # Flag asset names the .blend lacks before hours of rendering, not mid-run
+    from scripts.check_assets import check_assets
+    missing = check_assets(config)
+    for kind, name, location in missing or []:
+        logger.error("Asset manifest has no %s '%s' (%s)", kind, name, location)
+
+    if args.workers > 1 and (config['output'].get('layout', {}) or {}).get('mode') != 'sharded':
+        parser.error("Multiple workers require output.layout.mode: sharded")
+
+    success = supervise(args.num_images, args.workers, args.seed, config, args.schedule,
+                        args.threads, args.device, pin=bool(profile and profile.get('pinned')))
+
+    output = config['output']
+    if success and (output.get('save_coco') or output.get('visualize_annotations')):
+        from scripts.process_output import process_outputs
+        process_outputs(
+            output_dir=output['base_path'],
+            save_coco=output.get('save_coco', False),
+            visualize=output.get('visualize_annotations', False),
+            coco_format=output.get('coco_format', 'both')
+        )
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
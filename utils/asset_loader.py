@@ -0,0 +1,164 @@
+"""Selective loading of asset collections from the project library .blend.
+
+Instead of opening the full SyntheticDataProject.blend, a worker can start from a
+minimal .blend (camera, lights, world and compositor only) and append just the
+collections its frames need, as listed in ``configs/asset_collections.yaml``.
+Collections are appended rather than linked because generation changes object
+visibility, transforms, materials and pass indices.
+"""
+
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+import bpy
+import yaml
+
+from core.log import get_logger
+
+logger = get_logger(__name__)
+
+
+def load_asset_map(path) -> Dict[str, Any]:
+    """Load the collection requirements file."""
+    with open(path, 'r') as f:
+        return yaml.safe_load(f)
+
+
+def collections_for_frames(asset_map: Dict[str, Any], frames: Iterable[Dict[str, Any]]) -> set:
+    """Collections needed to regenerate a list of planned frame records."""
+    components = asset_map.get('components', {}) or {}
+    needed = set()
+    for frame in frames:
+        needed.update(asset_map['pole_types'].get(frame.get('pole_type'), []))
+        for item in frame.get('setup') or []:
+            needed.update(components.get(item, []))
+        for flag in ('surge_arresters', 'fcis'):
+            if frame.get(flag):
+                needed.update(components.get(flag, []))
+    return needed
+
+
+def collections_for_config(asset_map: Dict[str, Any], pole_config: Dict[str, Any]) -> set:
+    """Collections any frame of the pole generation config could need."""
+    components = asset_map.get('components', {}) or {}
+    chances = pole_config.get('equipment_chances', {}) or {}
+    needed = set()
+    for name, details in pole_config['pole_framing_types'].items():
+        if not isinstance(details, dict) or not details.get('enabled', True) or not details.get('weight', 1):
+            continue
+        needed.update(asset_map['pole_types'].get(name, []))
+        configurations = details.get('configurations', {}) or {}
+        for setup in configurations.get('possible_setups', []) or []:
+            for item in setup:
+                needed.update(components.get(item, []))
+        for item in configurations.get('optional_components', []) or []:
+            if chances.get(item, 1):
+                needed.update(components.get(item, []))
+    return needed
+
+
+def required_collections(asset_map: Dict[str, Any], pole_config: Dict[str, Any],
+                         frames: Optional[List[Dict[str, Any]]] = None) -> List[str]:
+    """
+    Collections a worker has to load.
+
+    Planned frames narrow the set down to what those exact frames use. Frames
+    that were regenerated by difficulty weighting may have passed through other
+    configurations first, and frames planned without sampling (such as autotune
+    plans) carry no configuration, so plans containing either fall back to the config.
+
+    Args:
+        asset_map: Collection requirements from ``asset_collections.yaml``
+        pole_config: Pole generation configuration
+        frames: Planned frame records of this worker, if it renders a plan
+
+    Returns:
+        Sorted list of collection names
+    """
+    needed = set((asset_map.get('always', {}) or {}).get('collections', []))
+    if frames and all('pole_type' in frame and frame.get('attempts', 1) == 1 for frame in frames):
+        needed |= collections_for_frames(asset_map, frames)
+    else:
+        needed |= collections_for_config(asset_map, pole_config)
+    return sorted(needed)
+
+
+def required_materials(asset_map: Dict[str, Any], pole_config: Dict[str, Any]) -> List[str]:
+    """Materials looked up by name that no appended object may bring along."""
+    materials = set((asset_map.get('always', {}) or {}).get('materials', []))
+    if (pole_config.get('anomalies', {}) or {}).get('enable_chance'):
+        materials.update(asset_map.get('anomaly_materials', []) or [])
+    return sorted(materials)
+
+
+def append_assets(library_path, collections: List[str], materials: List[str] = ()) -> List[str]:
+    """
+    Append collections and materials that are not loaded yet from a library .blend.
+
+    Appended collections are linked under the scene's master collection.
+
+    Returns:
+        Names of the collections that were appended
+    """
+    library_path = str(Path(library_path))
+    with bpy.data.libraries.load(library_path, link=False) as (data_from, data_to):
+        missing = [name for name in collections if name not in data_from.collections]
+        if missing:
+            logger.warning("Collections not found in %s: %s", library_path, missing)
+        data_to.collections = [name for name in collections
+                               if name in data_from.collections and name not in bpy.data.collections]
+        data_to.materials = [name for name in materials
+                             if name in data_from.materials and name not in bpy.data.materials]
+
+    # No object uses these materials until the generator assigns them, so without
+    # a fake user the first orphan purge would remove them
+    for material in data_to.materials:
+        if material is not None:
+            material.use_fake_user = True
+
+    scene_collection = bpy.context.scene.collection
+    appended = []
+    for collection in data_to.collections:
+        if collection is None:
+            continue
+        # A collection already pulled in as another one's child must not be linked twice
+        if not any(collection.name in parent.children for parent in bpy.data.collections if parent is not collection) \
+                and collection.name not in scene_collection.children:
+            scene_collection.children.link(collection)
+        appended.append(collection.name)
+    if appended:
+        # Appended objects arrive visible without passing through toggle_visibility
+        from core.trackers import SceneJournal
+        from utils.scene_index import invalidate_scene_index
+        SceneJournal.get_instance().request_full_sweep()
+        invalidate_scene_index()
+    return appended
+
+
+def named_materials(render_config: Dict[str, Any]) -> List[str]:
+    """Materials the generator looks up by name (``always.materials`` and ``anomaly_materials``)."""
+    map_file = (render_config.get('assets', {}) or {}).get('map_file')
+    if not map_file or not Path(map_file).exists():
+        return []
+    asset_map = load_asset_map(map_file) or {}
+    materials = set((asset_map.get('always', {}) or {}).get('materials', []) or [])
+    materials.update(asset_map.get('anomaly_materials', []) or [])
+    return sorted(materials)
+
+
+def load_required_assets(render_config: Dict[str, Any], pole_config: Dict[str, Any],
+                         frames: Optional[List[Dict[str, Any]]] = None) -> Optional[List[str]]:
+    """
+    Append the collections this worker needs if ``assets.selective`` is enabled.
+
+    Returns:
+        Appended collection names, or None when selective loading is off
+    """
+    settings = render_config.get('assets', {}) or {}
+    if not settings.get('selective', False):
+        return None
+    asset_map = load_asset_map(settings['map_file'])
+    collections = required_collections(asset_map, pole_config, frames)
+    appended = append_assets(settings['library'], collections, required_materials(asset_map, pole_config))
+    logger.info("Appended %d of the library's collections: %s", len(appended), appended)
+    return appended
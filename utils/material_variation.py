@@ -0,0 +1,216 @@
+"""Per-object material variation read by shader nodes from object custom properties.
+
+Editing a shared material every frame, whether an input such as the rust noise
+``W`` of ``PorcelainFuse1`` or a swap to ``FlashedALSMaterial``, makes Cycles
+re-sync and recompile the shaders, and it changes every object that shares the
+material. Instead, each varied material is prepared once per loaded .blend:
+
+- Rust: an Attribute node (type Object) reads ``rust_w`` from the object and
+  adds it to the noise texture's original ``W``.
+- Flash: a ``<material>.Flashable`` copy mixes the original surface with the
+  ``FlashedALSMaterial`` surface by the object's ``flashed`` property (0 or 1).
+  It replaces the object's material the first time the object is flashed and
+  looks exactly like the original while ``flashed`` is unset.
+
+Per frame only the objects' custom properties change, through the
+``SceneJournal``, so the next reset removes them again.
+"""
+
+from typing import Dict, List, Optional
+
+import bpy
+
+from core.trackers import SceneJournal
+from core.log import get_logger
+
+logger = get_logger(__name__)
+
+RUST_ATTRIBUTE = 'rust_w'
+FLASH_ATTRIBUTE = 'flashed'
+FLASHED_MATERIAL = 'FlashedALSMaterial'
+
+# Object properties the prepared materials read (part of the render cache key)
+VARIATION_ATTRIBUTES = (RUST_ATTRIBUTE, FLASH_ATTRIBUTE)
+
+# Node properties that must not be copied between trees
+_SKIP_PROPERTIES = {'name', 'parent', 'select', 'location', 'width', 'height', 'dimensions'}
+
+_prepared: Dict[str, object] = {'signature': None, 'rust_base': {}, 'users': {}}
+
+
+def _state() -> Dict[str, object]:
+    """Prepared-material state of the loaded .blend, cleared when another .blend is loaded."""
+    if _prepared['signature'] != bpy.data.filepath:
+        _prepared.update(signature=bpy.data.filepath, rust_base={}, users={})
+    return _prepared
+
+
+def _attribute_node(nodes, name: str):
+    """Attribute node reading an object custom property."""
+    node = nodes.new('ShaderNodeAttribute')
+    node.attribute_type = 'OBJECT'
+    node.attribute_name = name
+    return node
+
+
+def _active_output(tree):
+    """Active Material Output node of a material's node tree."""
+    outputs = [node for node in tree.nodes if node.type == 'OUTPUT_MATERIAL']
+    return next((node for node in outputs if node.is_active_output), outputs[0] if outputs else None)
+
+
+def _socket(sockets, identifier: str):
+    return next(socket for socket in sockets if socket.identifier == identifier)
+
+
+def prepare_rust(material_name: str, node_name: str = 'Noise Texture.001', input_name: str = 'W') -> bool:
+    """
+    Drive a material's noise input by the objects' ``rust_w`` property, once per .blend.
+
+    Returns:
+        Whether the material and its noise node exist
+    """
+    state = _state()
+    if material_name in state['rust_base']:
+        return True
+    material = bpy.data.materials.get(material_name)
+    if not material or not material.node_tree:
+        return False
+    nodes, links = material.node_tree.nodes, material.node_tree.links
+    noise = nodes.get(node_name)
+    if not noise:
+        return False
+    # Looked up by name every frame, also while no visible object uses it
+    material.use_fake_user = True
+
+    offset = nodes.get('RustOffset')
+    if offset is None:
+        # W = original W + object's rust_w (0 when the object has none)
+        offset = nodes.new('ShaderNodeMath')
+        offset.name = 'RustOffset'
+        offset.operation = 'ADD'
+        offset.inputs[1].default_value = noise.inputs[input_name].default_value
+        links.new(_attribute_node(nodes, RUST_ATTRIBUTE).outputs['Fac'], offset.inputs[0])
+        links.new(offset.outputs['Value'], noise.inputs[input_name])
+        logger.debug("Prepared %s for per-object rust", material_name)
+    state['rust_base'][material_name] = offset.inputs[1].default_value
+    return True
+
+
+def material_users(material_name: str) -> List[bpy.types.Object]:
+    """Objects with a material in any slot, found once per .blend."""
+    users = _state()['users']
+    if material_name not in users:
+        users[material_name] = [obj for obj in bpy.data.objects
+                                 if any(slot.material and slot.material.name == material_name
+                                        for slot in obj.material_slots)]
+    return users[material_name]
+
+
+def set_rust(objects, material_name: str, w: float) -> None:
+    """Give objects the rust noise ``W`` of a prepared material, journaled."""
+    base = _state()['rust_base'][material_name]
+    journal = SceneJournal.get_instance()
+    for obj in objects:
+        if obj is not None:
+            journal.set_item(obj, RUST_ATTRIBUTE, w - base)
+
+
+def _copy_nodes(source, target) -> Dict[str, bpy.types.Node]:
+    """Copy every node except outputs and the links between them from one node tree to another."""
+    copies = {}
+    for node in source.nodes:
+        if node.type in {'OUTPUT_MATERIAL', 'FRAME'}:
+            continue
+        copy = target.nodes.new(node.bl_idname)
+        for prop in node.bl_rna.properties:
+            if prop.is_readonly or prop.identifier in _SKIP_PROPERTIES:
+                continue
+            try:
+                setattr(copy, prop.identifier, getattr(node, prop.identifier))
+            except (AttributeError, TypeError, ValueError, RuntimeError):
+                continue
+        if node.type == 'VALTORGB':
+            ramp, source_ramp = copy.color_ramp, node.color_ramp
+            ramp.interpolation = source_ramp.interpolation
+            while len(ramp.elements) < len(source_ramp.elements):
+                ramp.elements.new(0.0)
+            for element, source_element in zip(ramp.elements, source_ramp.elements):
+                element.position = source_element.position
+                element.color = source_element.color
+        for socket, source_socket in zip(copy.inputs, node.inputs):
+            if hasattr(source_socket, 'default_value'):
+                try:
+                    socket.default_value = source_socket.default_value
+                except (TypeError, ValueError):
+                    continue
+        copy.location = node.location.copy()
+        copy.location.y -= 1000
+        copies[node.name] = copy
+    for link in source.links:
+        if link.from_node.name in copies and link.to_node.name in copies:
+            target.links.new(_socket(copies[link.from_node.name].outputs, link.from_socket.identifier),
+                             _socket(copies[link.to_node.name].inputs, link.to_socket.identifier))
+    return copies
+
+
+def flashable_material(material) -> Optional[bpy.types.Material]:
+    """
+    Copy of a material that shows the flashed surface where the object's ``flashed`` is 1.
+
+    Built once per material; None when ``FlashedALSMaterial`` or a surface is missing.
+    """
+    if material is None:
+        return None
+    if material.name.endswith('.Flashable'):
+        return material
+    name = f"{material.name}.Flashable"
+    if name in bpy.data.materials:
+        return bpy.data.materials[name]
+    flashed = bpy.data.materials.get(FLASHED_MATERIAL)
+    if not flashed or not flashed.node_tree or not material.node_tree:
+        return None
+    # No object uses the flashed material itself, so orphan purges would remove it
+    flashed.use_fake_user = True
+    flashed_output = _active_output(flashed.node_tree)
+    output = _active_output(material.node_tree)
+    if not flashed_output or not output or not flashed_output.inputs['Surface'].is_linked \
+            or not output.inputs['Surface'].is_linked:
+        return None
+
+    combined = material.copy()
+    combined.name = name
+    combined.use_fake_user = True
+    tree = combined.node_tree
+    output = _active_output(tree)
+    copies = _copy_nodes(flashed.node_tree, tree)
+    surface_link = flashed_output.inputs['Surface'].links[0]
+    flashed_surface = _socket(copies[surface_link.from_node.name].outputs, surface_link.from_socket.identifier)
+    base_surface = output.inputs['Surface'].links[0].from_socket
+
+    mix = tree.nodes.new('ShaderNodeMixShader')
+    tree.links.new(_attribute_node(tree.nodes, FLASH_ATTRIBUTE).outputs['Fac'], mix.inputs[0])
+    tree.links.new(base_surface, mix.inputs[1])
+    tree.links.new(flashed_surface, mix.inputs[2])
+    tree.links.new(mix.outputs[0], output.inputs['Surface'])
+    logger.debug("Built %s", name)
+    return combined
+
+
+def set_flashed(obj) -> bool:
+    """
+    Show an object's flashed surface for this frame, journaled.
+
+    The first time an object is flashed its material is replaced for good by
+    the flashable copy, which looks the same while ``flashed`` is unset.
+
+    Returns:
+        Whether the object could be flashed
+    """
+    combined = flashable_material(obj.active_material)
+    if combined is None:
+        return False
+    if obj.active_material != combined:
+        obj.active_material = combined
+    SceneJournal.get_instance().set_item(obj, FLASH_ATTRIBUTE, 1.0)
+    return True
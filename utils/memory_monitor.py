@@ -0,0 +1,145 @@
+"""Per-frame datablock and process memory monitoring with orphan purging."""
+
+import os
+import sys
+from collections import deque
+from typing import Dict, Any, Iterable, Optional
+
+import bpy
+
+from core.log import get_logger
+
+logger = get_logger(__name__)
+
+# bpy.data collections that are counted every frame
+TRACKED_DATABLOCKS = ('curves', 'images', 'meshes', 'materials', 'node_groups', 'objects')
+
+
+def datablock_counts() -> Dict[str, int]:
+    """Return the number of datablocks in each tracked bpy.data collection."""
+    return {name: len(getattr(bpy.data, name)) for name in TRACKED_DATABLOCKS}
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Return the resident set size of this process, or None if it cannot be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def process_peak_rss_bytes() -> Optional[int]:
+    """Return the highest resident set size this process has reached, or None if it cannot be read."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return getattr(psutil.Process().memory_info(), 'peak_wset', None)
+    except ImportError:
+        return None
+
+
+def purge_unused_images() -> int:
+    """Remove images that nothing uses any more (fake users count as users)."""
+    unused = [image for image in bpy.data.images
+              if image.users == 0 and image.name not in ('Render Result', 'Viewer Node')]
+    for image in unused:
+        bpy.data.images.remove(image)
+    return len(unused)
+
+
+def protect_materials(names) -> int:
+    """Give materials the generator looks up by name a fake user so orphan purges keep them."""
+    protected = 0
+    for name in names:
+        material = bpy.data.materials.get(name)
+        if material is not None and not material.use_fake_user:
+            material.use_fake_user = True
+            protected += 1
+    return protected
+
+
+def purge_orphans() -> int:
+    """Recursively remove every local datablock with zero users."""
+    return bpy.data.orphans_purge(do_local_ids=True, do_linked_ids=False, do_recursive=True) or 0
+
+
+class MemoryMonitor:
+    """Records datablock counts and RSS each frame, purges orphans and alerts on growth.
+
+    Settings come from the ``memory`` section of rendering.yaml:
+        purge_every:    purge orphan datablocks every N frames (0 disables)
+        purge_images:   also remove unused images when purging
+        window:         number of frames the growth rate is measured over
+        alert_growth:   per-frame growth thresholds, keyed by datablock name or ``rss_mb``
+
+    Materials in ``keep_materials`` are looked up by name while they may have no
+    users (the wire material before the first wire, anomaly materials), so they
+    get a fake user before every purge.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, keep_materials: Iterable[str] = ()):
+        settings = (config or {}).get('memory', {}) or {}
+        self.keep_materials = list(keep_materials)
+        self.purge_every = settings.get('purge_every', 1)
+        self.purge_images = settings.get('purge_images', True)
+        self.alert_growth = settings.get('alert_growth', {}) or {}
+        self.history = deque(maxlen=max(2, settings.get('window', 20)))
+        self.frames = 0
+        self.purged_total = 0
+        self.latest: Dict[str, Any] = {}
+
+    def sample(self) -> Dict[str, Any]:
+        """Purge per policy, then record this frame's counts and check growth rates."""
+        self.frames += 1
+        purged = 0
+        if self.purge_every and self.frames % self.purge_every == 0:
+            protect_materials(self.keep_materials)
+            if self.purge_images:
+                purged += purge_unused_images()
+            purged += purge_orphans()
+            self.purged_total += purged
+
+        sample = datablock_counts()
+        rss = process_rss_bytes()
+        if rss is not None:
+            sample['rss_mb'] = rss / (1024 * 1024)
+        self.history.append(sample)
+
+        self.latest = {
+            'counts': sample,
+            'growth_per_frame': self.growth_per_frame(),
+            'purged': purged,
+            'purged_total': self.purged_total,
+        }
+        self._check_alerts(self.latest['growth_per_frame'])
+        return self.latest
+
+    def growth_per_frame(self) -> Dict[str, float]:
+        """Average per-frame change of every tracked value over the window."""
+        if len(self.history) < 2:
+            return {}
+        first, last = self.history[0], self.history[-1]
+        frames = len(self.history) - 1
+        return {key: (last[key] - first[key]) / frames for key in last if key in first}
+
+    def _check_alerts(self, growth: Dict[str, float]) -> None:
+        # Only alert once the window is full so start-up allocations do not trigger it
+        if len(self.history) < self.history.maxlen:
+            return
+        for key, threshold in self.alert_growth.items():
+            rate = growth.get(key)
+            if rate is not None and rate > threshold:
+                logger.warning("Memory growth alert: %s grows %.2f per frame (threshold %s)",
+                               key, rate, threshold)
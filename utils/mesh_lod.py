@@ -0,0 +1,148 @@
+"""Per-frame swaps of heavy meshes for their decimated level-of-detail variants.
+
+scripts/build_mesh_lods.py stores decimated copies of the heavy annotated
+meshes as ``<mesh>.LOD<level>``, either in the project .blend or in a side
+library. After ``setup_camera``, ``MeshLODs.apply`` projects every visible
+object that has variants and swaps in the level its on-screen size calls for
+(``mesh_lod.thresholds_px`` in rendering.yaml). The swap goes through the
+``SceneJournal``, so the next reset puts the full mesh back. Only the object's
+mesh data changes: its name, ``label``, ``annotate``, ``pass_index`` and
+transform stay the same, so annotations and masks remain valid.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+
+import bpy
+from mathutils import Vector
+
+from core.lod import focal_pixels, lod_level, parse_lod_name
+from core.trackers import SceneJournal
+from core.log import get_logger
+
+logger = get_logger(__name__)
+
+
+def load_lod_library(path) -> int:
+    """Append the LOD variants of a side library that are not loaded yet. Returns how many were appended."""
+    with bpy.data.libraries.load(str(path), link=False) as (data_from, data_to):
+        data_to.meshes = [name for name in data_from.meshes
+                          if parse_lod_name(name) and name not in bpy.data.meshes]
+    for mesh in data_to.meshes:
+        if mesh is not None:
+            mesh.use_fake_user = True
+    return len(data_to.meshes)
+
+
+class MeshLODs:
+    """LOD variants of the loaded meshes and the objects that use them.
+
+    Settings come from the ``mesh_lod`` section of rendering.yaml:
+        thresholds_px:  projected sizes below which each coarser level is used
+        library:        side .blend holding the variants (null = the project .blend)
+    """
+
+    def __init__(self, thresholds_px: List[float]):
+        self.thresholds_px = thresholds_px
+        self.signature = None
+        self.variants: Dict[str, List[bpy.types.Mesh]] = {}
+        self.objects: List[Tuple[bpy.types.Object, bpy.types.Mesh]] = []
+        self.swaps: List[int] = []
+        self.frames = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['MeshLODs']:
+        """Create the LOD switcher if ``mesh_lod.enabled`` is set, otherwise return None."""
+        settings = config.get('mesh_lod', {}) or {}
+        if not settings.get('enabled', False):
+            return None
+        if settings.get('library'):
+            appended = load_lod_library(settings['library'])
+            logger.info("Appended %d LOD meshes from %s", appended, settings['library'])
+        return cls(settings.get('thresholds_px', [600, 200]))
+
+    def _index(self) -> None:
+        """Find every variant and the objects whose mesh has variants, once per loaded .blend."""
+        signature = (bpy.data.filepath, len(bpy.data.objects), len(bpy.data.meshes))
+        if signature == self.signature:
+            return
+        variants: Dict[str, Dict[int, bpy.types.Mesh]] = {}
+        for mesh in bpy.data.meshes:
+            parsed = parse_lod_name(mesh.name)
+            if parsed:
+                variants.setdefault(parsed[0], {})[parsed[1]] = mesh
+        # Levels are used in order; a missing level ends the mesh's chain
+        self.variants = {}
+        for name, levels in variants.items():
+            chain = []
+            while len(chain) + 1 in levels:
+                chain.append(levels[len(chain) + 1])
+            self.variants[name] = chain
+        self.objects = [(obj, obj.data) for obj in bpy.data.objects
+                        if obj.type == 'MESH' and obj.data and self.variants.get(obj.data.name)]
+        self.signature = signature
+        logger.debug("Indexed LOD variants of %d meshes used by %d objects", len(self.variants), len(self.objects))
+
+    def apply(self, camera) -> Dict[str, List[int]]:
+        """
+        Swap the visible objects with variants to the level of their projected size.
+
+        Objects crossing the near clip plane keep full detail. Objects whose
+        materials were changed on the mesh this frame (material anomalies) are
+        not swapped, because the variant carries the mesh's original materials.
+
+        Args:
+            camera: Camera the frame is rendered from
+
+        Returns:
+            Frame record fields ``lod_objects`` and ``lod_faces_removed``: per
+            level, the objects rendered at it and the faces its swaps removed
+        """
+        if camera is None:
+            return {}
+        self._index()
+        max_levels = max((len(chain) for chain in self.variants.values()), default=0)
+        objects, faces_removed = [0] * (max_levels + 1), [0] * (max_levels + 1)
+
+        render = bpy.context.scene.render
+        scale = render.resolution_percentage / 100
+        focal = focal_pixels(camera.data.lens, camera.data.sensor_width, camera.data.sensor_height,
+                             camera.data.sensor_fit, render.resolution_x * scale, render.resolution_y * scale)
+        bpy.context.view_layer.update()
+        to_camera = camera.matrix_world.inverted()
+        journal = SceneJournal.get_instance()
+
+        for obj, mesh in self.objects:
+            try:
+                if not obj.visible_get() or obj.data != mesh:
+                    continue
+            except ReferenceError:
+                continue
+            # Bounding sphere of the object's box in world space
+            center = obj.matrix_world @ (sum((Vector(corner) for corner in obj.bound_box), Vector()) / 8)
+            radius = obj.dimensions.length / 2
+            depth = -(to_camera @ center).z
+            level = 0
+            if depth - radius > camera.data.clip_start:
+                chain = self.variants[mesh.name]
+                level = min(lod_level(2 * radius * focal / depth, self.thresholds_px), len(chain))
+                if level and list(chain[level - 1].materials) != list(mesh.materials):
+                    level = 0
+            objects[level] += 1
+            if level:
+                variant = chain[level - 1]
+                journal.set(obj, 'data', variant)
+                faces_removed[level] += len(mesh.polygons) - len(variant.polygons)
+
+        self.frames += 1
+        while len(self.swaps) < len(objects):
+            self.swaps.append(0)
+        for level, count in enumerate(objects):
+            self.swaps[level] += count
+        return {'lod_objects': objects, 'lod_faces_removed': faces_removed}
+
+    def summary(self) -> Dict[str, Any]:
+        """Objects rendered at each level, per frame."""
+        return {
+            'frames': self.frames,
+            'objects_per_level': [round(count / self.frames, 1) if self.frames else 0.0 for count in self.swaps],
+        }
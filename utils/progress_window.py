@@ -1,12 +1,39 @@
 import tkinter as tk
 from tkinter import ttk
 import json
+import sys
+import yaml
 from pathlib import Path
 import time
 from datetime import datetime, timedelta
 
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from core.output_layout import OutputLayout
+from core.log import get_logger
+
+logger = get_logger(__name__)
+
+def read_status(layout):
+    """Merge the status files of every worker writing into the layout's output directory."""
+    merged = {'total_images': 0, 'completed_images': 0, 'pole_type_counts': {}}
+    for status_file in layout.iter_status_files():
+        with open(status_file, 'r') as f:
+            status = json.load(f)
+        merged['total_images'] += status['total_images']
+        merged['completed_images'] += status['completed_images']
+        for pole_type, count in status['pole_type_counts'].items():
+            merged['pole_type_counts'][pole_type] = merged['pole_type_counts'].get(pole_type, 0) + count
+    return merged if merged['total_images'] else None
+
 class ProgressWindow:
-    def __init__(self):
+    def __init__(self, config_path=project_root / "configs" / "rendering.yaml"):
+        with open(config_path, 'r') as f:
+            self.layout = OutputLayout.from_config(yaml.safe_load(f))
+
         self.root = tk.Tk()
         self.root.title("Synthetic Data Generation Progress")
         self.root.geometry("600x400")
@@ -47,11 +74,8 @@ class ProgressWindow:
     def update_progress(self):
         """Update progress from status file"""
         try:
-            status_file = Path("Renders/generation_status.json")
-            if status_file.exists():
-                with open(status_file, 'r') as f:
-                    status = json.load(f)
-                
+            status = read_status(self.layout)
+            if status:
                 # Update progress bar
                 progress = (status['completed_images'] / status['total_images']) * 100
                 self.progress_var.set(progress)
@@ -80,7 +104,7 @@ class ProgressWindow:
                 self.dist_text.insert('1.0', dist_text)
         
         except Exception as e:
-            print(f"Error updating progress: {e}")
+            logger.warning("Error updating progress: %s", e)
         
         self.root.after(1000, self.update_progress)  # Update every second
     
@@ -0,0 +1,128 @@
+"""Name index over the collections and objects of the loaded .blend.
+
+The pole classes resolve collections and objects by name on every frame, and
+``toggle_collection_visibility`` walks child collections recursively each time
+it is called. The index resolves each collection, child and object name once
+and keeps the result, together with every collection's flattened object list
+and wire-attachment empties. It stays valid until the .blend changes: another
+file is loaded, a collection is added or removed, or assets are appended
+(``invalidate_scene_index``).
+
+Only assets from the .blend are indexed; the per-frame ``Wires`` collection is
+never cached because its objects are recreated every frame.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import bpy
+
+from core.log import get_logger
+
+logger = get_logger(__name__)
+
+# Collections whose contents change every frame
+VOLATILE_COLLECTIONS = {'Wires'}
+
+
+class SceneIndex:
+    """Cached name lookups for one loaded .blend."""
+
+    def __init__(self):
+        self.signature = self._signature()
+        self.collections: Dict[str, bpy.types.Collection] = dict(bpy.data.collections.items())
+        self._children: Dict[str, Dict[str, bpy.types.Collection]] = {}
+        self._objects: Dict[str, Dict[str, bpy.types.Object]] = {}
+        self._flattened: Dict[str, Tuple[bpy.types.Object, ...]] = {}
+        self._empties: Dict[str, Tuple[bpy.types.Object, ...]] = {}
+        logger.debug("Indexed %d collections of %s", len(self.collections), bpy.data.filepath)
+
+    @staticmethod
+    def _signature():
+        return bpy.data.filepath, len(bpy.data.collections)
+
+    def is_current(self) -> bool:
+        """Whether the loaded .blend still has the collections this index was built from."""
+        return self.signature == self._signature()
+
+    def collection(self, path: str) -> Optional[bpy.types.Collection]:
+        """
+        Collection by name or by ``/``-separated path of child names.
+
+        Args:
+            path: e.g. ``"ALS_Fuse_Crossarm"`` or ``"ALS_Fuse_Crossarm/Framings.001"``
+
+        Returns:
+            The collection, or None if any part of the path does not exist
+        """
+        names = path.split('/')
+        collection = self.collections.get(names[0])
+        for name in names[1:]:
+            collection = self.child(collection, name)
+        return collection
+
+    def child(self, collection, name: str) -> Optional[bpy.types.Collection]:
+        """Direct child collection by name, like ``collection.children.get(name)``."""
+        if collection is None:
+            return None
+        children = self._children.get(collection.name)
+        if children is None:
+            children = dict(collection.children.items())
+            if collection.name not in VOLATILE_COLLECTIONS:
+                self._children[collection.name] = children
+        return children.get(name)
+
+    def object(self, collection, name: str) -> Optional[bpy.types.Object]:
+        """Object directly in a collection by name, like ``collection.objects.get(name)``."""
+        if collection is None:
+            return None
+        objects = self._objects.get(collection.name)
+        if objects is None:
+            objects = dict(collection.objects.items())
+            if collection.name not in VOLATILE_COLLECTIONS:
+                self._objects[collection.name] = objects
+        return objects.get(name)
+
+    def collection_objects(self, collection) -> Tuple[bpy.types.Object, ...]:
+        """Objects of a collection and all of its child collections, flattened."""
+        if collection is None:
+            return ()
+        objects = self._flattened.get(collection.name)
+        if objects is None:
+            seen = {}
+            pending = [collection]
+            while pending:
+                current = pending.pop()
+                for obj in current.objects:
+                    seen.setdefault(obj.name, obj)
+                pending.extend(current.children)
+            objects = tuple(seen.values())
+            if collection.name not in VOLATILE_COLLECTIONS:
+                self._flattened[collection.name] = objects
+        return objects
+
+    def wire_empties(self, collection) -> Tuple[bpy.types.Object, ...]:
+        """EMPTY objects directly in a collection: the attachment points wires are strung between."""
+        if collection is None:
+            return ()
+        empties = self._empties.get(collection.name)
+        if empties is None:
+            empties = tuple(obj for obj in collection.objects if obj.type == 'EMPTY')
+            self._empties[collection.name] = empties
+        return empties
+
+
+_index: Optional[SceneIndex] = None
+
+
+def scene_index() -> SceneIndex:
+    """Index of the loaded .blend, rebuilt when the .blend changed since it was built."""
+    global _index
+    if _index is None or not _index.is_current():
+        _index = SceneIndex()
+    return _index
+
+
+def invalidate_scene_index() -> None:
+    """Drop the index, e.g. after appending assets, so the next lookup rebuilds it."""
+    global _index
+    _index = None
@@ -1,5 +1,7 @@
 import bpy
 
+from utils.scene_index import scene_index
+
 def toggle_visibility(obj, visible):
     """
     Toggle the visibility state of a Blender object.
@@ -9,9 +11,9 @@ def toggle_visibility(obj, visible):
         visible (bool): Whether to make the object visible (True) or invisible (False)
     """
     if obj:
-        obj.hide_viewport = not visible
-        obj.hide_render = not visible
-        obj.hide_set(not visible)
+        # Import trackers here to avoid circular dependency
+        from core.trackers import SceneJournal
+        SceneJournal.get_instance().set_hidden(obj, not visible)
 
 def toggle_collection_visibility(collection, visible):
     """
@@ -22,15 +24,133 @@ def toggle_collection_visibility(collection, visible):
         visible (bool): Whether to make the collection visible (True) or invisible (False)
     """
     if collection:
-        for obj in collection.objects:
+        for obj in scene_index().collection_objects(collection):
             toggle_visibility(obj, visible)
-        for child in collection.children:
-            toggle_collection_visibility(child, visible)
 
-def reset_scene():
+def is_anomaly_label(label):
+    """Whether an object label marks an anomaly (rotated or flashed component)."""
+    return '_Anomaly' in label or '_Flashed' in label
+
+def visible_anomaly_labels():
+    """Return the labels of visible annotated objects that carry an anomaly."""
+    return [obj.get('label') for obj in bpy.context.view_layer.objects
+            if obj.get('annotate') == "True" and is_anomaly_label(obj.get('label', '')) and obj.visible_get()]
+
+def scene_complexity():
+    """Count the visible renderable objects and the wires of the current scene."""
+    objects = [obj for obj in bpy.context.view_layer.objects
+               if obj.type not in {'CAMERA', 'LIGHT'} and obj.visible_get()]
+    wires = bpy.data.collections.get('Wires')
+    return {
+        'object_count': len(objects),
+        'wire_count': sum(1 for obj in wires.objects if obj.visible_get()) if wires else 0,
+    }
+
+def _rounded(values, digits=5):
+    return [round(value, digits) for value in values]
+
+def _node_inputs(material):
+    """Unlinked node input values of a material, which per-frame variation may change."""
+    if not material or not material.node_tree:
+        return None
+    inputs = []
+    for node in material.node_tree.nodes:
+        for socket in node.inputs:
+            value = getattr(socket, 'default_value', None)
+            if socket.is_linked or value is None:
+                continue
+            if isinstance(value, (int, float)):
+                value = round(value, 5)
+            elif hasattr(value, '__len__') and not isinstance(value, str):
+                value = _rounded(value)
+            inputs.append([node.name, socket.identifier, value])
+    return inputs
+
+def scene_description(camera=None):
+    """
+    Describe everything of the current scene that affects the rendered image and mask.
+
+    Used as the render cache key (``core.render_cache.scene_key``), so two scenes
+    with the same description must render identically. Object labels are left
+    out because they only name mask values: a cache hit assigns the pass
+    indices again and takes the label mapping from the current scene. Only
+    ``annotate`` and ``group_id`` change the mask values.
+
+    Args:
+        camera: Camera the frame is rendered from (the scene camera if omitted)
+
+    Returns:
+        JSON-serializable dictionary of visible objects, materials, camera and world
+    """
+    from utils.material_variation import VARIATION_ATTRIBUTES
+    
+    camera = camera or bpy.context.scene.camera
+    # Transforms set since the last depsgraph evaluation are not in matrix_world yet
+    bpy.context.view_layer.update()
+    objects, materials = [], {}
+    for obj in bpy.context.view_layer.objects:
+        if obj.type in {'CAMERA', 'LIGHT'} or not obj.visible_get():
+            continue
+        slots = [slot.material.name if slot.material else None for slot in obj.material_slots]
+        entry = [obj.name, _rounded(value for row in obj.matrix_world for value in row), slots,
+                 obj.get('annotate'), obj.get('group_id'),
+                 [obj.get(name) for name in VARIATION_ATTRIBUTES]]
+        if obj.type == 'CURVE':
+            curve = obj.data
+            entry.append([curve.bevel_depth, curve.bevel_resolution, curve.resolution_u,
+                          [_rounded(value for point in spline.bezier_points
+                                    for vector in (point.co, point.handle_left, point.handle_right)
+                                    for value in vector)
+                           for spline in curve.splines]])
+        elif obj.type == 'CURVES':
+            entry.append([_rounded(value for point in obj.data.points
+                                   for value in (*point.position, point.radius))])
+        objects.append(entry)
+        for slot in obj.material_slots:
+            if slot.material and slot.material.name not in materials:
+                materials[slot.material.name] = _node_inputs(slot.material)
+    world = bpy.context.scene.world
+    images = []
+    if world and world.node_tree:
+        images = sorted(node.image.filepath for node in world.node_tree.nodes
+                        if node.type == 'TEX_ENVIRONMENT' and node.image)
+    return {
+        'objects': sorted(objects, key=lambda entry: entry[0]),
+        'materials': materials,
+        'lights': sorted([obj.name, _rounded(value for row in obj.matrix_world for value in row)]
+                         for obj in bpy.context.view_layer.objects
+                         if obj.type == 'LIGHT' and obj.visible_get()),
+        'camera': [_rounded(value for row in camera.matrix_world for value in row),
+                   camera.data.lens, camera.data.sensor_width] if camera else None,
+        'world': images,
+    }
+
+def wire_pairs():
+    """Attachment empties of every wire in the current scene, as sorted name pairs."""
+    wires = bpy.data.collections.get('Wires')
+    if not wires:
+        return []
+    return sorted(tuple(sorted(obj['endpoints'])) for obj in wires.objects
+                  if 'endpoints' in obj and obj.visible_get())
+
+def reset_scene(full_sweep=False, recipe=None):
+    """
+    Restore the scene to its hidden default state before generating the next frame.
+    
+    Only the properties the last frame changed through the ``SceneJournal`` are
+    restored. Every object in the view layer is hidden instead on the first
+    reset, after ``SceneJournal.request_full_sweep`` or when requested.
+    
+    Args:
+        full_sweep: Hide every object in the view layer regardless of the journal
+        recipe: ``core.recipes.SceneRecipe`` of the next frame's configuration;
+            its objects and wires are left visible and in place instead of being restored
+    """
+    from utils.wire_generator import wire_pool
     # Import trackers here to avoid circular dependency
     from core.trackers import RotationTracker
     from core.trackers import MaterialTracker
+    from core.trackers import SceneJournal, set_hidden
     
     # Reset any rotated objects
     RotationTracker.get_instance().reset_rotations()
@@ -38,17 +158,36 @@ def reset_scene():
     # Reset any modified materials
     MaterialTracker.get_instance().reset_materials()
     
-    # Delete wires collection if it exists
+    # Undo every other change of the last frame: visibility, pass indices,
+    # positions, labels, materials and node inputs. The writes only tag the
+    # depsgraph, and one view layer update below applies them together
+    journal = SceneJournal.get_instance()
+    pool = wire_pool()
+    if recipe is not None and not (full_sweep or journal.full_sweep_pending):
+        journal.restore(recipe.visible, recipe.transforms)
+        pool.release(recipe.wire_pairs)
+    else:
+        journal.restore()
+        pool.release()
+    
+    # Pooled wires are only hidden, to be reused by the next frame
     if 'Wires' in bpy.data.collections:
         wires_collection = bpy.data.collections['Wires']
-        # First remove all objects in the collection
-        for obj in wires_collection.objects:
+        # Remove any other object together with its curve data,
+        # otherwise every frame leaks the wires' curve datablocks
+        for obj in list(wires_collection.objects):
+            if pool.is_pooled(obj):
+                continue
+            curve_data = obj.data
             bpy.data.objects.remove(obj, do_unlink=True)
+            if curve_data and curve_data.users == 0:
+                bpy.data.curves.remove(curve_data)
     
-    # Only operate on objects that are in the view layer
-    for obj in bpy.context.view_layer.objects:
-        if obj.type not in {'CAMERA', 'LIGHT'}:
-            obj.pass_index = 0
-            obj.hide_viewport = True
-            obj.hide_render = True
-            obj.hide_set(True)
+    if full_sweep or journal.full_sweep_pending:
+        journal.full_sweep_pending = False
+        for obj in bpy.context.view_layer.objects:
+            if obj.type not in {'CAMERA', 'LIGHT'}:
+                if obj.pass_index:
+                    obj.pass_index = 0
+                set_hidden(obj, True)
+    bpy.context.view_layer.update()
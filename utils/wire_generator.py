@@ -1,6 +1,355 @@
+"""Overhead power wires strung between wire-attachment empties.
+
+Wire curve objects are pooled: every attachment pair keeps its curve objects in
+the ``Wires`` collection across frames. ``create_power_wire`` draws the wire's
+random sag, sway and thickness immediately, so the random sequence is the same
+as before, and claims a pooled curve for the pair. The control points of all
+wires claimed during a frame are written by ``WirePool.build`` at the end of
+``PoleBase.generate``, from one depsgraph evaluation. ``reset_scene`` hides the
+frame's wires instead of deleting them and their curve data.
+
+After the camera is placed, ``WirePool.fit_to_camera`` lowers each wire's curve
+and bevel resolution to what its projected size needs (``wire_lod`` in
+rendering.yaml, see ``core.lod``). With ``wire_lod.primitive: curves`` wires are
+hair curves objects, which Cycles renders as native curve primitives instead
+of beveled meshes.
+"""
+
 import bpy
 import random
+from typing import Dict, Any, List, Optional, Tuple
 from mathutils import Vector
+from mathutils.geometry import interpolate_bezier
+
+from core.lod import focal_pixels, curve_resolution, bevel_resolution
+from core.log import get_logger
+
+logger = get_logger(__name__)
+
+WIRE_MATERIAL = 'Material.008'
+
+# Full-detail tessellation, used when wire_lod is disabled
+FULL_RESOLUTION = 96
+FULL_BEVEL_RESOLUTION = 6
+
+# wire_lod section of rendering.yaml (see configure_wires)
+_settings: Dict[str, Any] = {}
+
+
+def _wires_collection():
+    """The ``Wires`` collection, created and linked to the scene if missing."""
+    if 'Wires' not in bpy.data.collections:
+        wires_collection = bpy.data.collections.new('Wires')
+        bpy.context.scene.collection.children.link(wires_collection)
+        return wires_collection
+    return bpy.data.collections['Wires']
+
+
+def _alive(obj) -> bool:
+    """Whether a Python reference still points to an existing Blender object."""
+    try:
+        return obj.name in bpy.data.objects
+    except ReferenceError:
+        return False
+
+
+def _spans(points):
+    """Control points of each cubic span between consecutive bezier points."""
+    return [(a[0], a[2], b[1], b[0]) for a, b in zip(points, points[1:])]
+
+
+def _polyline(points, resolution):
+    """Sample every span of a bezier into ``resolution`` segments."""
+    samples = []
+    for span in _spans(points):
+        span_samples = interpolate_bezier(*span, resolution + 1)
+        samples.extend(span_samples if not samples else span_samples[1:])
+    return samples
+
+
+def wire_points(start_point, end_point, sag_depth, sway_amount):
+    """
+    Bezier points of a sagging wire.
+
+    Args:
+        start_point: World position of the first attachment
+        end_point: World position of the second attachment
+        sag_depth: How far the middle point hangs below the straight line
+        sway_amount: Lateral offset of the middle point
+
+    Returns:
+        List of (co, handle_left, handle_right) for the start, middle and end point
+    """
+    direction = (end_point - start_point).normalized()
+    span_length = (end_point - start_point).length
+
+    # Calculate perpendicular vector for sway
+    if abs(direction.y) < abs(direction.x):
+        sway_direction = Vector((-direction.y, direction.x, 0)).normalized()
+    else:
+        sway_direction = Vector((direction.y, -direction.x, 0)).normalized()
+
+    # Calculate middle point with sag and lateral sway
+    mid_point = (start_point + end_point) / 2
+    mid_point.z -= sag_depth
+    mid_point += sway_direction * sway_amount
+
+    handle_right = start_point + direction * (span_length/4)
+    handle_right.z -= sag_depth/2
+    handle_right += sway_direction * (sway_amount * 0.5)
+
+    handle_left = end_point + direction * (-span_length/4)
+    handle_left.z -= sag_depth/2
+    handle_left += sway_direction * (sway_amount * 0.5)
+
+    return [
+        (start_point, start_point, handle_right),
+        (mid_point, mid_point + direction * (-span_length/4), mid_point + direction * (span_length/4)),
+        (end_point, handle_left, end_point),
+    ]
+
+
+class WirePool:
+    """Curve objects reused across frames, keyed by their sorted attachment names."""
+
+    def __init__(self):
+        self.signature = bpy.data.filepath
+        self.primitive = _settings.get('primitive', 'bevel')
+        self.wires: Dict[Tuple[str, str], List[bpy.types.Object]] = {}
+        self.claimed: Dict[Tuple[str, str], int] = {}
+        self.kept: List[Tuple[Tuple[str, str], int]] = []
+        self.pending: List[tuple] = []
+        self.built: List[tuple] = []
+        self.created = 0
+        self.reused = 0
+        self.segments = 0
+        self.full_segments = 0
+
+    @staticmethod
+    def pair_key(cube1, cube2) -> Tuple[str, str]:
+        return tuple(sorted((cube1.name, cube2.name)))
+
+    def is_pooled(self, obj) -> bool:
+        """Whether a Wires object belongs to the pool (other wires are deleted on reset)."""
+        return any(obj in wires for wires in self.wires.values())
+
+    def _new_wire(self):
+        if self.primitive == 'curves':
+            curve_data = bpy.data.hair_curves.new(name='PowerLine')
+        else:
+            curve_data = bpy.data.curves.new(name='PowerLine', type='CURVE')
+            curve_data.dimensions = '3D'
+            curve_data.resolution_u = FULL_RESOLUTION
+            curve_data.bevel_resolution = FULL_BEVEL_RESOLUTION
+            spline = curve_data.splines.new('BEZIER')
+            spline.bezier_points.add(2)
+
+        wire_obj = bpy.data.objects.new('PowerLine', curve_data)
+        _wires_collection().objects.link(wire_obj)
+        material = bpy.data.materials[WIRE_MATERIAL]
+        # Pooled wires may all be released at once; keep the material through orphan purges
+        material.use_fake_user = True
+        wire_obj.data.materials.append(material)
+        wire_obj["annotate"] = "True"
+        wire_obj["label"] = "Wire"
+        self.created += 1
+        return wire_obj
+
+    def acquire(self, cube1, cube2, wire_thickness, sag_ratio, sway_ratio):
+        """
+        Claim a wire for a pair of attachment empties for the current frame.
+
+        The wire is shown right away; its control points are written by ``build``.
+
+        Args:
+            cube1, cube2: Attachment empties
+            wire_thickness: Bevel depth of the wire
+            sag_ratio: Sag depth as a fraction of the span length
+            sway_ratio: Lateral sway as a fraction of the span length
+
+        Returns:
+            The wire object
+        """
+        from core.trackers import set_hidden
+
+        key = self.pair_key(cube1, cube2)
+        wires = self.wires.setdefault(key, [])
+        wires[:] = [wire for wire in wires if _alive(wire)]
+        count = self.claimed.get(key, 0)
+        if count < len(wires):
+            wire_obj = wires[count]
+            self.reused += 1
+        else:
+            wire_obj = self._new_wire()
+            wires.append(wire_obj)
+        self.claimed[key] = count + 1
+
+        wire_obj["endpoints"] = [cube1.name, cube2.name]
+        set_hidden(wire_obj, False)
+        self.pending.append((wire_obj, cube1, cube2, wire_thickness, sag_ratio, sway_ratio))
+        return wire_obj
+
+    def build(self) -> None:
+        """Write the control points of every wire claimed since the last build."""
+        from core.trackers import set_hidden
+
+        if self.pending:
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+            positions = {}
+            for wire_obj, cube1, cube2, wire_thickness, sag_ratio, sway_ratio in self.pending:
+                for cube in (cube1, cube2):
+                    if cube.name not in positions:
+                        positions[cube.name] = cube.evaluated_get(depsgraph).matrix_world.translation.copy()
+                start_point, end_point = positions[cube1.name], positions[cube2.name]
+                span_length = (end_point - start_point).length
+                points = wire_points(start_point, end_point, span_length * sag_ratio, span_length * sway_ratio)
+                self._write(wire_obj, points, wire_thickness)
+                self.built.append((wire_obj, points, wire_thickness))
+            logger.debug("Built %d wires from %d attachment positions", len(self.pending), len(positions))
+            self.pending = []
+
+        # Wires kept visible by release() that this frame did not claim again
+        for key, position in self.kept:
+            wires = self.wires.get(key, [])
+            if self.claimed.get(key, 0) <= position < len(wires) and _alive(wires[position]):
+                set_hidden(wires[position], True)
+        self.kept = []
+
+    def _write(self, wire_obj, points, wire_thickness, resolution=FULL_RESOLUTION,
+               bevel=FULL_BEVEL_RESOLUTION, control_points=True) -> None:
+        """Write a wire's geometry at the given curve and bevel resolution.
+
+        ``control_points=False`` only changes the resolution of a bezier wire
+        whose control points are already written.
+        """
+        curve_data = wire_obj.data
+        if self.primitive == 'curves':
+            # Hair curves store the tessellated polyline; Cycles renders it as a round tube
+            samples = _polyline(points, resolution)
+            if len(curve_data.points) != len(samples):
+                if len(curve_data.curves):
+                    curve_data.remove_curves(indices=list(range(len(curve_data.curves))))
+                curve_data.add_curves([len(samples)])
+            for point, co in zip(curve_data.points, samples):
+                point.position = co
+                point.radius = wire_thickness
+            return
+
+        if control_points:
+            for point, (co, handle_left, handle_right) in zip(curve_data.splines[0].bezier_points, points):
+                point.handle_left_type = 'FREE'
+                point.handle_right_type = 'FREE'
+                point.co = co
+                point.handle_left = handle_left
+                point.handle_right = handle_right
+                point.handle_left_type = 'ALIGNED'
+                point.handle_right_type = 'ALIGNED'
+        if curve_data.bevel_depth != wire_thickness:
+            curve_data.bevel_depth = wire_thickness
+        if curve_data.resolution_u != resolution:
+            curve_data.resolution_u = resolution
+        if curve_data.bevel_resolution != bevel:
+            curve_data.bevel_resolution = bevel
+
+    def fit_to_camera(self, camera) -> None:
+        """
+        Lower the tessellation of this frame's wires to what their projected size needs.
+
+        Each wire's depth is the nearest of its control points, which bound the
+        curve, so the chosen detail is never too coarse. Wires crossing the near
+        clip plane keep full detail.
+
+        Args:
+            camera: Camera the frame is rendered from
+        """
+        if not self.built or camera is None or not _settings.get('enabled', False):
+            return
+        render = bpy.context.scene.render
+        scale = render.resolution_percentage / 100
+        focal = focal_pixels(camera.data.lens, camera.data.sensor_width, camera.data.sensor_height,
+                             camera.data.sensor_fit, render.resolution_x * scale, render.resolution_y * scale)
+        tolerance = _settings.get('tolerance_px', 0.5)
+        max_resolution = _settings.get('max_resolution', FULL_RESOLUTION)
+        max_bevel = _settings.get('max_bevel_resolution', FULL_BEVEL_RESOLUTION)
+
+        # setup_camera moved the camera since the last depsgraph evaluation
+        bpy.context.view_layer.update()
+        to_camera = camera.matrix_world.inverted()
+        for wire_obj, points, wire_thickness in self.built:
+            depths = [-(to_camera @ co).z for point in points for co in point]
+            if max(depths) <= 0:
+                # Entirely behind the camera
+                resolution, bevel = 1, 0
+            elif min(depths) <= camera.data.clip_start:
+                resolution, bevel = max_resolution, max_bevel
+            else:
+                pixels_per_meter = focal / min(depths)
+                curvature = max(max((p0 - 2 * p1 + p2).length, (p1 - 2 * p2 + p3).length)
+                                for p0, p1, p2, p3 in _spans(points))
+                resolution = curve_resolution(curvature * pixels_per_meter, tolerance, max_resolution)
+                bevel = bevel_resolution(wire_thickness * pixels_per_meter, tolerance, max_bevel)
+            self._write(wire_obj, points, wire_thickness, resolution, bevel, control_points=False)
+            self.segments += resolution
+            self.full_segments += max_resolution
+
+    def release(self, keep_pairs=()) -> None:
+        """
+        Hide the current frame's wires before the next frame.
+
+        Args:
+            keep_pairs: Sorted attachment name pairs whose wires stay visible,
+                because the next frame's scene recipe strings them again
+        """
+        from core.trackers import set_hidden
+
+        keep_pairs = set(keep_pairs)
+        for key, count in self.claimed.items():
+            for position, wire_obj in enumerate(self.wires.get(key, [])[:count]):
+                if not _alive(wire_obj):
+                    continue
+                if key in keep_pairs:
+                    self.kept.append((key, position))
+                else:
+                    set_hidden(wire_obj, True)
+        self.claimed = {}
+        self.pending = []
+        self.built = []
+
+    def summary(self):
+        """Pooled wire count, how many claims reused an existing curve, and the LOD segment share."""
+        return {
+            'pooled': sum(len(wires) for wires in self.wires.values()),
+            'created': self.created,
+            'reused': self.reused,
+            'segment_ratio': round(self.segments / self.full_segments, 3) if self.full_segments else 1.0,
+        }
+
+
+_pool: Optional[WirePool] = None
+
+
+def wire_pool() -> WirePool:
+    """Wire pool of the loaded .blend, recreated when another .blend is loaded."""
+    global _pool
+    if _pool is None or _pool.signature != bpy.data.filepath:
+        _pool = WirePool()
+    return _pool
+
+
+def configure_wires(render_config: Dict[str, Any]) -> None:
+    """
+    Apply the ``wire_lod`` section of rendering.yaml. Call before the first wire is strung.
+
+    With ``primitive: curves`` the Cycles curve shape is set to round tubes, so
+    the wires' outline matches beveled wires.
+    """
+    global _settings, _pool
+    _settings = dict(render_config.get('wire_lod', {}) or {})
+    if _pool is not None and _pool.primitive != _settings.get('primitive', 'bevel'):
+        _pool = None
+    if _settings.get('primitive') == 'curves':
+        bpy.context.scene.cycles_curves.shape = 'THICK'
+
 
 def create_power_wire(cube1, cube2, wire_thickness=0.1, sag_factor=0.15, randomize=True):
     """
@@ -8,103 +357,18 @@ def create_power_wire(cube1, cube2, wire_thickness=0.1, sag_factor=0.15, randomi
     wire_thickness: diameter of the conductor in meters
     sag_factor: controls how much the wire sags (0.15 = 15% of span length)
     randomize: adds natural variation to the wire
+
+    The wire comes from the wire pool; its control points are written when
+    ``wire_pool().build()`` runs at the end of the pole's generation.
     """
-    # Create or get the Wires collection
-    if 'Wires' not in bpy.data.collections:
-        wires_collection = bpy.data.collections.new('Wires')
-        bpy.context.scene.collection.children.link(wires_collection)
-    else:
-        wires_collection = bpy.data.collections['Wires']
-    
-    # Get cube positions
-    # Get global positions of the cubes
-    depsgraph = bpy.context.evaluated_depsgraph_get()
-    start_point = cube1.evaluated_get(depsgraph).matrix_world.translation.copy()
-    end_point = cube2.evaluated_get(depsgraph).matrix_world.translation.copy()
-    
-    # Create curve
-    curve_data = bpy.data.curves.new(name='PowerLine', type='CURVE')
-    curve_data.dimensions = '3D'
-    curve_data.resolution_u = 96
-    
-    # Create curve object
-    wire_obj = bpy.data.objects.new('PowerLine', curve_data)
-    wires_collection.objects.link(wire_obj)
-    
-    # Create spline
-    spline = curve_data.splines.new('BEZIER')
-    
-    # Calculate parameters with randomization
-    direction = (end_point - start_point).normalized()
-    span_length = (end_point - start_point).length
-    
     if randomize:
         # Random variations
         sag_variation = random.uniform(0.85, 1.15)  # ±15% sag variation
         sway_variation = random.uniform(-0.05, 0.05)  # ±5% lateral sway
         thickness_variation = random.uniform(0.9, 1.1)  # ±10% thickness variation
         wire_thickness *= thickness_variation
-        sag_depth = span_length * sag_factor * sag_variation
     else:
-        sag_depth = span_length * sag_factor
+        sag_variation = 1.0
         sway_variation = 0
-    
-    # Calculate middle point with randomization
-    mid_point = (start_point + end_point) / 2
-    mid_point.z -= sag_depth
-    
-    # Add slight random lateral sway if randomization is enabled
-    if randomize:
-        # Calculate perpendicular vector for sway
-        if abs(direction.y) < abs(direction.x):
-            sway_direction = Vector((-direction.y, direction.x, 0)).normalized()
-        else:
-            sway_direction = Vector((direction.y, -direction.x, 0)).normalized()
-        
-        sway_amount = span_length * sway_variation
-        mid_point += sway_direction * sway_amount
-    
-    # Add points for bezier curve
-    spline.bezier_points.add(2)
-    points = spline.bezier_points
-    
-    # Start point
-    points[0].co = start_point
-    points[0].handle_left = start_point
-    handle_right = start_point + direction * (span_length/4)
-    handle_right.z -= sag_depth/2
-    if randomize:
-        handle_right += sway_direction * (sway_amount * 0.5)
-    points[0].handle_right = handle_right
-    
-    # Middle point
-    points[1].co = mid_point
-    points[1].handle_left = mid_point + direction * (-span_length/4)
-    points[1].handle_right = mid_point + direction * (span_length/4)
-    
-    # End point
-    points[2].co = end_point
-    handle_left = end_point + direction * (-span_length/4)
-    handle_left.z -= sag_depth/2
-    if randomize:
-        handle_left += sway_direction * (sway_amount * 0.5)
-    points[2].handle_left = handle_left
-    points[2].handle_right = end_point
-    
-    # Set handle types for smooth curve
-    for point in points:
-        point.handle_left_type = 'ALIGNED'
-        point.handle_right_type = 'ALIGNED'
-    
-    # Add thickness and make it slightly rounded
-    curve_data.bevel_depth = wire_thickness
-    curve_data.bevel_resolution = 6
-    
-    # Set material to Material.008
-    wire_obj.data.materials.append(bpy.data.materials['Material.008'])
-    
-    # Add custom properties
-    wire_obj["annotate"] = "True"
-    wire_obj["label"] = "Wire"
-    
-    return wire_obj
+
+    return wire_pool().acquire(cube1, cube2, wire_thickness, sag_factor * sag_variation, sway_variation)